@@ -0,0 +1,180 @@
+# benchmarks/generate_data.py
+"""
+Synthetic lab-inventory generator for benchmarking.
+
+Fills a database through the regular models (StorageModel, IdentityModel
+with a BlobStoreModel, UsageModel, SupportingMaterialsModel) using their bulk
+create_many() paths.
+
+    python -m benchmarks.generate_data bench_database.db --reagents 100000 --usage 5000000
+"""
+import argparse
+import os
+import random
+import struct
+import sys
+import time
+import zlib
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.blob_store_model import BlobStoreModel
+from models.database import DatabaseManager
+from models.identity_model import IdentityModel
+from models.storage_model import StorageModel
+from models.supporting_materials_model import SupportingMaterialsModel
+from models.usage_model import UsageModel
+from models.user_model import UserModel
+
+WUJUD = list(IdentityModel.WUJUD_TYPES)
+HAZARDS = ["None", "Low", "Medium", "High", "Extreme", "Flammable", "Corrosive", "Toxic"]
+SIFAT = ["Asam", "Basa", "Netral", "Oksidator", "Reduktor"]
+USERS = [f"Staff {index:03d}" for index in range(300)]
+MATERIALS = [f"Bahan {index:03d}" for index in range(200)]
+
+
+def _random_date(rng, start, days):
+    return (start + timedelta(days=rng.randrange(days))).isoformat()
+
+
+def _png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def _synthetic_png(rng, width, height, size):
+    """
+    A decodable PNG of width x height pixels (a colour gradient), padded to
+    about size bytes with a private chunk decoders skip, so thumbnail
+    generation costs as much as for a photo of that resolution
+    """
+    base = bytes((index * 7 + rng.randrange(256)) % 256 for index in range(width * 3))
+    pixels = b"".join(
+        b"\x00" + base[row % len(base) :] + base[: row % len(base)] for row in range(height)
+    )
+    png = (
+        b"\x89PNG\r\n\x1a\n"
+        + _png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + _png_chunk(b"IDAT", zlib.compress(pixels, 6))
+    )
+    padding = size - len(png) - 24
+    if padding > 0:
+        png += _png_chunk(b"bePd", rng.randbytes(padding))
+    return png + _png_chunk(b"IEND", b"")
+
+
+def generate(
+    db,
+    storages=8,
+    reagents=1000,
+    usage=10000,
+    image_ratio=0.3,
+    image_bytes=200_000,
+    sds_ratio=0.3,
+    sds_bytes=500_000,
+    image_size=(1600, 1200),
+    seed=1,
+):
+    """
+    Populate db with synthetic data and return the number of rows per table
+
+    Images are decodable PNGs of image_size pixels and SDS payloads random
+    bytes; a handful of distinct payloads are reused so that the data
+    resembles shared supplier SDS files.
+    """
+    rng = random.Random(seed)
+    storage_model = StorageModel(db)
+    identity_model = IdentityModel(db, blob_store=BlobStoreModel(db))
+    materials_model = SupportingMaterialsModel(db)
+    usage_model = UsageModel(db, materials_model, UserModel(db))
+
+    first_storage = len(storage_model.get_all()) + 1
+    storage_model.create_many(
+        {"name": f"Lemari Reagen {first_storage + index}", "level": index % 4 + 1}
+        for index in range(storages)
+    )
+    storage_ids = [storage["id"] for storage in storage_model.get_all()]
+    materials_model.create_many(MATERIALS)
+
+    images = (
+        [_synthetic_png(rng, *image_size, image_bytes) for _ in range(8)]
+        if image_bytes
+        else [None]
+    )
+    sds_files = [rng.randbytes(sds_bytes) for _ in range(8)] if sds_bytes else [None]
+    today = date.today()
+
+    def reagent_rows():
+        for index in range(reagents):
+            has_sds = rng.random() < sds_ratio
+            yield {
+                "name": f"Reagen {index:06d}",
+                "description": f"Synthetic reagent number {index}",
+                "wujud": rng.choice(WUJUD),
+                "stock": rng.randrange(0, 5000),
+                "massa": rng.randrange(1, 1000),
+                "tanggal_expire": _random_date(rng, today - timedelta(days=365), 365 * 5),
+                "category_hazard": rng.choice(HAZARDS),
+                "sifat": rng.choice(SIFAT),
+                "tanggal_produksi": _random_date(rng, today - timedelta(days=365 * 3), 365 * 2),
+                "tanggal_pembelian": _random_date(rng, today - timedelta(days=365 * 2), 365),
+                "sds": rng.choice(sds_files) if has_sds else None,
+                "sds_filename": f"sds_{index}.pdf" if has_sds else None,
+                "id_storage": rng.choice(storage_ids),
+                "image": rng.choice(images) if rng.random() < image_ratio else None,
+            }
+
+    identity_model.create_many(reagent_rows())
+    reagent_ids = [row["id"] for row in db.iter_query("SELECT id FROM Identity")]
+
+    def usage_rows():
+        for _ in range(usage):
+            yield {
+                "tanggal_terpakai": _random_date(rng, today - timedelta(days=365 * 3), 365 * 3),
+                "jumlah_terpakai": rng.randrange(1, 50),
+                "user": rng.choice(USERS),
+                "bahan_pendukung": rng.choice(MATERIALS) if rng.random() < 0.5 else "",
+                "id_identity": rng.choice(reagent_ids),
+            }
+
+    if reagent_ids:
+        usage_model.create_many(usage_rows())
+
+    return {
+        table: db.execute(f"SELECT COUNT(*) AS n FROM {table}", fetch_all=False)["n"]
+        for table in ("Storage", "Identity", "Usage", "SupportingMaterials")
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("database", help="Database file to create or extend")
+    parser.add_argument("--storages", type=int, default=8)
+    parser.add_argument("--reagents", type=int, default=1000)
+    parser.add_argument("--usage", type=int, default=10000)
+    parser.add_argument("--image-ratio", type=float, default=0.3)
+    parser.add_argument("--image-bytes", type=int, default=200_000)
+    parser.add_argument("--sds-ratio", type=float, default=0.3)
+    parser.add_argument("--sds-bytes", type=int, default=500_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.database, profile="bulk-load", instrument=False)
+    started = time.perf_counter()
+    counts = generate(
+        db,
+        storages=args.storages,
+        reagents=args.reagents,
+        usage=args.usage,
+        image_ratio=args.image_ratio,
+        image_bytes=args.image_bytes,
+        sds_ratio=args.sds_ratio,
+        sds_bytes=args.sds_bytes,
+        seed=args.seed,
+    )
+    db.close()
+    print(f"Generated in {time.perf_counter() - started:.1f}s: {counts}")
+
+
+if __name__ == "__main__":
+    main()
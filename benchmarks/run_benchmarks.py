@@ -0,0 +1,281 @@
+# benchmarks/run_benchmarks.py
+"""
+Times the main UI flows against a (synthetic) database.
+
+Each flow calls the worker-thread method of the viewmodel behind it
+directly (no event loop is needed), so the timings follow the app's own
+code. PyQt6 must be installed; xlsxwriter is only needed for the report
+flows. Results are printed as CSV (or JSON) so they can be compared release
+to release. Run it as a script from anywhere:
+
+    python benchmarks/run_benchmarks.py bench_database.db --generate --reagents 100000 --usage 5000000
+
+or as a module from the repository root (python -m benchmarks.run_benchmarks ...).
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generate_data import generate
+from models.blob_store_model import BlobStoreModel
+from models.database import DatabaseManager
+from models.identity_model import IdentityModel
+from models.storage_model import StorageModel
+from models.supporting_materials_model import SupportingMaterialsModel
+from models.usage_model import UsageModel
+from models.user_model import UserModel
+from viewmodels.expiry_viewmodel import ExpiryViewModel
+from viewmodels.rack_viewmodel import RackViewModel
+from viewmodels.reagent_viewmodel import ReagentViewModel
+from viewmodels.search_viewmodel import SearchViewModel
+from viewmodels.usage_edit_viewmodel import UsageEditViewModel
+
+try:
+    # Imports xlsxwriter
+    from viewmodels.usage_report_viewmodel import UsageReportViewModel
+except ImportError:
+    UsageReportViewModel = None
+
+FIELDS = ["flow", "runs", "min_ms", "median_ms", "mean_ms", "max_ms", "rows", "queries"]
+
+
+class BenchContext:
+    """Models, viewmodels and the ids the flows operate on"""
+
+    def __init__(self, db, seed=1):
+        self.db = db
+        self.rng = random.Random(seed)
+        self.blob_store = BlobStoreModel(db)
+        self.identity_model = IdentityModel(db, compact_rows=True, blob_store=self.blob_store)
+        # Same as main.py: older databases still keep payloads inline
+        self.identity_model.migrate_inline_blobs()
+        self.storage_model = StorageModel(db)
+        self.materials_model = SupportingMaterialsModel(db)
+        self.usage_model = UsageModel(
+            db, self.materials_model, UserModel(db), compact_rows=True
+        )
+        self.search_viewmodel = SearchViewModel(self.identity_model, self.storage_model)
+        self.expiry_viewmodel = ExpiryViewModel(self.identity_model, self.storage_model)
+        self.report_viewmodel = (
+            UsageReportViewModel(self.usage_model, self.identity_model)
+            if UsageReportViewModel
+            else None
+        )
+
+        self.storage_ids = [storage["id"] for storage in self.storage_model.get_all()]
+        self.reagent_ids = [row["id"] for row in db.iter_query("SELECT id FROM Identity")]
+        self.payload_reagent_ids = [
+            row["id"]
+            for row in db.iter_query(
+                "SELECT id FROM Identity WHERE SDS_Hash IS NOT NULL OR Image_Hash IS NOT NULL"
+            )
+        ] or self.reagent_ids
+        busiest = db.execute(
+            "SELECT id_identity FROM Usage GROUP BY id_identity "
+            "ORDER BY COUNT(*) DESC LIMIT 1",
+            fetch_all=False,
+        )
+        # The reagent with the longest history is the worst case for reports
+        self.busiest_reagent_id = busiest["id_identity"] if busiest else None
+
+    def rack_viewmodel(self, storage_id):
+        return RackViewModel(
+            self.identity_model,
+            self.storage_model,
+            self.usage_model,
+            self.materials_model,
+            storage_id,
+            "Benchmark",
+        )
+
+
+def flow_search(ctx):
+    """SearchViewModel._find_reagents with a term matching ~1% of reagents"""
+    return len(ctx.search_viewmodel._find_reagents("reagen 0001", "All Fields"))
+
+
+def flow_rack_load(ctx):
+    """RackViewModel.load_reagents for a random storage: first page, count, prefetch"""
+    viewmodel = ctx.rack_viewmodel(ctx.rng.choice(ctx.storage_ids))
+    first, _ = viewmodel._fetch_page(None, True)
+    viewmodel._store_page(0, first)
+    if 1 in viewmodel._page_cursors:
+        viewmodel._fetch_page(viewmodel._page_cursors[1], False)
+    return len(first)
+
+
+def flow_home_stats(ctx):
+    """HomeViewModel.load_storage_stats with a cold statistics cache"""
+    ctx.identity_model._stats_cache.clear()
+    return len(ctx.identity_model.get_storage_stats())
+
+
+def flow_expiring(ctx):
+    """ExpiryViewModel full load: reagents expiring within 30 days"""
+    horizon = (date.today() + timedelta(days=30)).isoformat()
+    result = ctx.expiry_viewmodel._fetch_changes(horizon, None, set(), 1)
+    return len(result["added"])
+
+
+def flow_reagent_detail(ctx):
+    """
+    ReagentViewModel for a random reagent with an image or SDS: details,
+    usage summary, the 300px thumbnail (generated on first view) and the SDS
+    streamed out for the PDF viewer
+    """
+    reagent_id = ctx.rng.choice(ctx.payload_reagent_ids)
+    viewmodel = ReagentViewModel(ctx.identity_model, reagent_id, usage_model=ctx.usage_model)
+    viewmodel.get_usage_summary()
+    viewmodel.get_thumbnail(300)
+    if viewmodel.get_sds_info():
+        path = viewmodel.prepare_sds_file()
+        if path:
+            os.remove(path)
+    return 1 if viewmodel.get_reagent_data() else 0
+
+
+def flow_usage_report(ctx):
+    """UsageReportViewModel.load_usage_data for the busiest reagent: count and first page"""
+    filters = dict(ctx.report_viewmodel.filters)
+    (reports, _), _ = ctx.report_viewmodel._fetch_first_page(ctx.busiest_reagent_id, filters)
+    return len(reports)
+
+
+def flow_xlsx_export(ctx):
+    """UsageReportViewModel._write_usage_xlsx for the busiest reagent"""
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        success, message = ctx.report_viewmodel._write_usage_xlsx(
+            ctx.busiest_reagent_id, path, "Benchmark"
+        )
+        if not success:
+            raise RuntimeError(message)
+        return ctx.usage_model.get_summary(ctx.busiest_reagent_id)["Usage_Count"]
+    finally:
+        os.remove(path)
+
+
+def flow_usage_save(ctx):
+    """UsageEditViewModel.save_usage for a new usage row"""
+    reagent_id = ctx.rng.choice(ctx.reagent_ids)
+    viewmodel = UsageEditViewModel(
+        ctx.usage_model, ctx.identity_model, ctx.materials_model, reagent_id, "Benchmark"
+    )
+    errors = []
+    viewmodel.error.connect(errors.append)
+    viewmodel.save_usage(
+        {
+            "Tanggal_Terpakai": date.today().isoformat(),
+            "Jumlah_Terpakai": 1,
+            "User": "Benchmark",
+            "Bahan_Pendukung": "Bahan 001",
+        }
+    )
+    if errors:
+        raise RuntimeError(errors[0])
+    return 1
+
+
+FLOWS = {
+    "search": flow_search,
+    "rack_load": flow_rack_load,
+    "home_stats": flow_home_stats,
+    "expiring": flow_expiring,
+    "reagent_detail": flow_reagent_detail,
+    "usage_report": flow_usage_report,
+    "xlsx_export": flow_xlsx_export,
+    "usage_save": flow_usage_save,
+}
+
+
+def run(db, flows=None, runs=5, seed=1):
+    """Run the selected flows and return one result dict per flow"""
+    ctx = BenchContext(db, seed)
+    results = []
+    for name in flows or FLOWS:
+        if name in ("usage_report", "xlsx_export") and UsageReportViewModel is None:
+            print(f"Skipping {name}: xlsxwriter is not installed", file=sys.stderr)
+            continue
+        if not ctx.reagent_ids or (
+            name in ("usage_report", "xlsx_export") and ctx.busiest_reagent_id is None
+        ):
+            print(f"Skipping {name}: database has no data for it", file=sys.stderr)
+            continue
+
+        timings = []
+        rows = 0
+        db.reset_query_stats()
+        for _ in range(runs):
+            started = time.perf_counter()
+            rows = FLOWS[name](ctx)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries = sum(stats["count"] for stats in db.get_query_stats().values())
+
+        results.append(
+            {
+                "flow": name,
+                "runs": runs,
+                "min_ms": round(min(timings), 3),
+                "median_ms": round(statistics.median(timings), 3),
+                "mean_ms": round(statistics.mean(timings), 3),
+                "max_ms": round(max(timings), 3),
+                "rows": rows,
+                "queries": queries // runs,
+            }
+        )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("database", help="Database file to benchmark")
+    parser.add_argument("--generate", action="store_true", help="Populate the database first")
+    parser.add_argument("--reagents", type=int, default=1000)
+    parser.add_argument("--usage", type=int, default=10000)
+    parser.add_argument("--flows", nargs="+", choices=list(FLOWS), help="Flows to run")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--format", choices=["csv", "json"], default="csv")
+    parser.add_argument("--output", help="Write results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        loader = DatabaseManager(args.database, profile="bulk-load", instrument=False)
+        generate(loader, reagents=args.reagents, usage=args.usage, seed=args.seed)
+        loader.close()
+
+    # Large thresholds keep the slow-query log quiet while still counting queries
+    db = DatabaseManager(args.database, slow_query_ms=float("inf"))
+    results = run(db, args.flows, args.runs, args.seed)
+    dataset = {
+        table: db.execute(f"SELECT COUNT(*) AS n FROM {table}", fetch_all=False)["n"]
+        for table in ("Storage", "Identity", "Usage")
+    }
+    db.close()
+
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        if args.format == "json":
+            json.dump({"dataset": dataset, "results": results}, out, indent=2)
+            out.write("\n")
+        else:
+            writer = csv.DictWriter(out, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,8 @@ from models.storage_model import StorageModel
 from models.identity_model import IdentityModel
 from models.usage_model import UsageModel
 from models.supporting_materials_model import SupportingMaterialsModel
+from models.blob_store_model import BlobStoreModel
+from models.import_job_model import ImportJobModel
 
 
 def main():
@@ -29,9 +31,21 @@ def main():
     user_model = UserModel(db)
     record_model = RecordModel(db)
     storage_model = StorageModel(db)
-    identity_model = IdentityModel(db)
-    usage_model = UsageModel(db)
+    # SDS files and images are stored once per distinct file, outside the
+    # database file
+    blob_store = BlobStoreModel(db)
+    # Reagent and usage lists can be large, keep their rows compact
+    identity_model = IdentityModel(db, compact_rows=True, blob_store=blob_store)
+    identity_model.migrate_inline_blobs()
+    # The payload files are not covered by database transactions: settle the
+    # reference counts and drop files left by interrupted saves
+    identity_model.recount_blob_references()
+    blob_store.collect_garbage()
     supporting_materials_model = SupportingMaterialsModel(db)
+    usage_model = UsageModel(
+        db, supporting_materials_model, user_model, compact_rows=True
+    )
+    import_job_model = ImportJobModel(db)
 
     # Initialize ViewModels
     login_viewmodel = LoginViewModel(user_model)
@@ -43,6 +57,7 @@ def main():
         identity_model,
         usage_model,
         supporting_materials_model,
+        import_job_model,
     )
 
     # Initialize the main Login view
@@ -54,7 +69,14 @@ def main():
     # Show the login window
     login_view.show()
 
-    sys.exit(app.exec())
+    exit_code = app.exec()
+
+    # Drop SDS files and images no reagent refers to any more
+    blob_store.collect_garbage()
+
+    # Release pooled database connections
+    db.close()
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
@@ -1,9 +1,16 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator
 
 
 class BaseModel:
-    def __init__(self, db):
+    def __init__(self, db, compact_rows: bool = False):
+        """
+        Args:
+            db: DatabaseManager instance
+            compact_rows: Return multi-row results as CompactRow objects
+                instead of dicts to cut memory on large result sets
+        """
         self.db = db
+        self.compact_rows = compact_rows
         self.create_table()
 
     @property
@@ -13,5 +20,106 @@ class BaseModel:
     def create_table(self):
         raise NotImplementedError("SubClasses must implement create_table")
 
+    def transaction(self, immediate: bool = True):
+        """Group several model calls into one transaction, see DatabaseManager.transaction"""
+        return self.db.transaction(immediate)
+
+    # Records the one-off data migrations already run on this database
+    MIGRATIONS_TABLE = "SchemaMigrations"
+
+    def _migration_applied(self, name: str) -> bool:
+        self._execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {self.MIGRATIONS_TABLE} (
+                name TEXT PRIMARY KEY,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+        query = f"SELECT 1 FROM {self.MIGRATIONS_TABLE} WHERE name = ?"
+        return self._execute(query, (name,), fetch_all=False) is not None
+
+    def _run_migration(self, name: str, migrate, *args):
+        """
+        Run a data migration once per database instead of checking for work
+        on every start. It is recorded in the same transaction as its changes,
+        so an interrupted migration runs again next time.
+
+        Returns:
+            The result of migrate(*args), None if it ran before
+        """
+        if self._migration_applied(name):
+            return None
+        with self.transaction():
+            # Another instance may have run it while this one waited for the lock
+            if self._migration_applied(name):
+                return None
+            result = migrate(*args)
+            self._execute(
+                f"INSERT INTO {self.MIGRATIONS_TABLE} (name) VALUES (?)", (name,)
+            )
+        return result
+
+    def _add_column_if_missing(self, column: str, definition: str):
+        """Add a column to a table created by an older version of the app"""
+        columns = self._execute(f"PRAGMA table_info({self.table_name})")
+        if column not in [col["name"] for col in columns]:
+            self._execute(
+                f"ALTER TABLE {self.table_name} ADD COLUMN {column} {definition}"
+            )
+
+    def _create_index(self, name: str, columns: str):
+        """Create a secondary index, also adding it to databases created before it existed"""
+        self._execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {self.table_name} ({columns})"
+        )
+
     def _execute(self, query: str, params: tuple = (), fetch_all: bool = True):
-        return self.db.execute(query, params, fetch_all)
+        return self.db.execute(query, params, fetch_all, self.compact_rows)
+
+    def _iter_query(
+        self, query: str, params: tuple = (), arraysize: int = 256
+    ) -> Iterator[Dict[str, Any]]:
+        return self.db.iter_query(query, params, arraysize, self.compact_rows)
+
+    def _execute_many(self, query: str, params_seq) -> Dict[str, Any]:
+        return self.db.execute_many(query, params_seq)
+
+    def _update_many(
+        self, updates: List[Dict[str, Any]], valid_fields: List[str]
+    ) -> Dict[str, Any]:
+        """
+        Apply many partial updates, each a dict holding "id" plus the columns
+        to change. Rows changing the same set of columns share one statement.
+
+        Returns:
+            Dict with "succeeded" and "failed" as in DatabaseManager.execute_many;
+            failed indexes refer to positions in updates
+        """
+        groups = {}
+        failed = []
+        for index, update in enumerate(updates):
+            fields = tuple(f for f in update if f in valid_fields)
+            if "id" not in update or not fields:
+                failed.append(
+                    {"index": index, "params": update, "error": "Nothing to update"}
+                )
+                continue
+            groups.setdefault(fields, []).append(index)
+
+        succeeded = 0
+        with self.transaction():
+            for fields, indexes in groups.items():
+                set_clause = ", ".join(f"{field} = ?" for field in fields)
+                query = f"UPDATE {self.table_name} SET {set_clause} WHERE id = ?"
+                params_seq = [
+                    tuple(updates[i][f] for f in fields) + (updates[i]["id"],)
+                    for i in indexes
+                ]
+                result = self._execute_many(query, params_seq)
+                succeeded += result["succeeded"]
+                for failure in result["failed"]:
+                    failure["index"] = indexes[failure["index"]]
+                    failed.append(failure)
+
+        return {"succeeded": succeeded, "failed": failed}
@@ -0,0 +1,311 @@
+# models/blob_store_model.py
+from models.base_model import BaseModel
+from typing import Optional, Dict, Any, Callable, Iterator
+import hashlib
+import os
+import time
+import uuid
+
+
+class BlobStoreModel(BaseModel):
+    """
+    Content-addressed store for large payloads (SDS PDFs, images).
+
+    Payloads are kept as files named by their SHA-256 hash in a directory
+    next to the database, so identical files are stored once and the
+    database file itself stays small to back up, VACUUM and cache. The
+    Blobs table records the size and reference count of each payload; it
+    lives in the main database so counts commit atomically with the rows
+    holding the hashes. put()/release() maintain the counts and
+    collect_garbage() deletes the files nobody references.
+    """
+
+    # Prefix of the files payloads are written to before they get their name
+    TEMP_PREFIX = ".tmp-"
+    # Temporary files older than this are leftovers of an interrupted save
+    TEMP_FILE_MAX_AGE = 24 * 60 * 60
+
+    def __init__(self, db, directory: Optional[str] = None):
+        """
+        Args:
+            db: DatabaseManager instance
+            directory: Folder holding the payload files, "<database>_blobs"
+                next to the database file by default
+        """
+        self.directory = directory or (
+            os.path.splitext(os.path.abspath(db.database_path))[0] + "_blobs"
+        )
+        os.makedirs(self.directory, exist_ok=True)
+        super().__init__(db)
+
+    @property
+    def table_name(self):
+        return "Blobs"
+
+    def create_table(self):
+        query = f"""
+        CREATE TABLE IF NOT EXISTS {self.table_name} (
+            id INTEGER PRIMARY KEY,
+            hash TEXT UNIQUE NOT NULL,
+            size INTEGER NOT NULL,
+            refcount INTEGER NOT NULL DEFAULT 0
+        )
+        """
+        self._execute(query)
+
+    @staticmethod
+    def hash_of(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def path_of(self, blob_hash: str) -> str:
+        """File a payload is stored in; spread over subfolders by hash prefix"""
+        return os.path.join(self.directory, blob_hash[:2], blob_hash)
+
+    def _temp_path(self) -> str:
+        return os.path.join(self.directory, f"{self.TEMP_PREFIX}{uuid.uuid4().hex}")
+
+    def _commit_file(self, temp_path: str, blob_hash: str, size: int):
+        """
+        Give a fully written temporary file its hash name and record it. Must
+        run inside a transaction: the write lock it holds keeps
+        collect_garbage() from deleting the file before the row commits.
+        """
+        path = self.path_of(blob_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(temp_path, path)
+        query = f"""
+        INSERT INTO {self.table_name} (hash, size, refcount)
+        VALUES (?, ?, 1)
+        ON CONFLICT (hash) DO UPDATE SET refcount = refcount + 1
+        """
+        self._execute(query, (blob_hash, size))
+
+    def put(self, data: Optional[bytes]) -> Optional[str]:
+        """
+        Store a payload (or reuse the identical one already stored) and take
+        a reference to it
+
+        Args:
+            data: The payload; None is passed through
+
+        Returns:
+            str: The payload hash to keep in the referencing row, or None
+        """
+        if data is None:
+            return None
+        blob_hash = self.hash_of(data)
+        with self.transaction():
+            if self.acquire(blob_hash):
+                return blob_hash  # Already stored, no need to write it again
+
+            temp_path = self._temp_path()
+            try:
+                with open(temp_path, "wb") as target:
+                    target.write(data)
+                    target.flush()
+                    os.fsync(target.fileno())
+                self._commit_file(temp_path, blob_hash, len(data))
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+        return blob_hash
+
+    def put_file(
+        self,
+        path: str,
+        chunk_size: Optional[int] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> str:
+        """
+        Store a payload straight from a file, streaming it in chunks so large
+        files (scanned SDS bundles) are never read into memory at once
+
+        The file is copied to a temporary file while it is hashed; if an
+        identical payload turns out to be stored already, the copy is dropped
+        and a reference to the existing one is taken instead.
+
+        Args:
+            path: File to store
+            chunk_size: Bytes copied per step, DatabaseManager.BLOB_CHUNK_SIZE by default
+            progress: Called with (bytes_done, bytes_total) after each chunk
+
+        Returns:
+            str: The payload hash to keep in the referencing row
+        """
+        chunk_size = chunk_size or self.db.BLOB_CHUNK_SIZE
+        size = os.path.getsize(path)
+        digest = hashlib.sha256()
+        temp_path = self._temp_path()
+        try:
+            with open(path, "rb") as source, open(temp_path, "wb") as target:
+                written = 0
+                while written < size:
+                    chunk = source.read(min(chunk_size, size - written))
+                    if not chunk:
+                        raise ValueError(f"{path} ended after {written} of {size} bytes")
+                    target.write(chunk)
+                    digest.update(chunk)
+                    written += len(chunk)
+                    if progress:
+                        progress(written, size)
+                target.flush()
+                os.fsync(target.fileno())
+
+            blob_hash = digest.hexdigest()
+            with self.transaction():
+                if not self.acquire(blob_hash):
+                    self._commit_file(temp_path, blob_hash, size)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return blob_hash
+
+    def recount_references(self, references) -> int:
+        """
+        Set every reference count from the rows that hold payload hashes, in
+        case counts were ever left inconsistent
+
+        Args:
+            references: (table, column) pairs holding payload hashes
+
+        Returns:
+            int: Number of payloads whose count changed
+        """
+        hashes = " UNION ALL ".join(
+            f"SELECT {column} AS hash FROM {table} WHERE {column} IS NOT NULL"
+            for table, column in references
+        )
+        with self.transaction():
+            unreferenced = self._execute(
+                f"""
+                UPDATE {self.table_name} SET refcount = 0
+                WHERE refcount != 0 AND hash NOT IN (SELECT hash FROM ({hashes}))
+                """
+            )
+            referenced = self._execute(
+                f"""
+                UPDATE {self.table_name} SET refcount = counts.n
+                FROM (SELECT hash, COUNT(*) AS n FROM ({hashes}) GROUP BY hash) AS counts
+                WHERE {self.table_name}.hash = counts.hash
+                    AND {self.table_name}.refcount != counts.n
+                """
+            )
+        return unreferenced + referenced
+
+    def acquire(self, blob_hash: Optional[str]) -> bool:
+        """Take an extra reference to an already stored payload"""
+        if not blob_hash:
+            return False
+        query = f"UPDATE {self.table_name} SET refcount = refcount + 1 WHERE hash = ?"
+        return self._execute(query, (blob_hash,)) > 0
+
+    def release(self, blob_hash: Optional[str]) -> bool:
+        """Drop a reference; the payload is deleted by collect_garbage()"""
+        if not blob_hash:
+            return False
+        query = f"""
+        UPDATE {self.table_name} SET refcount = MAX(refcount - 1, 0) WHERE hash = ?
+        """
+        return self._execute(query, (blob_hash,)) > 0
+
+    def get(self, blob_hash: Optional[str]) -> Optional[bytes]:
+        if not blob_hash:
+            return None
+        try:
+            with open(self.path_of(blob_hash), "rb") as source:
+                return source.read()
+        except FileNotFoundError:
+            return None
+
+    def iter_chunks(
+        self,
+        blob_hash: str,
+        chunk_size: Optional[int] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Iterator[bytes]:
+        """Yield a stored payload in chunks; yields nothing if it is not stored"""
+        chunk_size = chunk_size or self.db.BLOB_CHUNK_SIZE
+        try:
+            source = open(self.path_of(blob_hash), "rb")
+        except FileNotFoundError:
+            return
+        with source:
+            size = os.fstat(source.fileno()).st_size
+            done = 0
+            while done < size:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                done += len(chunk)
+                if progress:
+                    progress(done, size)
+                yield chunk
+
+    def export_to_file(
+        self,
+        blob_hash: str,
+        path: str,
+        chunk_size: Optional[int] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> bool:
+        """
+        Write a stored payload to a file in chunks
+
+        Returns:
+            bool: True if the payload exists and was written, False otherwise
+        """
+        if not blob_hash or not os.path.exists(self.path_of(blob_hash)):
+            return False
+        with open(path, "wb") as target:
+            for chunk in self.iter_chunks(blob_hash, chunk_size, progress):
+                target.write(chunk)
+        return True
+
+    def get_info(self, blob_hash: str) -> Optional[Dict[str, Any]]:
+        """Get the size and reference count of a payload without its data"""
+        query = f"SELECT id, hash, size, refcount FROM {self.table_name} WHERE hash = ?"
+        return self._execute(query, (blob_hash,), fetch_all=False)
+
+    def collect_garbage(self) -> int:
+        """
+        Delete payloads that are no longer referenced, and files left behind
+        by saves that were rolled back or interrupted
+
+        Rows are deleted and committed first; files are only removed once no
+        committed row names them, while holding the write lock so no save can
+        be writing a file at the same time.
+
+        Returns:
+            int: Number of payload files deleted
+        """
+        self._execute(f"DELETE FROM {self.table_name} WHERE refcount <= 0")
+
+        removed = 0
+        now = time.time()
+        with self.transaction():
+            stored = {
+                row["hash"]
+                for row in self._iter_query(f"SELECT hash FROM {self.table_name}")
+            }
+            for entry in os.scandir(self.directory):
+                if entry.is_dir():
+                    for payload in os.scandir(entry.path):
+                        if payload.name not in stored:
+                            os.remove(payload.path)
+                            removed += 1
+                elif (
+                    entry.name.startswith(self.TEMP_PREFIX)
+                    and now - entry.stat().st_mtime > self.TEMP_FILE_MAX_AGE
+                ):
+                    os.remove(entry.path)
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Count, total size and unreferenced size of the stored payloads"""
+        query = f"""
+        SELECT COUNT(*) AS blobs,
+               COALESCE(SUM(size), 0) AS total_bytes,
+               COALESCE(SUM(CASE WHEN refcount <= 0 THEN size END), 0) AS garbage_bytes
+        FROM {self.table_name}
+        """
+        return self._execute(query, fetch_all=False)
@@ -0,0 +1,106 @@
+# models/compact_row.py
+from functools import lru_cache
+from typing import Any, Dict, Iterator, Tuple
+
+
+class CompactRow:
+    """
+    Memory-light stand-in for a row dict.
+
+    Column values live in __slots__, so a row costs about as much as a tuple
+    instead of a dict. The dict read API the viewmodels rely on (get, [],
+    in, keys, items) is kept. Keys that are not columns can still be assigned
+    (e.g. a computed "storage_name") and go to a lazily created overflow dict.
+    """
+
+    __slots__ = ("_extra",)
+
+    # Filled in by compact_row_class for each column set
+    _columns: Tuple[str, ...] = ()
+    _slot_by_column: Dict[str, str] = {}
+
+    def __init__(self, *values):
+        for slot, value in zip(self.__slots__, values):
+            setattr(self, slot, value)
+        self._extra = None
+
+    def __getitem__(self, key: str) -> Any:
+        slot = self._slot_by_column.get(key)
+        if slot is not None:
+            return getattr(self, slot)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        slot = self._slot_by_column.get(key)
+        if slot is not None:
+            setattr(self, slot, value)
+            return
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._slot_by_column or (
+            self._extra is not None and key in self._extra
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self._columns) + (len(self._extra) if self._extra else 0)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (CompactRow, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        if self._extra:
+            return list(self._columns) + list(self._extra)
+        return list(self._columns)
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the row as a regular dict"""
+        return dict(self.items())
+
+    def copy(self) -> Dict[str, Any]:
+        """Return a mutable dict copy, like dict.copy()"""
+        return self.to_dict()
+
+
+@lru_cache(maxsize=256)
+def compact_row_class(columns: Tuple[str, ...]) -> type:
+    """
+    Build (once per column set) a CompactRow subclass for a query's columns.
+
+    Slots get positional names rather than the column names so that columns
+    such as "COUNT(*)" or "get" cannot clash with identifiers or methods.
+    """
+    slots = tuple(f"_c{index}" for index in range(len(columns)))
+    return type(
+        "CompactRow",
+        (CompactRow,),
+        {
+            "__slots__": slots,
+            "_columns": columns,
+            "_slot_by_column": dict(zip(columns, slots)),
+        },
+    )
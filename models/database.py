@@ -1,36 +1,616 @@
 import sqlite3
-from typing import Optional, List, Dict, Any
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Callable
 from contextlib import contextmanager
 
+from models.compact_row import compact_row_class
+
+logger = logging.getLogger(__name__)
+
+_MODELS_DIR = os.path.dirname(os.path.abspath(__file__))
+
 
 class DatabaseManager:
-    def __init__(self, database_path: str):
+    # Named PRAGMA profiles applied to every connection when it is opened.
+    # cache_size is negative so SQLite reads it as KiB rather than pages.
+    PRAGMA_PROFILES = {
+        # Single workstation: WAL so reads never wait on a write, and
+        # synchronous=NORMAL which is still crash-safe in WAL mode
+        "desktop": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size": -65536,
+            "mmap_size": 268435456,
+            "temp_store": "MEMORY",
+            "busy_timeout": 5000,
+        },
+        # Several app instances sharing one database file. WAL needs shared
+        # memory, so every instance must run on the host that owns the file;
+        # writers wait longer for each other instead of failing with "locked"
+        "shared-file": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size": -32768,
+            "mmap_size": 0,
+            "temp_store": "MEMORY",
+            "busy_timeout": 30000,
+        },
+        # Large imports: trades durability of the last few commits for speed
+        "bulk-load": {
+            "journal_mode": "WAL",
+            "synchronous": "OFF",
+            "cache_size": -262144,
+            "mmap_size": 1073741824,
+            "temp_store": "MEMORY",
+            "busy_timeout": 60000,
+        },
+        # SQLite defaults, only the busy timeout is set
+        "default": {
+            "busy_timeout": 5000,
+        },
+    }
+
+    # Bytes moved per step by write_blob() / read_blob()
+    BLOB_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(
+        self,
+        database_path: str,
+        pool_size: int = 5,
+        pool_timeout: float = 10.0,
+        health_check_interval: float = 30.0,
+        profile: str = "desktop",
+        pragmas: Optional[Dict[str, Any]] = None,
+        instrument: bool = True,
+        slow_query_ms: float = 100.0,
+    ):
+        """
+        Args:
+            database_path: Path to the SQLite database file
+            pool_size: Maximum number of pooled connections (0 disables pooling
+                and opens a fresh connection for every query)
+            pool_timeout: Seconds to wait for a free connection when the pool
+                is exhausted
+            health_check_interval: Connections idle for longer than this many
+                seconds are pinged before being handed out again
+            profile: Name of the PRAGMA profile in PRAGMA_PROFILES
+            pragmas: Extra PRAGMA values that override the profile
+            instrument: Record timing, row and BLOB byte counts per statement
+            slow_query_ms: Statements slower than this are logged as warnings
+        """
+        if profile not in self.PRAGMA_PROFILES:
+            raise ValueError(f"Unknown PRAGMA profile: {profile}")
+
         self.database_path = database_path
+        self.profile = profile
+        self.pragmas = {**self.PRAGMA_PROFILES[profile], **(pragmas or {})}
+        self.pool_size = pool_size
+        self.pool_timeout = pool_timeout
+        self.health_check_interval = health_check_interval
+
+        self._pool = queue.LifoQueue(maxsize=pool_size) if pool_size > 0 else None
+        self._pool_lock = threading.Lock()
+        self._open_connections = 0
+        self._last_used = {}
+        # Connection currently checked out by each thread, so nested calls on
+        # the same thread reuse it instead of taking a second one from the pool
+        self._local = threading.local()
+
+        self.instrument = instrument
+        self.slow_query_ms = slow_query_ms
+        self._query_hooks: List[Callable[[Dict[str, Any]], None]] = []
+        self._query_stats: Dict[str, Dict[str, Any]] = {}
+        self._stats_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new connection configured for this manager"""
+        conn = sqlite3.connect(
+            self.database_path, check_same_thread=self._pool is None
+        )
+        conn.row_factory = sqlite3.Row
+        self._apply_pragmas(conn)
+        return conn
+
+    def _apply_pragmas(self, conn: sqlite3.Connection):
+        """Apply the configured PRAGMA profile to a fresh connection"""
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        """Ping an idle connection to make sure it is still usable"""
+        last_used = self._last_used.get(id(conn), 0)
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn: sqlite3.Connection):
+        """Close a connection and forget about it"""
+        self._last_used.pop(id(conn), None)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._pool_lock:
+            self._open_connections -= 1
+
+    def _acquire(self) -> sqlite3.Connection:
+        """Take a connection from the pool, opening a new one if allowed"""
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                with self._pool_lock:
+                    can_open = self._open_connections < self.pool_size
+                    if can_open:
+                        self._open_connections += 1
+                if can_open:
+                    try:
+                        return self._connect()
+                    except Exception:
+                        with self._pool_lock:
+                            self._open_connections -= 1
+                        raise
+                try:
+                    conn = self._pool.get(timeout=self.pool_timeout)
+                except queue.Empty:
+                    raise TimeoutError(
+                        f"No database connection available after {self.pool_timeout}s"
+                    )
+
+            if self._is_healthy(conn):
+                return conn
+            self._discard(conn)
+
+    def _release(self, conn: sqlite3.Connection):
+        """Return a connection to the pool"""
+        if conn.in_transaction:
+            # Never hand out a connection with a half-finished transaction
+            self._discard(conn)
+            return
+        self._last_used[id(conn)] = time.monotonic()
+        self._pool.put_nowait(conn)
 
     @contextmanager
     def _get_connection(self):
         """Context manager for database connections"""
-        conn = sqlite3.connect(self.database_path)
-        conn.row_factory = sqlite3.Row
+        active = getattr(self._local, "conn", None)
+        if active is not None:
+            # Already inside a connection on this thread; the outer context
+            # owns commit/rollback
+            yield active
+            return
+
+        conn = self._acquire() if self._pool is not None else self._connect()
+        self._local.conn = conn
+        self._local.after_commit = []
         try:
             yield conn
             conn.commit()
         except Exception as e:
             conn.rollback()
             raise e
+        else:
+            for callback in self._local.after_commit:
+                callback()
         finally:
-            conn.close()
+            self._local.conn = None
+            self._local.after_commit = []
+            if self._pool is not None:
+                self._release(conn)
+            else:
+                conn.close()
+
+    @contextmanager
+    def _generator_connection(self):
+        """
+        Connection for a generator such as iter_query(). Inside a transaction
+        it joins the thread's active connection; otherwise it borrows one that
+        is not registered for the thread, since a suspended generator must not
+        leave the thread's later queries running on it. The connection is
+        given back when the generator is exhausted or closed.
+        """
+        active = getattr(self._local, "conn", None)
+        if active is not None:
+            yield active
+            return
+
+        conn = self._acquire() if self._pool is not None else self._connect()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()  # Reads only; ends the read snapshot
+            if self._pool is not None:
+                self._release(conn)
+            else:
+                conn.close()
 
-    def execute(self, query: str, params: tuple = (), fetch_all: bool = True):
-        """Generic method to execute queries"""
+    def call_after_commit(self, callback: Callable[[], None]):
+        """
+        Run callback once the current thread's transaction commits, or right
+        away when no transaction is open. Callbacks of a transaction that
+        rolls back are dropped.
+        """
+        if getattr(self._local, "conn", None) is None:
+            callback()
+        else:
+            self._local.after_commit.append(callback)
+
+    @contextmanager
+    def transaction(self, immediate: bool = True):
+        """
+        Run several statements as one unit of work with a single commit.
+
+        Every execute() made on this thread inside the block (including the
+        ones issued by model methods) joins the same transaction; it is
+        committed when the block exits and rolled back if it raises.
+        Nested transaction() blocks join the outermost one.
+
+        Args:
+            immediate: Take the write lock up front (BEGIN IMMEDIATE) so reads
+                inside the block cannot be invalidated by another writer
+        """
         with self._get_connection() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            yield conn
+
+    def add_query_hook(self, hook: Callable[[Dict[str, Any]], None]):
+        """
+        Register a callback run after every instrumented statement.
+
+        The callback receives a dict with "query", "duration_ms", "rows",
+        "blob_bytes" and "caller" (the first frame outside the models package).
+        """
+        self._query_hooks.append(hook)
+
+    def remove_query_hook(self, hook: Callable[[Dict[str, Any]], None]):
+        if hook in self._query_hooks:
+            self._query_hooks.remove(hook)
+
+    def get_query_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return per-statement counters keyed by the whitespace-normalized SQL:
+        count, total_ms, max_ms, rows, blob_bytes and callers (caller -> count)
+        """
+        with self._stats_lock:
+            return {
+                query: {**stats, "callers": dict(stats["callers"])}
+                for query, stats in self._query_stats.items()
+            }
+
+    def reset_query_stats(self):
+        with self._stats_lock:
+            self._query_stats.clear()
+
+    @staticmethod
+    def _blob_size(rows) -> int:
+        """Total size of the BLOB values in a list of rows"""
+        return sum(
+            len(value) for row in rows for value in row if isinstance(value, bytes)
+        )
+
+    @staticmethod
+    def _find_caller() -> str:
+        """Describe the first stack frame outside the models package"""
+        frame = sys._getframe(2)
+        while frame is not None and frame.f_code.co_filename.startswith(_MODELS_DIR):
+            frame = frame.f_back
+        if frame is None:
+            return "unknown"
+        filename = os.path.relpath(frame.f_code.co_filename, os.path.dirname(_MODELS_DIR))
+        return f"{filename}:{frame.f_lineno} {frame.f_code.co_name}"
+
+    def _record_query(self, query: str, started: float, rows: int, blob_bytes: int):
+        """Update the counters, log slow statements and run the query hooks"""
+        duration_ms = (time.perf_counter() - started) * 1000
+        statement = " ".join(query.split())
+        caller = self._find_caller()
+
+        with self._stats_lock:
+            stats = self._query_stats.get(statement)
+            if stats is None:
+                stats = self._query_stats[statement] = {
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "rows": 0,
+                    "blob_bytes": 0,
+                    "callers": {},
+                }
+            stats["count"] += 1
+            stats["total_ms"] += duration_ms
+            stats["max_ms"] = max(stats["max_ms"], duration_ms)
+            stats["rows"] += rows
+            stats["blob_bytes"] += blob_bytes
+            stats["callers"][caller] = stats["callers"].get(caller, 0) + 1
+
+        if duration_ms >= self.slow_query_ms:
+            logger.warning(
+                "Slow query (%.1f ms, %d rows, %d blob bytes) from %s: %s",
+                duration_ms,
+                rows,
+                blob_bytes,
+                caller,
+                statement,
+            )
+
+        event = {
+            "query": statement,
+            "duration_ms": duration_ms,
+            "rows": rows,
+            "blob_bytes": blob_bytes,
+            "caller": caller,
+        }
+        for hook in list(self._query_hooks):
+            try:
+                hook(event)
+            except Exception:
+                logger.exception("Query hook %r failed", hook)
+
+    def _row_converter(self, cursor: sqlite3.Cursor, compact: bool):
+        """Return the function turning a sqlite3.Row into the result row type"""
+        if not compact:
+            return dict
+        row_class = compact_row_class(tuple(col[0] for col in cursor.description))
+        return lambda row: row_class(*row)
+
+    def iter_query(
+        self,
+        query: str,
+        params: tuple = (),
+        arraysize: int = 256,
+        compact: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the rows of a SELECT one at a time instead of building a list.
+
+        Rows are pulled from SQLite arraysize at a time with fetchmany(), so
+        memory stays bounded by one batch no matter how large the result is.
+
+        The connection and its read cursor are held until the generator is
+        exhausted or closed. Callers that may stop early (break, an exception
+        while handling a row) must close() it, e.g. with contextlib.closing(),
+        instead of leaving it half read.
+
+        Args:
+            query: SELECT statement with ? placeholders
+            params: Query parameters
+            arraysize: Number of rows fetched from SQLite per batch
+            compact: Yield CompactRow objects instead of dicts
+        """
+        started = time.perf_counter()
+        row_count = blob_bytes = 0
+        with self._generator_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query, params)
-
-            if cursor.description:  # if it's a SELECT query
-                if fetch_all:
-                    results = [dict(row) for row in cursor.fetchall()]
-                    return results if results else []
-                result = cursor.fetchone()
-                return dict(result) if result else None
-            return cursor.rowcount  # For INSERT/UPDATE/DELETE
+            cursor.arraysize = arraysize
+            try:
+                cursor.execute(query, params)
+                convert = self._row_converter(cursor, compact)
+                while True:
+                    rows = cursor.fetchmany()
+                    if not rows:
+                        break
+                    row_count += len(rows)
+                    if self.instrument:
+                        blob_bytes += self._blob_size(rows)
+                    for row in rows:
+                        yield convert(row)
+            finally:
+                cursor.close()
+                if self.instrument:
+                    self._record_query(query, started, row_count, blob_bytes)
+
+    def execute_many(
+        self, query: str, params_seq: Iterable[tuple], batch_size: int = 500
+    ) -> Dict[str, Any]:
+        """
+        Execute one statement for many parameter tuples in a single transaction.
+
+        Rows are sent through executemany() in batches. If a batch fails it is
+        replayed row by row so the good rows are still written and each bad
+        row is reported instead of aborting the whole load.
+
+        Args:
+            query: INSERT/UPDATE/DELETE statement with ? placeholders
+            params_seq: Iterable of parameter tuples, consumed lazily
+            batch_size: Number of rows per executemany() call
+
+        Returns:
+            Dict with "succeeded" (parameter rows that ran without error) and
+            "failed", a list of {"index", "params", "error"} entries for the
+            rejected rows
+        """
+        started = time.perf_counter()
+        succeeded = 0
+        failed = []
+
+        def run_batch(conn, batch, start):
+            nonlocal succeeded
+            conn.execute("SAVEPOINT execute_many_batch")
+            try:
+                conn.executemany(query, batch)
+                conn.execute("RELEASE SAVEPOINT execute_many_batch")
+                succeeded += len(batch)
+                return
+            except sqlite3.Error:
+                conn.execute("ROLLBACK TO SAVEPOINT execute_many_batch")
+                conn.execute("RELEASE SAVEPOINT execute_many_batch")
+
+            for offset, params in enumerate(batch):
+                conn.execute("SAVEPOINT execute_many_row")
+                try:
+                    conn.execute(query, params)
+                    conn.execute("RELEASE SAVEPOINT execute_many_row")
+                    succeeded += 1
+                except sqlite3.Error as e:
+                    conn.execute("ROLLBACK TO SAVEPOINT execute_many_row")
+                    conn.execute("RELEASE SAVEPOINT execute_many_row")
+                    failed.append(
+                        {"index": start + offset, "params": params, "error": str(e)}
+                    )
+
+        with self.transaction() as conn:
+            batch = []
+            start = 0
+            for params in params_seq:
+                batch.append(params)
+                if len(batch) >= batch_size:
+                    run_batch(conn, batch, start)
+                    start += len(batch)
+                    batch = []
+            if batch:
+                run_batch(conn, batch, start)
+
+        if self.instrument:
+            self._record_query(query, started, succeeded, 0)
+        return {"succeeded": succeeded, "failed": failed}
+
+    def write_blob(
+        self,
+        table: str,
+        column: str,
+        rowid: int,
+        source,
+        size: int,
+        chunk_size: int = BLOB_CHUNK_SIZE,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
+        """
+        Stream a file object into an existing BLOB with incremental BLOB I/O,
+        chunk_size bytes at a time, so the payload is never held in memory.
+
+        Incremental I/O cannot resize a BLOB: the row must already hold a
+        zeroblob(size) placeholder, typically written in the same transaction.
+
+        Args:
+            table: Table holding the BLOB
+            column: BLOB column
+            rowid: Rowid of the row to write
+            source: Binary file object to read the payload from
+            size: Number of bytes to copy, the size of the placeholder
+            chunk_size: Bytes copied per step
+            progress: Called with (bytes_done, bytes_total) after each chunk
+
+        Returns:
+            int: Number of bytes written
+        """
+        written = 0
+        with self._get_connection() as conn:
+            with conn.blobopen(table, column, rowid, readonly=False) as blob:
+                while written < size:
+                    chunk = source.read(min(chunk_size, size - written))
+                    if not chunk:
+                        raise ValueError(f"Source ended after {written} of {size} bytes")
+                    blob.write(chunk)
+                    written += len(chunk)
+                    if progress:
+                        progress(written, size)
+        return written
+
+    def read_blob(
+        self,
+        table: str,
+        column: str,
+        rowid: int,
+        chunk_size: int = BLOB_CHUNK_SIZE,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Iterator[bytes]:
+        """
+        Yield a BLOB chunk_size bytes at a time with incremental BLOB I/O.
+
+        As with iter_query() the connection is held until the generator is
+        exhausted or closed, so close() it when stopping early.
+
+        Args:
+            table: Table holding the BLOB
+            column: BLOB column
+            rowid: Rowid of the row to read
+            chunk_size: Bytes read per step
+            progress: Called with (bytes_done, bytes_total) after each chunk
+        """
+        with self._generator_connection() as conn:
+            with conn.blobopen(table, column, rowid, readonly=True) as blob:
+                size = len(blob)
+                done = 0
+                while done < size:
+                    chunk = blob.read(chunk_size)
+                    done += len(chunk)
+                    if progress:
+                        progress(done, size)
+                    yield chunk
+
+    def vacuum(self):
+        """
+        Rebuild the database file to give free pages back to the filesystem,
+        e.g. after large payloads were moved out. Must not be called inside
+        a transaction; it takes an exclusive lock while it runs.
+        """
+        if getattr(self._local, "conn", None) is not None:
+            raise RuntimeError("VACUUM cannot run inside a transaction")
+        with self._get_connection() as conn:
+            conn.execute("VACUUM")
+
+    def close(self):
+        """Close every idle pooled connection"""
+        if self._pool is None:
+            return
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                # Refresh query planner statistics for the indexes that were used
+                conn.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass
+            self._discard(conn)
+
+    def execute(
+        self,
+        query: str,
+        params: tuple = (),
+        fetch_all: bool = True,
+        compact: bool = False,
+    ):
+        """
+        Generic method to execute queries
+
+        compact=True returns CompactRow objects instead of dicts for
+        fetch_all results; single-row results are always dicts.
+        """
+        started = time.perf_counter()
+        rows = blob_bytes = 0
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+
+                if cursor.description:  # if it's a SELECT query
+                    if fetch_all:
+                        fetched = cursor.fetchall()
+                        rows = len(fetched)
+                        if self.instrument:
+                            blob_bytes = self._blob_size(fetched)
+                        convert = self._row_converter(cursor, compact)
+                        results = [convert(row) for row in fetched]
+                        return results if results else []
+                    result = cursor.fetchone()
+                    if result and self.instrument:
+                        rows, blob_bytes = 1, self._blob_size([result])
+                    return dict(result) if result else None
+                rows = cursor.rowcount
+                return cursor.rowcount  # For INSERT/UPDATE/DELETE
+        finally:
+            if self.instrument:
+                self._record_query(query, started, rows, blob_bytes)
@@ -0,0 +1,219 @@
+# models/forecast_model.py
+from datetime import date, timedelta
+from typing import Optional, Dict, List, Any, Iterable
+
+
+class ForecastModel:
+    """
+    Forecasts how fast reagents are used up and when to reorder them.
+
+    Daily usage of all reagents is read in bulk into one NumPy matrix (a row
+    per reagent, a column per day) so consumption rates are computed for
+    every reagent at once. The matrix and the forecasts are kept between
+    calls; apply() replaces just the rows of reagents that were re-read.
+    NumPy is imported only when a forecast is made.
+    """
+
+    WINDOW_DAYS = 90  # Days of usage history the forecasts look at
+    AVERAGE_DAYS = 30  # Days in the simple moving average
+    SMOOTHING = 0.1  # Exponential smoothing factor; higher follows recent days more
+    LEAD_TIME_DAYS = 7  # Days between ordering a reagent and having it in stock
+    SAFETY_FACTOR = 1.65  # Safety stock in standard deviations (~95% service level)
+
+    def __init__(self, usage_model, identity_model):
+        """
+        Args:
+            usage_model: UsageModel the history is read from
+            identity_model: IdentityModel the stock levels are read from
+        """
+        self.usage_model = usage_model
+        self.identity_model = identity_model
+
+        self.end = None  # Last day (date) the matrix covers
+        self._ids = None  # Reagent id of each matrix row
+        self._rows = {}  # Reagent id -> matrix row
+        self._daily = None  # Amount used per reagent and day, oldest day first
+        self._reagents = {}  # Reagent id -> summary row, for names and stock
+        self._forecast = {}  # Column name -> array with a value per row
+
+    @staticmethod
+    def _is_iso_date(value) -> bool:
+        try:
+            date.fromisoformat(value)
+            return len(value) == 10
+        except (TypeError, ValueError):
+            return False
+
+    @staticmethod
+    def _numpy():
+        try:
+            import numpy
+        except ImportError:
+            raise ValueError("Forecasting reagent usage requires the numpy package")
+        return numpy
+
+    def load(self, end: date, identity_ids: Optional[Iterable[int]] = None) -> Dict[str, Any]:
+        """
+        Read daily usage and stock levels; safe to run on a worker thread as
+        it does not touch the kept forecasts
+
+        Args:
+            end: Last day of the history window, normally today
+            identity_ids: Only these reagents; None for every reagent used
+                within the window
+
+        Returns:
+            Dict with "end", "full", "ids" (sorted id array), "daily" (matrix
+            with a row per id) and "reagents" (summary rows), for apply()
+        """
+        np = self._numpy()
+        start = end - timedelta(days=self.WINDOW_DAYS - 1)
+        # NumPy rejects the whole array if one date does not parse
+        totals = [
+            row
+            for row in self.usage_model.get_daily_totals(start, end, identity_ids)
+            if self._is_iso_date(row["Tanggal_Terpakai"])
+        ]
+
+        used_ids = np.array([row["id_identity"] for row in totals], dtype=np.int64)
+        days = np.array(
+            [row["Tanggal_Terpakai"] for row in totals], dtype="datetime64[D]"
+        ) - np.datetime64(start.isoformat(), "D")
+        amounts = np.array([row["Total"] or 0 for row in totals], dtype=float)
+
+        # Reagents asked for but not used in the window get an empty row
+        if identity_ids is None:
+            ids = np.unique(used_ids)
+        else:
+            ids = np.union1d(used_ids, np.array(list(identity_ids), dtype=np.int64))
+        daily = np.zeros((len(ids), self.WINDOW_DAYS))
+        np.add.at(daily, (np.searchsorted(ids, used_ids), days.astype(np.int64)), amounts)
+
+        return {
+            "end": end,
+            "full": identity_ids is None,
+            "ids": ids,
+            "daily": daily,
+            "reagents": self.identity_model.get_summaries_by_ids(ids.tolist()),
+        }
+
+    def apply(self, loaded: Dict[str, Any]):
+        """Merge what load() read into the kept forecasts and recompute those rows"""
+        np = self._numpy()
+        ids = loaded["ids"]
+        if loaded["full"] or self._ids is None:
+            self._ids = ids[:0]
+            self._rows = {}
+            self._daily = np.zeros((0, self.WINDOW_DAYS))
+            self._reagents = {}
+            self._forecast = {}
+        self.end = loaded["end"]
+
+        new_ids = [reagent_id for reagent_id in ids.tolist() if reagent_id not in self._rows]
+        if loaded["full"] or new_ids:
+            self._ids = np.concatenate((self._ids, np.array(new_ids, dtype=np.int64)))
+            self._daily = np.vstack((self._daily, np.zeros((len(new_ids), self.WINDOW_DAYS))))
+            for name, values in self._forecast.items():
+                self._forecast[name] = np.concatenate((values, np.zeros(len(new_ids))))
+            self._rows = {reagent_id: row for row, reagent_id in enumerate(self._ids.tolist())}
+
+        rows = np.array([self._rows[reagent_id] for reagent_id in ids.tolist()], dtype=np.int64)
+        self._daily[rows] = loaded["daily"]
+
+        # Reagents that were deleted have no summary row any more
+        for reagent_id in ids.tolist():
+            self._reagents.pop(reagent_id, None)
+        for reagent in loaded["reagents"]:
+            self._reagents[reagent["id"]] = reagent
+        stock = np.array(
+            [self._stock(self._reagents.get(reagent_id)) for reagent_id in ids.tolist()]
+        )
+
+        for name, values in self.forecast(loaded["daily"], stock).items():
+            if name not in self._forecast:
+                self._forecast[name] = np.zeros(len(self._ids))
+            self._forecast[name][rows] = values
+
+    @staticmethod
+    def _stock(reagent) -> float:
+        try:
+            return float(reagent.get("Stock") or 0) if reagent else 0.0
+        except (TypeError, ValueError):
+            return 0.0
+
+    def forecast(self, daily, stock) -> Dict[str, Any]:
+        """
+        Compute consumption rates and reorder points, vectorized over reagents
+
+        Args:
+            daily: Matrix of amounts used, a row per reagent and a column per
+                day of the window, oldest first
+            stock: Array with the current stock of each row
+
+        Returns:
+            Dict of arrays with a value per row: "rate" (exponentially
+            smoothed use per day), "average" (moving average per day),
+            "deviation" (of daily use), "reorder_point" and "days_left"
+            (inf for reagents that are not being used)
+        """
+        np = self._numpy()
+        days = daily.shape[1]
+        recent = daily[:, -self.AVERAGE_DAYS :]
+        average = recent.mean(axis=1)
+        deviation = recent.std(axis=1)
+
+        # Exponential smoothing over the window, as weights on the days;
+        # normalized because the window cuts off the older weights
+        weights = self.SMOOTHING * (1 - self.SMOOTHING) ** np.arange(days - 1, -1, -1)
+        rate = daily @ (weights / weights.sum())
+
+        lead_time = self.LEAD_TIME_DAYS
+        reorder_point = rate * lead_time + self.SAFETY_FACTOR * deviation * np.sqrt(
+            lead_time
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            days_left = np.where(rate > 0, np.asarray(stock, dtype=float) / rate, np.inf)
+
+        return {
+            "rate": rate,
+            "average": average,
+            "deviation": deviation,
+            "reorder_point": reorder_point,
+            "days_left": days_left,
+        }
+
+    def reorder_soon(self, within_days: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Get the reagents to reorder: those in use whose stock is at or below
+        their reorder point, or that run out within within_days
+
+        Returns:
+            List of reagent summary rows, soonest to run out first, each with
+            "daily_rate", "average_rate", "days_left" and "reorder_point"
+        """
+        if self._ids is None or not len(self._ids):
+            return []
+        np = self._numpy()
+        rate = self._forecast["rate"]
+        days_left = self._forecast["days_left"]
+        stock = np.array([self._stock(self._reagents.get(i)) for i in self._ids.tolist()])
+
+        due = stock <= self._forecast["reorder_point"]
+        if within_days is not None:
+            due |= days_left <= within_days
+        due &= rate > 0
+
+        reagents = []
+        for row in np.flatnonzero(due)[np.argsort(days_left[due], kind="stable")]:
+            reagent = self._reagents.get(int(self._ids[row]))
+            if not reagent:
+                continue
+            reagent = reagent.copy()
+            reagent.update(
+                daily_rate=float(rate[row]),
+                average_rate=float(self._forecast["average"][row]),
+                days_left=float(days_left[row]),
+                reorder_point=int(np.ceil(self._forecast["reorder_point"][row])),
+            )
+            reagents.append(reagent)
+        return reagents
@@ -1,11 +1,126 @@
 # models/identity_model.py
 from models.base_model import BaseModel
-from typing import Optional, Dict, List, Any
-from datetime import date
+from models.thumbnail_model import ThumbnailModel
+from typing import Optional, Dict, List, Any, Iterator, Callable
+from datetime import date, datetime, timedelta
 import base64
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
 
 
 class IdentityModel(BaseModel):
+    UPDATABLE_FIELDS = [
+        "Name",
+        "Description",
+        "Wujud",
+        "Stock",
+        "Massa",
+        "Tanggal_Expire",
+        "Category_Hazard",
+        "Sifat",
+        "Tanggal_Produksi",
+        "Tanggal_Pembelian",
+        "SDS",
+        "SDS_Filename",
+        "id_storage",
+        "Image",
+    ]
+
+    # Every column except the SDS and Image BLOBs, plus flags telling whether
+    # they are set, for list screens that never display the heavy payloads
+    SUMMARY_COLUMNS = """
+        id, Name, Description, Wujud, Stock, Massa, Tanggal_Expire,
+        Category_Hazard, Sifat, Tanggal_Produksi, Tanggal_Pembelian,
+        SDS_Filename, id_storage,
+        (SDS IS NOT NULL OR SDS_Hash IS NOT NULL) AS has_sds,
+        (Image IS NOT NULL OR Image_Hash IS NOT NULL) AS has_image
+    """
+
+    # Sort orders for paged listings, mapped to the column rows are ordered
+    # by (together with id). Plain columns only: an index on an expression
+    # would make SQLite refuse incremental BLOB writes to the SDS column.
+    PAGE_SORT_KEYS = {"id": "id", "Name": "Name"}
+
+    # Date columns, kept as ISO 8601 text (YYYY-MM-DD) so they sort and
+    # compare correctly as strings and the expiry index can be range-scanned
+    DATE_FIELDS = ("Tanggal_Expire", "Tanggal_Produksi", "Tanggal_Pembelian")
+
+    # Matches stored dates in that form; values that could not be normalized
+    # (e.g. ambiguous 03/04/2031) must be kept out of text comparisons
+    ISO_DATE_GLOB = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]"
+
+    # Formats accepted for dates and rewritten to YYYY-MM-DD
+    DATE_INPUT_FORMATS = (
+        "%Y-%m-%d",
+        "%Y-%m-%d %H:%M:%S",
+        "%Y/%m/%d",
+        "%d/%m/%Y",
+        "%d-%m-%Y",
+        "%d.%m.%Y",
+        "%d %b %Y",
+        "%d %B %Y",
+    )
+
+    # Day-first formats of DATE_INPUT_FORMATS; stored values in these could
+    # equally have been written month-first when both parts are <= 12
+    DAY_FIRST_FORMATS = ("%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y")
+
+    # Hazard categories in use: the levels offered by the reagent form plus
+    # the hazard classes recorded by earlier versions and imports
+    HAZARD_CATEGORIES = (
+        "None",
+        "Non-Hazardous",
+        "Low",
+        "Medium",
+        "High",
+        "Extreme",
+        "Flammable",
+        "Corrosive",
+        "Toxic",
+        "Carcinogenic",
+        "Explosive",
+        "Oxidizer",
+        "Irritant",
+    )
+
+    # Physical forms (Wujud) reagents are recorded with, and the English
+    # names earlier versions of the reagent form stored for them
+    WUJUD_TYPES = ("Padat", "Cair", "Gas", "Larutan")
+    WUJUD_SYNONYMS = {"solid": "Padat", "liquid": "Cair", "solution": "Larutan"}
+
+    # Categories not counted as hazardous in the storage statistics; any
+    # other value is
+    NON_HAZARDOUS_CATEGORIES = ("", "None", "Non-Hazardous", "Low")
+
+    # Seconds get_storage_stats() results are reused; writes made through
+    # this model clear the cache earlier, the timeout picks up date changes
+    # and writes from other app instances
+    STATS_CACHE_SECONDS = 60
+
+    # Payload columns that move to the blob store, and the hash column
+    # referencing the stored payload for each
+    PAYLOAD_HASH_COLUMNS = {"SDS": "SDS_Hash", "Image": "Image_Hash"}
+
+    def __init__(self, db, compact_rows: bool = False, blob_store=None):
+        """
+        Args:
+            db: DatabaseManager instance
+            compact_rows: Return multi-row results as CompactRow objects
+            blob_store: BlobStoreModel that keeps SDS and Image payloads out
+                of this table; without one they are stored inline
+        """
+        self.blob_store = blob_store
+        self._stats_cache = {}  # arguments -> (time computed, stats)
+        # Bumped whenever the cache is cleared, so statistics read while a
+        # write was committing are not cached
+        self._stats_generation = 0
+        self._change_listeners = []
+        super().__init__(db, compact_rows)
+        self.thumbnails = ThumbnailModel(db)
+
     @property
     def table_name(self):
         return "Identity"
@@ -28,10 +143,190 @@ class IdentityModel(BaseModel):
             SDS_Filename TEXT,
             id_storage INTEGER,
             Image BLOB,
+            SDS_Hash TEXT,
+            Image_Hash TEXT,
             FOREIGN KEY (id_storage) REFERENCES Storage(id)
         )
         """
         self._execute(query)
+        self._add_column_if_missing("SDS_Hash", "TEXT")
+        self._add_column_if_missing("Image_Hash", "TEXT")
+        self._create_index("idx_identity_storage", "id_storage")
+        self._create_index("idx_identity_expire", "Tanggal_Expire")
+        self._execute("DROP INDEX IF EXISTS idx_identity_storage_name")  # Was on an expression
+        self._create_index("idx_identity_storage_by_name", "id_storage, Name")
+        self._create_index("idx_identity_storage_expire", "id_storage, Tanggal_Expire")
+        self._run_migration("identity_iso_dates", self.normalize_stored_dates)
+        self._run_migration("identity_wujud_types", self.normalize_stored_wujud)
+
+    @classmethod
+    def normalize_date(cls, value, allow_ambiguous: bool = True):
+        """
+        Convert a date (date object or text in DATE_INPUT_FORMATS) to
+        YYYY-MM-DD text
+
+        Args:
+            value: The date to convert
+            allow_ambiguous: Read values such as 03/04/2024 day-first; if
+                False they are returned unchanged
+
+        Returns:
+            str: The normalized date, None for empty values, or the value
+            unchanged if it is not a recognizable date
+        """
+        if value is None or (isinstance(value, str) and not value.strip()):
+            return None
+        if isinstance(value, datetime):
+            return value.date().isoformat()
+        if isinstance(value, date):
+            return value.isoformat()
+        text = str(value).strip()
+        for date_format in cls.DATE_INPUT_FORMATS:
+            try:
+                parsed = datetime.strptime(text, date_format).date()
+            except ValueError:
+                continue
+            if (
+                not allow_ambiguous
+                and date_format in cls.DAY_FIRST_FORMATS
+                and parsed.day <= 12
+                and parsed.day != parsed.month
+            ):
+                return value
+            return parsed.isoformat()
+        return value
+
+    @classmethod
+    def normalize_wujud(cls, value) -> Optional[str]:
+        """
+        Map a physical form, in any case or by its English name, to its
+        WUJUD_TYPES spelling
+
+        Returns:
+            str: The WUJUD_TYPES value, None if value is not a known form
+        """
+        text = str(value).strip().lower()
+        for wujud in cls.WUJUD_TYPES:
+            if wujud.lower() == text:
+                return wujud
+        return cls.WUJUD_SYNONYMS.get(text)
+
+    def normalize_stored_wujud(self) -> int:
+        """
+        Rewrite stored forms to their WUJUD_TYPES spelling, so the reagent
+        form can show them. Unknown values are left as they are.
+
+        Returns:
+            int: Number of reagents changed
+        """
+        query = f"SELECT DISTINCT Wujud FROM {self.table_name} WHERE Wujud IS NOT NULL"
+        changed = 0
+        for row in self._execute(query):
+            wujud = self.normalize_wujud(row["Wujud"])
+            if wujud is not None and wujud != row["Wujud"]:
+                changed += self._execute(
+                    f"UPDATE {self.table_name} SET Wujud = ? WHERE Wujud = ?",
+                    (wujud, row["Wujud"]),
+                )
+        if changed:
+            self._notify_changed(None)
+        return changed
+
+    @staticmethod
+    def is_iso_date(value) -> bool:
+        """Whether value is a valid date written as YYYY-MM-DD text"""
+        if not isinstance(value, str) or len(value) != 10 or value[4] + value[7] != "--":
+            return False
+        try:
+            date.fromisoformat(value)
+        except ValueError:
+            return False
+        return True
+
+    def _normalize_dates(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of an update dict with its date columns normalized"""
+        return {
+            field: self.normalize_date(value) if field in self.DATE_FIELDS else value
+            for field, value in fields.items()
+        }
+
+    def normalize_stored_dates(self) -> int:
+        """
+        Rewrite stored dates that are not in YYYY-MM-DD form yet, e.g. rows
+        written by older versions or external tools. Values that cannot be
+        read unambiguously are left as they are and logged.
+
+        Returns:
+            int: Number of reagents changed
+        """
+        conditions = " OR ".join(
+            f"({field} IS NOT NULL AND {field} NOT GLOB '{self.ISO_DATE_GLOB}')"
+            for field in self.DATE_FIELDS
+        )
+        query = f"""
+        SELECT id, {', '.join(self.DATE_FIELDS)} FROM {self.table_name} WHERE {conditions}
+        """
+        updates = []
+        for row in self._execute(query):
+            update = {"id": row["id"]}
+            for field in self.DATE_FIELDS:
+                normalized = self.normalize_date(row[field], allow_ambiguous=False)
+                if normalized != row[field]:
+                    update[field] = normalized
+                elif normalized is not None and not self.is_iso_date(normalized):
+                    logger.warning(
+                        "Reagent %s: left %s %r unchanged, it cannot be read as a date unambiguously",
+                        row["id"],
+                        field,
+                        normalized,
+                    )
+            if len(update) > 1:
+                updates.append(update)
+
+        if updates:
+            self._update_many(updates, self.DATE_FIELDS)
+            self._notify_changed(None)
+        return len(updates)
+
+    def add_change_listener(self, listener: Callable[[Optional[List[int]]], None]):
+        """
+        Register a callback run after reagents are created, changed or deleted
+        through this model. It receives the affected ids, or None when many
+        reagents changed at once. It may run on any thread and before the
+        surrounding transaction commits, so it should only record the ids.
+        """
+        self._change_listeners.append(listener)
+
+    def remove_change_listener(self, listener: Callable[[Optional[List[int]]], None]):
+        if listener in self._change_listeners:
+            self._change_listeners.remove(listener)
+
+    def _notify_changed(self, identity_ids: Optional[List[int]]):
+        for listener in list(self._change_listeners):
+            listener(identity_ids)
+
+    def _clear_stats_cache(self):
+        self._stats_generation += 1
+        self._stats_cache.clear()
+
+    def _execute(self, query: str, params: tuple = (), fetch_all: bool = True):
+        result = super()._execute(query, params, fetch_all)
+        if not query.lstrip().upper().startswith("SELECT"):
+            # Any write may change the statistics; clearing before the commit
+            # would let a concurrent read cache the old values again
+            self.db.call_after_commit(self._clear_stats_cache)
+        return result
+
+    def _execute_many(self, query: str, params_seq) -> Dict[str, Any]:
+        result = super()._execute_many(query, params_seq)
+        self.db.call_after_commit(self._clear_stats_cache)
+        return result
+
+    @classmethod
+    def is_hazardous(cls, category: Optional[str]) -> bool:
+        """Whether a Category_Hazard value counts as hazardous"""
+        category = str(category or "").strip().lower()
+        return category not in {c.lower() for c in cls.NON_HAZARDOUS_CATEGORIES}
 
     def create(
         self,
@@ -54,68 +349,413 @@ class IdentityModel(BaseModel):
         INSERT INTO {self.table_name} (
             Name, Description, Wujud, Stock, Massa, Tanggal_Expire,
             Category_Hazard, Sifat, Tanggal_Produksi, Tanggal_Pembelian,
-            SDS, SDS_Filename, id_storage, Image
+            SDS, SDS_Filename, id_storage, Image, SDS_Hash, Image_Hash
         )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         RETURNING id
         """
-        params = (
-            name,
-            description,
-            wujud,
-            stock,
-            massa,
-            tanggal_expire,
-            category_hazard,
-            sifat,
-            tanggal_produksi,
-            tanggal_pembelian,
-            sds,
-            sds_filename,
-            id_storage,
-            image,
-        )
-        result = self._execute(query, params, fetch_all=False)
+        with self.transaction():
+            sds, sds_hash = self._store_payload(sds)
+            inline_image, image_hash = self._store_payload(image)
+            params = (
+                name,
+                description,
+                wujud,
+                stock,
+                massa,
+                self.normalize_date(tanggal_expire),
+                category_hazard,
+                sifat,
+                self.normalize_date(tanggal_produksi),
+                self.normalize_date(tanggal_pembelian),
+                sds,
+                sds_filename,
+                id_storage,
+                inline_image,
+                sds_hash,
+                image_hash,
+            )
+            result = self._execute(query, params, fetch_all=False)
+        if result:
+            self._notify_changed([result["id"]])
         return result["id"] if result else None
 
+    def create_many(self, reagents: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Insert many reagents in one transaction. Like for create(), image
+        thumbnails are made when the image is first shown.
+
+        Args:
+            reagents: Dicts keyed like the create() arguments
+
+        Returns:
+            Dict with "succeeded" count and "failed" rows (index, params, error)
+        """
+        query = f"""
+        INSERT INTO {self.table_name} (
+            Name, Description, Wujud, Stock, Massa, Tanggal_Expire,
+            Category_Hazard, Sifat, Tanggal_Produksi, Tanggal_Pembelian,
+            SDS, SDS_Filename, id_storage, Image, SDS_Hash, Image_Hash
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+
+        def params_seq():
+            for reagent in reagents:
+                sds, sds_hash = self._store_payload(reagent.get("sds"))
+                image, image_hash = self._store_payload(reagent.get("image"))
+                yield (
+                    reagent.get("name"),
+                    reagent.get("description"),
+                    reagent.get("wujud"),
+                    reagent.get("stock"),
+                    reagent.get("massa"),
+                    self.normalize_date(reagent.get("tanggal_expire")),
+                    reagent.get("category_hazard"),
+                    reagent.get("sifat"),
+                    self.normalize_date(reagent.get("tanggal_produksi")),
+                    self.normalize_date(reagent.get("tanggal_pembelian")),
+                    sds,
+                    reagent.get("sds_filename"),
+                    reagent.get("id_storage", 1),
+                    image,
+                    sds_hash,
+                    image_hash,
+                )
+
+        with self.transaction():
+            result = self._execute_many(query, params_seq())
+            if self.blob_store is not None:
+                # Rows that were rejected must not keep their payloads alive
+                for failure in result["failed"]:
+                    self.blob_store.release(failure["params"][14])
+                    self.blob_store.release(failure["params"][15])
+        if result["succeeded"]:
+            self._notify_changed(None)
+        return result
+
+    def _store_payload(self, data: Optional[bytes]):
+        """
+        Put a payload in the blob store if there is one
+
+        Returns:
+            tuple: (value for the inline column, value for the hash column)
+        """
+        if self.blob_store is None or data is None:
+            return data, None
+        return None, self.blob_store.put(data)
+
+    def _resolve_payloads(self, reagent):
+        """Fill SDS and Image from the blob store for a full reagent row"""
+        if self.blob_store is None or not reagent:
+            return reagent
+        for column, hash_column in self.PAYLOAD_HASH_COLUMNS.items():
+            if reagent.get(column) is None and reagent.get(hash_column):
+                reagent[column] = self.blob_store.get(reagent[hash_column])
+        return reagent
+
     def get_by_id(self, identity_id: int) -> Optional[Dict[str, Any]]:
         query = f"SELECT * FROM {self.table_name} WHERE id = ?"
-        return self._execute(query, (identity_id,), fetch_all=False)
+        result = self._execute(query, (identity_id,), fetch_all=False)
+        return self._resolve_payloads(result)
 
     def get_all(self) -> List[Dict[str, Any]]:
         query = f"SELECT * FROM {self.table_name}"
         result = self._execute(query)
-        return result if result else []
+        return [self._resolve_payloads(r) for r in result] if result else []
+
+    def iter_all(self, arraysize: int = 256) -> Iterator[Dict[str, Any]]:
+        """Stream every reagent without materializing the whole table"""
+        query = f"SELECT * FROM {self.table_name}"
+        return map(self._resolve_payloads, self._iter_query(query, arraysize=arraysize))
 
     def get_by_storage(self, storage_id: int) -> List[Dict[str, Any]]:
         query = f"SELECT * FROM {self.table_name} WHERE id_storage = ?"
         result = self._execute(query, (storage_id,))
+        return [self._resolve_payloads(r) for r in result] if result else []
+
+    def get_summary_by_id(self, identity_id: int) -> Optional[Dict[str, Any]]:
+        """Get a reagent without its SDS and Image BLOBs (see get_sds/get_image)"""
+        query = f"SELECT {self.SUMMARY_COLUMNS} FROM {self.table_name} WHERE id = ?"
+        return self._execute(query, (identity_id,), fetch_all=False)
+
+    def get_all_summaries(self) -> List[Dict[str, Any]]:
+        """Get every reagent without its SDS and Image BLOBs"""
+        query = f"SELECT {self.SUMMARY_COLUMNS} FROM {self.table_name}"
+        result = self._execute(query)
         return result if result else []
 
+    def iter_all_summaries(self, arraysize: int = 256) -> Iterator[Dict[str, Any]]:
+        """Stream every reagent without its SDS and Image BLOBs"""
+        query = f"SELECT {self.SUMMARY_COLUMNS} FROM {self.table_name}"
+        return self._iter_query(query, arraysize=arraysize)
+
+    def get_summaries_by_storage(self, storage_id: int) -> List[Dict[str, Any]]:
+        """Get the reagents of a storage without their SDS and Image BLOBs"""
+        query = f"SELECT {self.SUMMARY_COLUMNS} FROM {self.table_name} WHERE id_storage = ?"
+        result = self._execute(query, (storage_id,))
+        return result if result else []
+
+    def get_summaries_by_ids(self, identity_ids: List[int]) -> List[Dict[str, Any]]:
+        """Get the given reagents without their SDS and Image BLOBs; missing ids are skipped"""
+        ids = list(identity_ids)
+        results = []
+        # Stay well below SQLite's bound parameter limit
+        for start in range(0, len(ids), 500):
+            chunk = ids[start : start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            query = f"SELECT {self.SUMMARY_COLUMNS} FROM {self.table_name} WHERE id IN ({placeholders})"
+            results.extend(self._execute(query, tuple(chunk)))
+        return results
+
+    def get_expiring(
+        self,
+        before,
+        storage: Optional[int] = None,
+        limit: Optional[int] = None,
+        after=None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get reagents expiring on or before a date (including already expired
+        ones), soonest first, without their BLOBs. Served from the expiry
+        indexes, so only matching reagents are read. Expiry dates not stored
+        as YYYY-MM-DD are left out.
+
+        Args:
+            before: Last expiry date included (date or YYYY-MM-DD)
+            storage: Only reagents of this id_storage; all storages when None
+            limit: Maximum number of reagents, None for all
+            after: Only expiry dates later than this, to fetch just the
+                reagents added when before moves forward
+
+        Returns:
+            List of summary rows ordered by Tanggal_Expire, id
+        """
+        # NULL (unknown) expiry dates never match the comparison; dates that
+        # are not YYYY-MM-DD would be compared as arbitrary text
+        where = ["Tanggal_Expire <= ?", f"Tanggal_Expire GLOB '{self.ISO_DATE_GLOB}'"]
+        params = [self.normalize_date(before)]
+        if after is not None:
+            where.append("Tanggal_Expire > ?")
+            params.append(self.normalize_date(after))
+        if storage is not None:
+            where.append("id_storage = ?")
+            params.append(storage)
+        params.append(-1 if limit is None else limit)
+
+        query = f"""
+        SELECT {self.SUMMARY_COLUMNS} FROM {self.table_name}
+        WHERE {' AND '.join(where)}
+        ORDER BY Tanggal_Expire, id
+        LIMIT ?
+        """
+        result = self._execute(query, tuple(params))
+        return result if result else []
+
+    def count_by_storage(self, storage_id: int) -> int:
+        """Count the reagents of a storage"""
+        query = f"SELECT COUNT(*) AS total FROM {self.table_name} WHERE id_storage = ?"
+        result = self._execute(query, (storage_id,), fetch_all=False)
+        return result["total"] if result else 0
+
+    def get_summary_page_by_storage(
+        self,
+        storage_id: int,
+        limit: int,
+        after: Optional[tuple] = None,
+        sort: str = "Name",
+    ) -> List[Dict[str, Any]]:
+        """
+        Get one page of a storage's reagents (without BLOBs) using keyset
+        pagination: the page starts right after the row identified by
+        after instead of skipping OFFSET rows, so every page costs the same.
+
+        Args:
+            storage_id: The storage to list
+            limit: Page size
+            after: (page_key, id) of the last row of the previous page,
+                None for the first page
+            sort: One of PAGE_SORT_KEYS
+
+        Returns:
+            List of summary rows, each with an extra "page_key" column
+        """
+        if sort not in self.PAGE_SORT_KEYS:
+            raise ValueError(f"Unsupported sort key: {sort}")
+        sort_expression = self.PAGE_SORT_KEYS[sort]
+
+        where = "id_storage = ?"
+        params = [storage_id]
+        if after is not None and after[0] is None:
+            # NULLs sort first and never compare greater than anything
+            where += f" AND ({sort_expression} IS NOT NULL OR id > ?)"
+            params.append(after[1])
+        elif after is not None:
+            # The plain >= lets SQLite seek the index instead of skipping
+            # earlier rows; the row-value comparison breaks ties on id
+            where += f" AND {sort_expression} >= ? AND ({sort_expression}, id) > (?, ?)"
+            params.extend((after[0], after[0], after[1]))
+        params.append(limit)
+
+        query = f"""
+        SELECT {self.SUMMARY_COLUMNS}, {sort_expression} AS page_key
+        FROM {self.table_name}
+        WHERE {where}
+        ORDER BY {sort_expression}, id
+        LIMIT ?
+        """
+        result = self._execute(query, tuple(params))
+        return result if result else []
+
+    def get_storage_stats(
+        self, expiring_days: int = 30, low_stock: int = 1
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Get per-storage inventory statistics without loading any reagent rows.
+        Results are cached for STATS_CACHE_SECONDS or until the next write.
+
+        Args:
+            expiring_days: Reagents expiring within this many days count as
+                expiring soon
+            low_stock: Reagents with at most this much stock count as low stock
+
+        Returns:
+            Dict mapping id_storage to a dict with "reagents", "total_stock",
+            "low_stock", "hazardous", "expired", "expiring_soon" and "hazards"
+            (count per Category_Hazard)
+        """
+        cache_key = (expiring_days, low_stock)
+        cached = self._stats_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < self.STATS_CACHE_SECONDS:
+            return cached[1]
+
+        generation = self._stats_generation
+        today = date.today()
+        # Expiry dates not written as YYYY-MM-DD cannot be compared as text
+        iso_expiry = f"Tanggal_Expire GLOB '{self.ISO_DATE_GLOB}'"
+        query = f"""
+        SELECT id_storage,
+               COUNT(*) AS reagents,
+               COALESCE(SUM(Stock), 0) AS total_stock,
+               COALESCE(SUM(Stock <= ?), 0) AS low_stock,
+               COALESCE(SUM(Tanggal_Expire < ? AND {iso_expiry}), 0) AS expired,
+               COALESCE(
+                   SUM(Tanggal_Expire >= ? AND Tanggal_Expire <= ? AND {iso_expiry}), 0
+               ) AS expiring_soon
+        FROM {self.table_name}
+        GROUP BY id_storage
+        """
+        params = (
+            low_stock,
+            today.isoformat(),
+            today.isoformat(),
+            (today + timedelta(days=expiring_days)).isoformat(),
+        )
+        hazard_query = f"""
+        SELECT id_storage, COALESCE(Category_Hazard, 'None') AS hazard, COUNT(*) AS reagents
+        FROM {self.table_name}
+        GROUP BY id_storage, hazard
+        """
+        stats = {}
+        # Both queries read the same snapshot, so every storage in the hazard
+        # counts also appears in the totals
+        with self.transaction(immediate=False):
+            for row in self._execute(query, params):
+                entry = dict(row.items())
+                entry["hazards"] = {}
+                entry["hazardous"] = 0
+                stats[entry.pop("id_storage")] = entry
+
+            for row in self._execute(hazard_query):
+                entry = stats[row["id_storage"]]
+                entry["hazards"][row["hazard"]] = row["reagents"]
+                if self.is_hazardous(row["hazard"]):
+                    entry["hazardous"] += row["reagents"]
+
+        def store():
+            if generation == self._stats_generation:
+                self._stats_cache[cache_key] = (time.monotonic(), stats)
+
+        # Cache only committed data: inside an outer transaction this waits
+        # for its commit and is skipped if it rolls back
+        self.db.call_after_commit(store)
+        return stats
+
     def update(self, identity_id: int, **kwargs) -> bool:
+        kwargs = self._normalize_dates(kwargs)
+        if "Image" not in kwargs:
+            updated = self._update_payloads(identity_id, kwargs)
+        else:
+            # Thumbnails of the old image go in the same transaction; new
+            # ones are made when the image is next shown
+            with self.transaction():
+                updated = self._update_payloads(identity_id, dict(kwargs))
+                if updated:
+                    self.thumbnails.delete_for(identity_id)
+        if updated:
+            self._notify_changed([identity_id])
+        return updated
+
+    def adjust_stock(
+        self, identity_id: int, delta: int, floor: int = 0
+    ) -> Optional[int]:
+        """
+        Take an amount off a reagent's stock in one statement, so concurrent
+        usage entries for the same reagent cannot overwrite each other's
+        change. Call inside the transaction that records the usage.
+
+        Args:
+            identity_id: The reagent
+            delta: Amount used; negative to put stock back
+            floor: Lowest value the stock can drop to
+
+        Returns:
+            int: The new stock, or None if the reagent does not exist
+        """
+        query = f"""
+        UPDATE {self.table_name}
+        SET Stock = MAX(?, COALESCE(Stock, 0) - ?)
+        WHERE id = ?
+        RETURNING Stock
+        """
+        result = self._execute(query, (floor, delta, identity_id), fetch_all=False)
+        if not result:
+            return None
+        self._notify_changed([identity_id])
+        return result["Stock"]
+
+    def _update_payloads(self, identity_id: int, kwargs: Dict[str, Any]) -> bool:
+        if self.blob_store is not None and any(
+            column in kwargs for column in self.PAYLOAD_HASH_COLUMNS
+        ):
+            # Swap the payloads for blob store references atomically
+            with self.transaction():
+                current = self._execute(
+                    f"SELECT SDS_Hash, Image_Hash FROM {self.table_name} WHERE id = ?",
+                    (identity_id,),
+                    fetch_all=False,
+                )
+                if not current:
+                    return False
+                for column, hash_column in self.PAYLOAD_HASH_COLUMNS.items():
+                    if column in kwargs:
+                        new_hash = self.blob_store.put(kwargs[column])
+                        self.blob_store.release(current[hash_column])
+                        kwargs[column] = None
+                        kwargs[hash_column] = new_hash
+                return self._update_fields(identity_id, kwargs)
+        return self._update_fields(identity_id, kwargs)
+
+    def _update_fields(self, identity_id: int, fields: Dict[str, Any]) -> bool:
         # Build dynamic update query based on provided fields
         set_clauses = []
         params = []
 
-        valid_fields = [
-            "Name",
-            "Description",
-            "Wujud",
-            "Stock",
-            "Massa",
-            "Tanggal_Expire",
-            "Category_Hazard",
-            "Sifat",
-            "Tanggal_Produksi",
-            "Tanggal_Pembelian",
-            "SDS",
-            "SDS_Filename",
-            "id_storage",
-            "Image",
-        ]
-
-        for field, value in kwargs.items():
-            if field in valid_fields:
+        for field, value in fields.items():
+            if (
+                field in self.UPDATABLE_FIELDS
+                or field in self.PAYLOAD_HASH_COLUMNS.values()
+            ):
                 set_clauses.append(f"{field} = ?")
                 params.append(value)
 
@@ -127,9 +767,105 @@ class IdentityModel(BaseModel):
         query = f"UPDATE {self.table_name} SET {', '.join(set_clauses)} WHERE id = ?"
         return self._execute(query, tuple(params)) > 0
 
+    def update_many(self, updates: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Update many reagents in one transaction
+
+        Args:
+            updates: Dicts holding "id" plus the columns to change,
+                e.g. {"id": 4, "id_storage": 2} to move a reagent
+
+        Returns:
+            Dict with "succeeded" count and "failed" rows (index, params, error)
+        """
+        updates = [self._normalize_dates(update) for update in updates]
+        if not any(
+            "Image" in update
+            or (self.blob_store is not None and "SDS" in update)
+            for update in updates
+        ):
+            result = self._update_many(updates, self.UPDATABLE_FIELDS)
+            if result["succeeded"]:
+                self._notify_changed([update["id"] for update in updates if "id" in update])
+            return result
+
+        # Image changes drop thumbnails and payload changes need blob
+        # store bookkeeping, so go row by row
+        succeeded = 0
+        failed = []
+        with self.transaction():
+            for index, update in enumerate(updates):
+                fields = {k: v for k, v in update.items() if k != "id"}
+                if "id" in update and self.update(update["id"], **fields):
+                    succeeded += 1
+                else:
+                    failed.append(
+                        {"index": index, "params": update, "error": "Nothing to update"}
+                    )
+        return {"succeeded": succeeded, "failed": failed}
+
     def delete(self, identity_id: int) -> bool:
         query = f"DELETE FROM {self.table_name} WHERE id = ?"
-        return self._execute(query, (identity_id,)) > 0
+        with self.transaction():
+            self.thumbnails.delete_for(identity_id)
+            if self.blob_store is not None:
+                current = self._execute(
+                    f"SELECT SDS_Hash, Image_Hash FROM {self.table_name} WHERE id = ?",
+                    (identity_id,),
+                    fetch_all=False,
+                )
+                if current:
+                    self.blob_store.release(current["SDS_Hash"])
+                    self.blob_store.release(current["Image_Hash"])
+            deleted = self._execute(query, (identity_id,)) > 0
+        if deleted:
+            self._notify_changed([identity_id])
+        return deleted
+
+    def recount_blob_references(self) -> int:
+        """
+        Set the reference counts in the blob store from the hashes stored in
+        this table
+
+        Returns:
+            int: Number of payloads whose count changed
+        """
+        if self.blob_store is None:
+            return 0
+        return self.blob_store.recount_references(
+            [(self.table_name, column) for column in self.PAYLOAD_HASH_COLUMNS.values()]
+        )
+
+    def migrate_inline_blobs(self) -> int:
+        """
+        Move the SDS and Image payloads stored inline by older versions into
+        the blob store, once per database, then VACUUM so the database file
+        gives the space they took back to the filesystem
+
+        Returns:
+            int: Number of reagents migrated, 0 if this ran before
+        """
+        if self.blob_store is None:
+            return 0
+        migrated = self._run_migration(
+            "identity_payloads_to_blob_store", self._move_inline_payloads
+        )
+        if migrated:
+            self.db.vacuum()
+        return migrated or 0
+
+    def _move_inline_payloads(self) -> int:
+        query = f"SELECT id FROM {self.table_name} WHERE SDS IS NOT NULL OR Image IS NOT NULL"
+        reagent_ids = [row["id"] for row in self._execute(query)]
+        for identity_id in reagent_ids:
+            # One row at a time, so only one reagent's payloads are in memory
+            payloads = self._execute(
+                f"SELECT SDS, Image FROM {self.table_name} WHERE id = ?",
+                (identity_id,),
+                fetch_all=False,
+            )
+            self.update(identity_id, **{k: v for k, v in payloads.items() if v is not None})
+        return len(reagent_ids)
 
     def update_image(self, identity_id: int, image_data: bytes) -> bool:
         """
@@ -142,9 +878,8 @@ class IdentityModel(BaseModel):
         Returns:
             bool: True if update succeeded, False otherwise
         """
-        query = f"UPDATE {self.table_name} SET Image = ? WHERE id = ?"
-        params = (image_data, identity_id)
-        return self._execute(query, params) > 0
+        # update() also drops the thumbnails of the old image
+        return self.update(identity_id, Image=image_data)
 
     def get_image(self, identity_id: int) -> Optional[bytes]:
         """
@@ -156,10 +891,75 @@ class IdentityModel(BaseModel):
         Returns:
             bytes: The image data if exists, None otherwise
         """
-        query = f"SELECT Image FROM {self.table_name} WHERE id = ?"
+        query = f"SELECT Image, Image_Hash FROM {self.table_name} WHERE id = ?"
         result = self._execute(query, (identity_id,), fetch_all=False)
+        result = self._resolve_payloads(result)
         return result["Image"] if result and "Image" in result else None
 
+    def get_thumbnail(self, identity_id: int, size: int = 300) -> Optional[bytes]:
+        """
+        Get a downscaled JPEG of the reagent image, for display without
+        decoding the full-size original
+
+        Args:
+            identity_id: The ID of the reagent
+            size: Wanted longest edge in pixels; the closest stored size
+                that is at least this big is returned
+
+        Returns:
+            bytes: The thumbnail data, None if the reagent has no image, its
+            thumbnails were not made yet (see get_image_to_thumbnail) or the
+            image could not be decoded
+        """
+        return self.thumbnails.get(identity_id, size)
+
+    def get_image_to_thumbnail(self, identity_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get the image of a reagent whose thumbnails have not been made yet,
+        e.g. a new image or one saved before thumbnails existed
+
+        Returns:
+            Dict with "Image" and "Image_Hash" (pass it to store_thumbnails),
+            or None if there is no image or it was already handled
+        """
+        if self.thumbnails.exists_for(identity_id):
+            return None
+        query = f"SELECT Image, Image_Hash FROM {self.table_name} WHERE id = ?"
+        result = self._resolve_payloads(
+            self._execute(query, (identity_id,), fetch_all=False)
+        )
+        if not result or not result.get("Image"):
+            return None
+        return {"Image": result["Image"], "Image_Hash": result.get("Image_Hash")}
+
+    def store_thumbnails(
+        self, identity_id: int, thumbnails: Dict[int, bytes], image_hash: Optional[str] = None
+    ) -> bool:
+        """
+        Store thumbnails made from get_image_to_thumbnail(); an empty dict
+        records that the image could not be decoded
+
+        Args:
+            identity_id: The ID of the reagent
+            thumbnails: Size -> JPEG data
+            image_hash: Image_Hash of the image they were made from; they are
+                dropped if the image was replaced in the meantime
+
+        Returns:
+            bool: True if stored
+        """
+        with self.transaction():
+            if image_hash is not None:
+                current = self._execute(
+                    f"SELECT Image_Hash FROM {self.table_name} WHERE id = ?",
+                    (identity_id,),
+                    fetch_all=False,
+                )
+                if not current or current["Image_Hash"] != image_hash:
+                    return False
+            self.thumbnails.store(identity_id, thumbnails)
+        return True
+
     def update_sds(self, identity_id: int, sds_data: bytes, sds_filename: str) -> bool:
         """
         Update only the SDS field for a specific reagent
@@ -172,6 +972,9 @@ class IdentityModel(BaseModel):
         Returns:
             bool: True if update succeeded, False otherwise
         """
+        if self.blob_store is not None:
+            return self.update(identity_id, SDS=sds_data, SDS_Filename=sds_filename)
+
         query = f"UPDATE {self.table_name} SET SDS = ?, SDS_Filename = ? WHERE id = ?"
         params = (sds_data, sds_filename, identity_id)
         return self._execute(query, params) > 0
@@ -186,8 +989,10 @@ class IdentityModel(BaseModel):
         Returns:
             Dict containing the SDS data and filename if it exists, None otherwise
         """
-        query = f"SELECT SDS, SDS_Filename FROM {self.table_name} WHERE id = ?"
-        result = self._execute(query, (identity_id,), fetch_all=False)
+        query = f"SELECT SDS, SDS_Filename, SDS_Hash FROM {self.table_name} WHERE id = ?"
+        result = self._resolve_payloads(
+            self._execute(query, (identity_id,), fetch_all=False)
+        )
         if not result or not result["SDS"]:
             return None
 
@@ -195,3 +1000,124 @@ class IdentityModel(BaseModel):
             "data": result["SDS"],
             "filename": result["SDS_Filename"] or "safety_data_sheet.pdf",
         }
+
+    def get_sds_info(self, identity_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get the SDS filename and size without loading the PDF itself
+
+        Args:
+            identity_id: The ID of the reagent
+
+        Returns:
+            Dict with "filename" and "size" if an SDS exists, None otherwise
+        """
+        query = f"""
+        SELECT SDS_Filename, SDS_Hash, length(SDS) AS size
+        FROM {self.table_name} WHERE id = ?
+        """
+        result = self._execute(query, (identity_id,), fetch_all=False)
+        if not result:
+            return None
+
+        size = result["size"]
+        if not size and result["SDS_Hash"] and self.blob_store is not None:
+            info = self.blob_store.get_info(result["SDS_Hash"])
+            size = info["size"] if info else None
+        if not size:
+            return None
+
+        return {
+            "filename": result["SDS_Filename"] or "safety_data_sheet.pdf",
+            "size": size,
+        }
+
+    def update_sds_from_file(
+        self,
+        identity_id: int,
+        file_path: str,
+        sds_filename: Optional[str] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> bool:
+        """
+        Replace the SDS of a reagent with the contents of a file, streamed in
+        fixed-size chunks so large scanned PDFs are never held in memory
+
+        Args:
+            identity_id: The ID of the reagent
+            file_path: Path of the PDF to store
+            sds_filename: Filename to record, the basename of file_path by default
+            progress: Called with (bytes_done, bytes_total) after each chunk
+
+        Returns:
+            bool: True if update succeeded, False otherwise
+        """
+        sds_filename = sds_filename or os.path.basename(file_path)
+        with self.transaction():
+            current = self._execute(
+                f"SELECT SDS_Hash FROM {self.table_name} WHERE id = ?",
+                (identity_id,),
+                fetch_all=False,
+            )
+            if not current:
+                return False
+
+            if self.blob_store is not None:
+                sds_hash = self.blob_store.put_file(file_path, progress=progress)
+                self.blob_store.release(current["SDS_Hash"])
+                return self._update_fields(
+                    identity_id,
+                    {"SDS": None, "SDS_Hash": sds_hash, "SDS_Filename": sds_filename},
+                )
+
+            # Inline storage: size the BLOB first, then fill it in place
+            size = os.path.getsize(file_path)
+            self._execute(
+                f"UPDATE {self.table_name} SET SDS = zeroblob(?), SDS_Filename = ? WHERE id = ?",
+                (size, sds_filename, identity_id),
+            )
+            with open(file_path, "rb") as source:
+                self.db.write_blob(
+                    self.table_name, "SDS", identity_id, source, size, progress=progress
+                )
+            return True
+
+    def export_sds(
+        self,
+        identity_id: int,
+        file_path: str,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Optional[str]:
+        """
+        Write the SDS of a reagent to a file, streamed in fixed-size chunks
+
+        Args:
+            identity_id: The ID of the reagent
+            file_path: Destination path
+            progress: Called with (bytes_done, bytes_total) after each chunk
+
+        Returns:
+            str: The recorded SDS filename if an SDS was written, None otherwise
+        """
+        query = f"""
+        SELECT SDS_Filename, SDS_Hash, SDS IS NOT NULL AS has_inline
+        FROM {self.table_name} WHERE id = ?
+        """
+        result = self._execute(query, (identity_id,), fetch_all=False)
+        if not result:
+            return None
+
+        if result["has_inline"]:
+            with open(file_path, "wb") as target:
+                for chunk in self.db.read_blob(
+                    self.table_name, "SDS", identity_id, progress=progress
+                ):
+                    target.write(chunk)
+        elif not (
+            self.blob_store is not None
+            and self.blob_store.export_to_file(
+                result["SDS_Hash"], file_path, progress=progress
+            )
+        ):
+            return None
+
+        return result["SDS_Filename"] or "safety_data_sheet.pdf"
@@ -0,0 +1,123 @@
+# models/import_job_model.py
+from models.base_model import BaseModel
+from typing import Optional, Dict, Any
+
+
+class ImportJobModel(BaseModel):
+    """
+    Progress of bulk reagent imports. The checkpoint is written in the same
+    transaction as each imported batch, so an interrupted import can resume
+    after the last committed row instead of starting over or duplicating rows.
+    """
+
+    # Jobs in these states stopped before the end of their file
+    RESUMABLE_STATUSES = ("running", "cancelled", "failed")
+
+    @property
+    def table_name(self):
+        return "ImportJobs"
+
+    def create_table(self):
+        query = f"""
+        CREATE TABLE IF NOT EXISTS {self.table_name} (
+            id INTEGER PRIMARY KEY,
+            Source TEXT NOT NULL,
+            Source_Hash TEXT NOT NULL,
+            Mapping TEXT,
+            Default_Storage INTEGER,
+            Status TEXT NOT NULL DEFAULT 'running',
+            Rows_Done INTEGER NOT NULL DEFAULT 0,
+            Rows_Imported INTEGER NOT NULL DEFAULT 0,
+            Rows_Rejected INTEGER NOT NULL DEFAULT 0,
+            Started_At TEXT DEFAULT CURRENT_TIMESTAMP,
+            Updated_At TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+        self._execute(query)
+        self._create_index("idx_import_jobs_source_hash", "Source_Hash")
+
+    def create(
+        self,
+        source: str,
+        source_hash: str,
+        mapping: str = None,
+        default_storage: int = None,
+    ) -> int:
+        """
+        Start a new import job
+
+        Args:
+            source: Path of the imported file
+            source_hash: SHA-256 of the file contents, identifies it on resume
+            mapping: JSON column mapping the job uses
+            default_storage: Storage for rows without a storage column
+
+        Returns:
+            int: The job id
+        """
+        query = f"""
+        INSERT INTO {self.table_name} (Source, Source_Hash, Mapping, Default_Storage)
+        VALUES (?, ?, ?, ?)
+        RETURNING id
+        """
+        result = self._execute(
+            query, (source, source_hash, mapping, default_storage), fetch_all=False
+        )
+        return result["id"] if result else None
+
+    def get_by_id(self, job_id: int) -> Optional[Dict[str, Any]]:
+        query = f"SELECT * FROM {self.table_name} WHERE id = ?"
+        return self._execute(query, (job_id,), fetch_all=False)
+
+    def find_resumable(self, source_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the newest unfinished job for a file
+
+        Args:
+            source_hash: SHA-256 of the file contents
+
+        Returns:
+            Dict with the job row, or None if the file has no unfinished job
+        """
+        placeholders = ", ".join("?" for _ in self.RESUMABLE_STATUSES)
+        query = f"""
+        SELECT * FROM {self.table_name}
+        WHERE Source_Hash = ? AND Status IN ({placeholders})
+        ORDER BY id DESC
+        LIMIT 1
+        """
+        return self._execute(
+            query, (source_hash,) + self.RESUMABLE_STATUSES, fetch_all=False
+        )
+
+    def record_batch(
+        self, job_id: int, rows_done: int, imported: int, rejected: int
+    ) -> bool:
+        """
+        Move the checkpoint past a batch; call inside the batch's transaction
+
+        Args:
+            job_id: The job
+            rows_done: Source data rows handled so far, including this batch
+            imported: Reagents inserted by this batch
+            rejected: Rows of this batch that failed validation or insertion
+        """
+        query = f"""
+        UPDATE {self.table_name}
+        SET Rows_Done = ?,
+            Rows_Imported = Rows_Imported + ?,
+            Rows_Rejected = Rows_Rejected + ?,
+            Updated_At = CURRENT_TIMESTAMP
+        WHERE id = ?
+        """
+        self._execute(query, (rows_done, imported, rejected, job_id))
+        return True
+
+    def set_status(self, job_id: int, status: str) -> bool:
+        query = f"""
+        UPDATE {self.table_name}
+        SET Status = ?, Updated_At = CURRENT_TIMESTAMP
+        WHERE id = ?
+        """
+        self._execute(query, (status, job_id))
+        return True
@@ -27,6 +27,20 @@ class StorageModel(BaseModel):
         result = self._execute(query, (name, level), fetch_all=False)
         return result["id"] if result else None
 
+    def create_many(self, storages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Insert many storages in one transaction
+
+        Args:
+            storages: Dicts with "name" and "level"
+
+        Returns:
+            Dict with "succeeded" count and "failed" rows (index, params, error)
+        """
+        query = f"INSERT INTO {self.table_name} (Name, Level) VALUES (?, ?)"
+        params_seq = ((s.get("name"), s.get("level")) for s in storages)
+        return self._execute_many(query, params_seq)
+
     def get_by_id(self, storage_id: int) -> Optional[Dict[str, Any]]:
         query = f"SELECT * FROM {self.table_name} WHERE id = ?"
         return self._execute(query, (storage_id,), fetch_all=False)
@@ -4,6 +4,16 @@ from typing import Optional, Dict, List, Any
 
 
 class SupportingMaterialsModel(BaseModel):
+    def __init__(self, db, compact_rows: bool = False):
+        """
+        Args:
+            db: DatabaseManager instance
+            compact_rows: Return multi-row results as CompactRow objects
+        """
+        # (table, column) pairs holding material ids, see add_reference()
+        self._references = []
+        super().__init__(db, compact_rows)
+
     @property
     def table_name(self):
         return "SupportingMaterials"
@@ -16,6 +26,8 @@ class SupportingMaterialsModel(BaseModel):
         )
         """
         self._execute(query)
+        # Case-insensitive lookups in get_by_name use this index
+        self._create_index("idx_supporting_materials_name_nocase", "name COLLATE NOCASE")
 
     def create(self, name: str) -> int:
         """
@@ -42,12 +54,32 @@ class SupportingMaterialsModel(BaseModel):
         result = self._execute(query, params, fetch_all=False)
         return result["id"] if result else None
 
+    def create_many(self, names: List[str]) -> Dict[str, Any]:
+        """
+        Insert many supporting materials in one transaction, skipping names
+        that already exist
+
+        Args:
+            names: Supporting material names
+
+        Returns:
+            Dict with "succeeded" count and "failed" rows (index, params, error)
+        """
+        query = f"""
+        INSERT INTO {self.table_name} (name)
+        SELECT ?1
+        WHERE NOT EXISTS (
+            SELECT 1 FROM {self.table_name} WHERE name = ?1 COLLATE NOCASE
+        )
+        """
+        return self._execute_many(query, ((name,) for name in names))
+
     def get_by_id(self, material_id: int) -> Optional[Dict[str, Any]]:
         query = f"SELECT * FROM {self.table_name} WHERE id = ?"
         return self._execute(query, (material_id,), fetch_all=False)
 
     def get_by_name(self, name: str) -> Optional[Dict[str, Any]]:
-        query = f"SELECT * FROM {self.table_name} WHERE LOWER(name) = LOWER(?)"
+        query = f"SELECT * FROM {self.table_name} WHERE name = ? COLLATE NOCASE"
         return self._execute(query, (name,), fetch_all=False)
 
     def get_all(self) -> List[Dict[str, Any]]:
@@ -59,6 +91,38 @@ class SupportingMaterialsModel(BaseModel):
         query = f"UPDATE {self.table_name} SET name = ? WHERE id = ?"
         return self._execute(query, (name, material_id)) > 0
 
+    def add_reference(self, table: str, column: str):
+        """
+        Register a column that refers to supporting materials by id, so
+        delete() keeps the materials it still refers to
+
+        Args:
+            table: Table holding the column
+            column: Column holding material ids
+        """
+        if (table, column) not in self._references:
+            self._references.append((table, column))
+
+    def is_referenced(self, material_id: int) -> bool:
+        """Whether any registered column still refers to a material"""
+        for table, column in self._references:
+            query = f"SELECT 1 FROM {table} WHERE {column} = ? LIMIT 1"
+            if self._execute(query, (material_id,), fetch_all=False):
+                return True
+        return False
+
     def delete(self, material_id: int) -> bool:
+        """
+        Delete a supporting material no usage row refers to
+
+        Args:
+            material_id: The material to delete
+
+        Returns:
+            bool: True if deleted, False if it does not exist or is still in use
+        """
         query = f"DELETE FROM {self.table_name} WHERE id = ?"
-        return self._execute(query, (material_id,)) > 0
+        with self.transaction():
+            if self.is_referenced(material_id):
+                return False
+            return self._execute(query, (material_id,)) > 0
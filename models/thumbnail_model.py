@@ -0,0 +1,83 @@
+# models/thumbnail_model.py
+from models.base_model import BaseModel
+from typing import Optional, Dict
+
+
+class ThumbnailModel(BaseModel):
+    """
+    Downscaled copies of reagent images, one row per reagent and size, so
+    screens can show an image without decoding the full-size original.
+    The images are decoded by the caller (see
+    viewmodels/thumbnail_generator.py); this model only stores the results.
+    """
+
+    # Longest edge in pixels of the generated thumbnails; the detail panel
+    # shows images up to 300 px wide, 600 covers high-DPI screens
+    SIZES = (128, 300, 600)
+
+    # Size of the empty row recording that an image could not be decoded,
+    # so it is not decoded again every time the reagent is opened
+    UNREADABLE = 0
+
+    @property
+    def table_name(self):
+        return "Thumbnails"
+
+    def create_table(self):
+        query = f"""
+        CREATE TABLE IF NOT EXISTS {self.table_name} (
+            id_identity INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            data BLOB NOT NULL,
+            PRIMARY KEY (id_identity, size),
+            FOREIGN KEY (id_identity) REFERENCES Identity(id)
+        )
+        """
+        self._execute(query)
+
+    def store(self, identity_id: int, thumbnails: Dict[int, bytes]) -> int:
+        """
+        Replace the thumbnails of a reagent
+
+        Args:
+            identity_id: The ID of the reagent
+            thumbnails: Size -> JPEG data; empty to record that the image
+                could not be decoded
+
+        Returns:
+            int: Number of thumbnails stored
+        """
+        rows = [(identity_id, size, data) for size, data in thumbnails.items()]
+        with self.transaction():
+            self.delete_for(identity_id)
+            self._execute_many(
+                f"INSERT INTO {self.table_name} (id_identity, size, data) VALUES (?, ?, ?)",
+                rows or [(identity_id, self.UNREADABLE, b"")],
+            )
+        return len(rows)
+
+    def get(self, identity_id: int, size: int) -> Optional[bytes]:
+        """
+        Get the smallest stored thumbnail at least size pixels, or the largest
+        one if none is big enough
+
+        Returns:
+            bytes: JPEG thumbnail data, None if the reagent has no thumbnails
+        """
+        query = f"""
+        SELECT data FROM {self.table_name}
+        WHERE id_identity = ? AND size != {self.UNREADABLE}
+        ORDER BY size < ?, CASE WHEN size >= ? THEN size ELSE -size END
+        LIMIT 1
+        """
+        result = self._execute(query, (identity_id, size, size), fetch_all=False)
+        return result["data"] if result else None
+
+    def exists_for(self, identity_id: int) -> bool:
+        """Whether thumbnails (or the unreadable marker) were stored for a reagent"""
+        query = f"SELECT 1 FROM {self.table_name} WHERE id_identity = ? LIMIT 1"
+        return self._execute(query, (identity_id,), fetch_all=False) is not None
+
+    def delete_for(self, identity_id: int) -> int:
+        query = f"DELETE FROM {self.table_name} WHERE id_identity = ?"
+        return self._execute(query, (identity_id,))
@@ -1,14 +1,93 @@
 # models/usage_model.py
 from models.base_model import BaseModel
-from typing import Optional, Dict, List, Any
+from models.supporting_materials_model import SupportingMaterialsModel
+from models.user_model import UserModel
+from typing import Optional, Dict, List, Any, Iterator, Callable
 from datetime import date
 
 
 class UsageModel(BaseModel):
+    UPDATABLE_FIELDS = [
+        "Tanggal_Terpakai",
+        "Jumlah_Terpakai",
+        "User",
+        "Bahan_Pendukung",
+        "id_identity",
+        "id_bahan_pendukung",
+        "id_user",
+    ]
+
+    # Usage history is listed newest first by this key (together with id);
+    # NULL dates are folded so keyset comparisons work
+    DATE_KEY = "COALESCE(Tanggal_Terpakai, '')"
+
+    # Per-reagent totals kept up to date by triggers on Usage, so the detail
+    # panel does not have to read a reagent's whole usage history
+    SUMMARY_TABLE = "UsageSummary"
+    SUMMARY_TRIGGERS = (
+        "trg_usage_summary_insert",
+        "trg_usage_summary_delete",
+        "trg_usage_summary_update",
+    )
+
+    def __init__(
+        self,
+        db,
+        supporting_materials: SupportingMaterialsModel,
+        users: UserModel,
+        compact_rows: bool = False,
+    ):
+        """
+        Args:
+            db: DatabaseManager instance
+            supporting_materials: SupportingMaterialsModel the usage rows'
+                id_bahan_pendukung refers to
+            users: UserModel the usage rows' id_user refers to
+            compact_rows: Return multi-row results as CompactRow objects
+        """
+        self.supporting_materials = supporting_materials
+        self.users = users
+        self._change_listeners = []
+        super().__init__(db, compact_rows)
+        # Foreign keys are not enforced; have the material model check instead
+        supporting_materials.add_reference(self.table_name, "id_bahan_pendukung")
+
     @property
     def table_name(self):
         return "Usage"
 
+    def _select_from(self, extra_columns: str = "") -> str:
+        """
+        Columns and FROM clause of usage reads; the supporting material name
+        is joined back in as Bahan_Pendukung so rows keep their old shape
+        """
+        materials = self.supporting_materials.table_name
+        return f"""
+        SELECT u.id, u.Tanggal_Terpakai, u.Jumlah_Terpakai, u.User,
+            COALESCE(m.name, u.Bahan_Pendukung, '') AS Bahan_Pendukung,
+            u.id_identity, u.id_bahan_pendukung, u.id_user{extra_columns}
+        FROM {self.table_name} u
+        LEFT JOIN {materials} m ON m.id = u.id_bahan_pendukung
+        """
+
+    def add_change_listener(self, listener: Callable[[Optional[List[int]]], None]):
+        """
+        Register a callback run after usage rows are added, changed or deleted
+        through this model. It receives the ids of the reagents whose usage
+        changed, including the one a row was moved away from. Like the
+        IdentityModel listeners it may run on any thread, so it should only
+        record the ids.
+        """
+        self._change_listeners.append(listener)
+
+    def remove_change_listener(self, listener: Callable[[Optional[List[int]]], None]):
+        if listener in self._change_listeners:
+            self._change_listeners.remove(listener)
+
+    def _notify_changed(self, identity_ids: Optional[List[int]]):
+        for listener in list(self._change_listeners):
+            listener(identity_ids)
+
     def create_table(self):
         query = f"""
         CREATE TABLE IF NOT EXISTS {self.table_name} (
@@ -22,6 +101,312 @@ class UsageModel(BaseModel):
         )
         """
         self._execute(query)
+        self._add_column_if_missing(
+            "id_bahan_pendukung",
+            f"INTEGER REFERENCES {self.supporting_materials.table_name}(id)",
+        )
+        # Serves both a reagent's whole history and date windows within it
+        self._create_index("idx_usage_identity_date", f"id_identity, {self.DATE_KEY}")
+        self._execute("DROP INDEX IF EXISTS idx_usage_identity")  # Covered by the above
+        self._add_column_if_missing(
+            "id_user", f"INTEGER REFERENCES {self.users.table_name}(id)"
+        )
+        # Name lookups only remain for unlinked rows, served by the partial
+        # index below; per-user queries go through id_user
+        self._execute("DROP INDEX IF EXISTS idx_usage_user")
+        self._create_index("idx_usage_user_date", f"id_user, {self.DATE_KEY}")
+        # Rows whose user name was not matched to an account yet
+        self._execute(
+            f"""
+            CREATE INDEX IF NOT EXISTS idx_usage_unlinked_user
+            ON {self.table_name} (User)
+            WHERE id_user IS NULL AND User IS NOT NULL
+            """
+        )
+        self._create_index(
+            "idx_usage_material_date", f"id_bahan_pendukung, {self.DATE_KEY}"
+        )
+        # Served a check the migration below no longer needs
+        self._execute("DROP INDEX IF EXISTS idx_usage_material_name")
+        self._create_summary_table()
+        # Rows written by older versions only carry the names
+        self._run_migration("usage_material_ids", self.migrate_material_names)
+        self._run_migration("usage_user_ids", self.link_user_names)
+
+    def migrate_material_names(self) -> int:
+        """
+        Replace supporting material names stored in usage rows (by older
+        versions) with references to SupportingMaterials, adding names that
+        are missing there.
+
+        Returns:
+            int: Number of usage rows migrated
+        """
+        materials = self.supporting_materials.table_name
+        with self.transaction():
+            # One entry per name, ignoring case like SupportingMaterialsModel
+            self._execute(
+                f"""
+                INSERT INTO {materials} (name)
+                SELECT MIN(Bahan_Pendukung)
+                FROM {self.table_name}
+                WHERE Bahan_Pendukung IS NOT NULL AND Bahan_Pendukung != ''
+                    AND NOT EXISTS (
+                        SELECT 1 FROM {materials} m
+                        WHERE m.name = Bahan_Pendukung COLLATE NOCASE
+                    )
+                GROUP BY Bahan_Pendukung COLLATE NOCASE
+                """
+            )
+            return self._execute(
+                f"""
+                UPDATE {self.table_name}
+                SET id_bahan_pendukung = (
+                        SELECT m.id FROM {materials} m
+                        WHERE m.name = Bahan_Pendukung COLLATE NOCASE
+                        ORDER BY m.id
+                        LIMIT 1
+                    ),
+                    Bahan_Pendukung = NULL
+                WHERE Bahan_Pendukung IS NOT NULL
+                """
+            )
+
+    def link_user_names(self) -> int:
+        """
+        Link usage rows that only carry a typed user name to the account with
+        that username or full name (ignoring case and extra spaces). Names
+        shared by several accounts or matching none are left alone; call this
+        again to retry them once new accounts exist.
+
+        Returns:
+            int: Number of usage rows linked
+        """
+        names = self._execute(
+            f"""
+            SELECT DISTINCT User FROM {self.table_name}
+            WHERE id_user IS NULL AND User IS NOT NULL
+            """
+        )
+        if not names:
+            return 0
+
+        by_name = self._accounts_by_name()
+        params_seq = []
+        for row in names:
+            user_id = by_name.get(self.normalize_user_name(row["User"]))
+            if user_id is not None:
+                params_seq.append((user_id, row["User"]))
+        if not params_seq:
+            return 0
+
+        with self.transaction():
+            linked = 0
+            for params in params_seq:
+                linked += self._execute(
+                    f"""
+                    UPDATE {self.table_name} SET id_user = ?
+                    WHERE User = ? AND id_user IS NULL
+                    """,
+                    params,
+                )
+        return linked
+
+    def find_user_id(self, name: Optional[str]) -> Optional[int]:
+        """
+        Account a typed user name refers to, matched like link_user_names()
+
+        Args:
+            name: Username or full name
+
+        Returns:
+            Optional[int]: The account id, or None if no single account matches
+        """
+        if not (name or "").strip():
+            return None
+        return self._accounts_by_name().get(self.normalize_user_name(name))
+
+    def _accounts_by_name(self) -> Dict[str, int]:
+        """Account ids keyed by normalized username and unambiguous full name"""
+        accounts = self.users.get_all()
+        by_name = {}
+        ambiguous = set()
+        for account in accounts:
+            key = self.normalize_user_name(UserModel.display_name(account))
+            if key in by_name and by_name[key] != account["id"]:
+                ambiguous.add(key)
+            by_name[key] = account["id"]
+        for key in ambiguous:
+            del by_name[key]
+        # A username is unique and wins over a full name that matches too
+        for account in accounts:
+            by_name[self.normalize_user_name(account["username"])] = account["id"]
+        return by_name
+
+    @staticmethod
+    def normalize_user_name(name: Optional[str]) -> str:
+        """User name compared ignoring case and extra spaces"""
+        return " ".join((name or "").split()).lower()
+
+    def _material_id(self, name: Optional[str], cache: Optional[dict] = None):
+        """Id of a supporting material, created if needed; None for no material"""
+        if not name:
+            return None
+        key = name.lower()
+        if cache is not None and key in cache:
+            return cache[key]
+        material_id = self.supporting_materials.create(name)
+        if cache is not None:
+            cache[key] = material_id
+        return material_id
+
+    def _resolve_material(self, fields: Dict[str, Any], cache: Optional[dict] = None):
+        """Copy of an update dict with a Bahan_Pendukung name turned into its id"""
+        if "Bahan_Pendukung" not in fields:
+            return fields
+        fields = dict(fields)
+        fields["id_bahan_pendukung"] = self._material_id(
+            fields["Bahan_Pendukung"], cache
+        )
+        fields["Bahan_Pendukung"] = None
+        return fields
+
+    def _create_summary_table(self):
+        """Create the usage summary table and its triggers, filling it on first use"""
+        self._execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {self.SUMMARY_TABLE} (
+                id_identity INTEGER PRIMARY KEY,
+                Total_Used INTEGER NOT NULL DEFAULT 0,
+                Usage_Count INTEGER NOT NULL DEFAULT 0,
+                First_Used DATE,
+                Last_Used DATE,
+                Last_User TEXT
+            )
+            """
+        )
+        existing = self._execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?",
+            (self.table_name,),
+        )
+        if {row["name"] for row in existing or []} >= set(self.SUMMARY_TRIGGERS):
+            return
+
+        with self.transaction():
+            # A new usage row only moves the totals and possibly the dates
+            self._execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_usage_summary_insert
+                AFTER INSERT ON {self.table_name}
+                BEGIN
+                    INSERT INTO {self.SUMMARY_TABLE} (
+                        id_identity, Total_Used, Usage_Count, First_Used, Last_Used, Last_User
+                    )
+                    VALUES (
+                        NEW.id_identity, COALESCE(NEW.Jumlah_Terpakai, 0), 1,
+                        NEW.Tanggal_Terpakai, NEW.Tanggal_Terpakai, NEW.User
+                    )
+                    ON CONFLICT (id_identity) DO UPDATE SET
+                        Total_Used = Total_Used + excluded.Total_Used,
+                        Usage_Count = Usage_Count + 1,
+                        First_Used = CASE
+                            WHEN First_Used IS NULL OR excluded.First_Used < First_Used
+                            THEN excluded.First_Used ELSE First_Used END,
+                        Last_Used = CASE
+                            WHEN Last_Used IS NULL OR excluded.Last_Used >= Last_Used
+                            THEN excluded.Last_Used ELSE Last_Used END,
+                        Last_User = CASE
+                            WHEN Last_Used IS NULL OR excluded.Last_Used >= Last_Used
+                            THEN excluded.Last_User ELSE Last_User END;
+                END
+                """
+            )
+            # Dates are only looked up again when the removed row held one of them
+            self._execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_usage_summary_delete
+                AFTER DELETE ON {self.table_name}
+                BEGIN
+                    UPDATE {self.SUMMARY_TABLE} SET
+                        Total_Used = Total_Used - COALESCE(OLD.Jumlah_Terpakai, 0),
+                        Usage_Count = Usage_Count - 1,
+                        First_Used = CASE
+                            WHEN OLD.Tanggal_Terpakai IS First_Used
+                            THEN {self._summary_first_used("OLD.id_identity")}
+                            ELSE First_Used END,
+                        Last_Used = CASE
+                            WHEN OLD.Tanggal_Terpakai IS Last_Used
+                            THEN {self._summary_last_used("OLD.id_identity")}
+                            ELSE Last_Used END,
+                        Last_User = CASE
+                            WHEN OLD.Tanggal_Terpakai IS Last_Used
+                            THEN {self._summary_last_user("OLD.id_identity")}
+                            ELSE Last_User END
+                    WHERE id_identity = OLD.id_identity;
+                    DELETE FROM {self.SUMMARY_TABLE}
+                    WHERE id_identity = OLD.id_identity AND Usage_Count <= 0;
+                END
+                """
+            )
+            # Edits are rare; recompute the reagents involved from their rows
+            self._execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_usage_summary_update
+                AFTER UPDATE OF Tanggal_Terpakai, Jumlah_Terpakai, User, id_identity
+                ON {self.table_name}
+                BEGIN
+                    DELETE FROM {self.SUMMARY_TABLE}
+                    WHERE id_identity IN (OLD.id_identity, NEW.id_identity);
+                    {self._summary_rebuild_query("id_identity IN (OLD.id_identity, NEW.id_identity)")};
+                END
+                """
+            )
+            self.rebuild_summaries()
+
+    def _summary_first_used(self, identity):
+        return f"""(SELECT MIN(Tanggal_Terpakai) FROM {self.table_name}
+                    WHERE id_identity = {identity})"""
+
+    def _summary_last_used(self, identity):
+        return f"""(SELECT MAX(Tanggal_Terpakai) FROM {self.table_name}
+                    WHERE id_identity = {identity})"""
+
+    def _summary_last_user(self, identity):
+        return f"""(SELECT User FROM {self.table_name}
+                    WHERE id_identity = {identity}
+                    ORDER BY Tanggal_Terpakai DESC, id DESC LIMIT 1)"""
+
+    def _summary_rebuild_query(self, condition):
+        """INSERT computing the summary rows of the reagents matching condition"""
+        return f"""
+        INSERT INTO {self.SUMMARY_TABLE} (
+            id_identity, Total_Used, Usage_Count, First_Used, Last_Used, Last_User
+        )
+        SELECT
+            u.id_identity,
+            COALESCE(SUM(u.Jumlah_Terpakai), 0),
+            COUNT(*),
+            MIN(u.Tanggal_Terpakai),
+            MAX(u.Tanggal_Terpakai),
+            {self._summary_last_user("u.id_identity")}
+        FROM {self.table_name} u
+        WHERE u.{condition}
+        GROUP BY u.id_identity
+        """
+
+    def rebuild_summaries(self) -> int:
+        """
+        Recompute the usage summary of every reagent from the usage rows,
+        e.g. after rows were changed with the triggers disabled
+
+        Returns:
+            int: Number of reagents with usage
+        """
+        with self.transaction():
+            self._execute(f"DELETE FROM {self.SUMMARY_TABLE}")
+            return self._execute(
+                self._summary_rebuild_query("id_identity IS NOT NULL")
+            )
 
     def create(
         self,
@@ -30,52 +415,297 @@ class UsageModel(BaseModel):
         user: str,
         bahan_pendukung: str,
         id_identity: int,
+        id_user: Optional[int] = None,
     ) -> int:
         query = f"""
         INSERT INTO {self.table_name} (
-            Tanggal_Terpakai, Jumlah_Terpakai, User, Bahan_Pendukung, id_identity
+            Tanggal_Terpakai, Jumlah_Terpakai, User, id_bahan_pendukung, id_identity,
+            id_user
         )
-        VALUES (?, ?, ?, ?, ?)
+        VALUES (?, ?, ?, ?, ?, ?)
         RETURNING id
         """
-        params = (tanggal_terpakai, jumlah_terpakai, user, bahan_pendukung, id_identity)
-        result = self._execute(query, params, fetch_all=False)
+        with self.transaction():
+            params = (
+                tanggal_terpakai,
+                jumlah_terpakai,
+                user,
+                self._material_id(bahan_pendukung),
+                id_identity,
+                id_user,
+            )
+            result = self._execute(query, params, fetch_all=False)
+        if result:
+            self._notify_changed([id_identity])
         return result["id"] if result else None
 
+    def create_many(self, usages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Insert many usage rows in one transaction
+
+        Args:
+            usages: Dicts keyed like the create() arguments
+
+        Returns:
+            Dict with "succeeded" count and "failed" rows (index, params, error)
+        """
+        query = f"""
+        INSERT INTO {self.table_name} (
+            Tanggal_Terpakai, Jumlah_Terpakai, User, id_bahan_pendukung, id_identity,
+            id_user
+        )
+        VALUES (?, ?, ?, ?, ?, ?)
+        """
+        material_ids = {}  # Lowercase name -> id, each name is looked up once
+        identity_ids = set()
+
+        def params_seq():
+            for usage in usages:
+                identity_ids.add(usage.get("id_identity"))
+                yield (
+                    usage.get("tanggal_terpakai"),
+                    usage.get("jumlah_terpakai"),
+                    usage.get("user"),
+                    self._material_id(usage.get("bahan_pendukung"), material_ids),
+                    usage.get("id_identity"),
+                    usage.get("id_user"),
+                )
+
+        with self.transaction():
+            result = self._execute_many(query, params_seq())
+        if result["succeeded"]:
+            self._notify_changed(sorted(identity_ids - {None}))
+        return result
+
     def get_by_id(self, usage_id: int) -> Optional[Dict[str, Any]]:
-        query = f"SELECT * FROM {self.table_name} WHERE id = ?"
+        query = f"{self._select_from()} WHERE u.id = ?"
         return self._execute(query, (usage_id,), fetch_all=False)
 
     def get_all(self) -> List[Dict[str, Any]]:
-        query = f"SELECT * FROM {self.table_name}"
+        query = self._select_from()
         result = self._execute(query)
         return result if result else []
 
     def get_by_identity(self, identity_id: int) -> List[Dict[str, Any]]:
-        query = f"SELECT * FROM {self.table_name} WHERE id_identity = ?"
+        query = f"{self._select_from()} WHERE u.id_identity = ?"
         result = self._execute(query, (identity_id,))
         return result if result else []
 
+    def iter_by_identity(
+        self, identity_id: int, arraysize: int = 256
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream the usage history of a reagent without materializing it"""
+        query = f"{self._select_from()} WHERE u.id_identity = ?"
+        return self._iter_query(query, (identity_id,), arraysize)
+
+    def get_daily_totals(
+        self, start, end, identity_ids: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the amount used per reagent and day within a date range
+
+        Args:
+            start: First date included (date or YYYY-MM-DD)
+            end: Last date included (date or YYYY-MM-DD)
+            identity_ids: Only these reagents; None for all reagents
+
+        Returns:
+            List of dicts with id_identity, Tanggal_Terpakai and Total; rows
+            whose date is not written as YYYY-MM-DD are left out
+        """
+        conditions, params = self._filter_clause(None, start, end, None, None)
+        conditions.append(
+            "Tanggal_Terpakai GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'"
+        )
+
+        def query(id_condition):
+            return f"""
+            SELECT id_identity, Tanggal_Terpakai, SUM(Jumlah_Terpakai) AS Total
+            FROM {self.table_name}
+            WHERE {" AND ".join(conditions + [id_condition])}
+            GROUP BY id_identity, Tanggal_Terpakai
+            """
+
+        if identity_ids is None:
+            result = self._execute(query("id_identity IS NOT NULL"), tuple(params))
+            return result if result else []
+
+        ids = list(identity_ids)
+        results = []
+        # Stay well below SQLite's bound parameter limit
+        for chunk_start in range(0, len(ids), 500):
+            chunk = ids[chunk_start : chunk_start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            results.extend(
+                self._execute(
+                    query(f"id_identity IN ({placeholders})"),
+                    tuple(params) + tuple(chunk),
+                )
+            )
+        return results
+
+    def get_summary(self, identity_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get the usage totals of a reagent
+
+        Returns:
+            Dict with Total_Used, Usage_Count, First_Used, Last_Used and
+            Last_User, or None if the reagent was never used
+        """
+        query = f"SELECT * FROM {self.SUMMARY_TABLE} WHERE id_identity = ?"
+        return self._execute(query, (identity_id,), fetch_all=False)
+
+    def _filter_clause(
+        self,
+        identity_id: Optional[int],
+        start,
+        end,
+        user: Optional[str],
+        bahan_pendukung: Optional[str],
+        user_id: Optional[int] = None,
+    ):
+        """WHERE conditions and parameters for the history filters"""
+        conditions = []
+        params = []
+        if identity_id is not None:
+            conditions.append("id_identity = ?")
+            params.append(identity_id)
+        if start is not None:
+            conditions.append(f"{self.DATE_KEY} >= ?")
+            params.append(start.isoformat() if isinstance(start, date) else start)
+        if end is not None:
+            conditions.append(f"{self.DATE_KEY} <= ? AND Tanggal_Terpakai IS NOT NULL")
+            params.append(end.isoformat() if isinstance(end, date) else end)
+        if user is not None:
+            conditions.append("User = ?")
+            params.append(user)
+        if user_id is not None:
+            conditions.append("id_user = ?")
+            params.append(user_id)
+        if bahan_pendukung is not None:
+            conditions.append(
+                f"""id_bahan_pendukung IN (
+                    SELECT id FROM {self.supporting_materials.table_name}
+                    WHERE name = ? COLLATE NOCASE
+                )"""
+            )
+            params.append(bahan_pendukung)
+        return conditions, params
+
+    def count(
+        self,
+        identity_id: Optional[int] = None,
+        start=None,
+        end=None,
+        user: Optional[str] = None,
+        bahan_pendukung: Optional[str] = None,
+        user_id: Optional[int] = None,
+    ) -> int:
+        """Count the usage rows matching the filters of get_page()"""
+        conditions, params = self._filter_clause(
+            identity_id, start, end, user, bahan_pendukung, user_id
+        )
+        where = " AND ".join(conditions) or "1"
+        query = f"SELECT COUNT(*) AS total FROM {self.table_name} WHERE {where}"
+        result = self._execute(query, tuple(params), fetch_all=False)
+        return result["total"] if result else 0
+
+    def get_page(
+        self,
+        identity_id: Optional[int] = None,
+        limit: int = 100,
+        after: Optional[tuple] = None,
+        start=None,
+        end=None,
+        user: Optional[str] = None,
+        bahan_pendukung: Optional[str] = None,
+        user_id: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get one page of usage history, newest first, using keyset pagination:
+        the page starts right after the row identified by after instead of
+        skipping OFFSET rows, so every page costs the same.
+
+        Args:
+            identity_id: Only this reagent's usage, None for all reagents
+            limit: Page size
+            after: (page_key, id) of the last row of the previous page,
+                None for the first page
+            start: First date included (date or YYYY-MM-DD), None for no limit
+            end: Last date included (date or YYYY-MM-DD), None for no limit
+            user: Only usage logged under this user name
+            bahan_pendukung: Only usage with this supporting material
+            user_id: Only usage logged by this user account
+
+        Returns:
+            List of usage rows, each with an extra "page_key" column
+        """
+        conditions, params = self._filter_clause(
+            identity_id, start, end, user, bahan_pendukung, user_id
+        )
+        if after is not None:
+            # The plain <= lets SQLite seek the index instead of skipping
+            # newer rows; the row-value comparison breaks ties on id
+            conditions.append(
+                f"{self.DATE_KEY} <= ? AND ({self.DATE_KEY}, u.id) < (?, ?)"
+            )
+            params.extend((after[0], after[0], after[1]))
+        params.append(limit)
+
+        query = f"""
+        {self._select_from(f", {self.DATE_KEY} AS page_key")}
+        WHERE {" AND ".join(conditions) or "1"}
+        ORDER BY {self.DATE_KEY} DESC, u.id DESC
+        LIMIT ?
+        """
+        result = self._execute(query, tuple(params))
+        return result if result else []
+
     def get_by_user(self, user: str) -> List[Dict[str, Any]]:
-        query = f"SELECT * FROM {self.table_name} WHERE User = ?"
+        query = f"{self._select_from()} WHERE u.User = ?"
         result = self._execute(query, (user,))
         return result if result else []
 
+    def get_by_user_id(self, user_id: int) -> List[Dict[str, Any]]:
+        query = f"{self._select_from()} WHERE u.id_user = ?"
+        result = self._execute(query, (user_id,))
+        return result if result else []
+
+    def get_user_totals(self, start=None, end=None) -> List[Dict[str, Any]]:
+        """
+        Get how much each user account used, optionally within a date range
+
+        Args:
+            start: First date included (date or YYYY-MM-DD), None for no limit
+            end: Last date included (date or YYYY-MM-DD), None for no limit
+
+        Returns:
+            List of dicts with id_user, Total_Used, Usage_Count and Last_Used,
+            largest total first
+        """
+        conditions, params = self._filter_clause(None, start, end, None, None)
+        conditions.insert(0, "id_user IS NOT NULL")
+        query = f"""
+        SELECT id_user,
+            COALESCE(SUM(Jumlah_Terpakai), 0) AS Total_Used,
+            COUNT(*) AS Usage_Count,
+            MAX(Tanggal_Terpakai) AS Last_Used
+        FROM {self.table_name}
+        WHERE {" AND ".join(conditions)}
+        GROUP BY id_user
+        ORDER BY Total_Used DESC
+        """
+        result = self._execute(query, tuple(params))
+        return result if result else []
+
     def update(self, usage_id: int, **kwargs) -> bool:
+        kwargs = self._resolve_material(kwargs)
         # Build dynamic update query based on provided fields
         set_clauses = []
         params = []
 
-        valid_fields = [
-            "Tanggal_Terpakai",
-            "Jumlah_Terpakai",
-            "User",
-            "Bahan_Pendukung",
-            "id_identity",
-        ]
-
         for field, value in kwargs.items():
-            if field in valid_fields:
+            if field in self.UPDATABLE_FIELDS:
                 set_clauses.append(f"{field} = ?")
                 params.append(value)
 
@@ -84,9 +714,54 @@ class UsageModel(BaseModel):
 
         params.append(usage_id)  # For the WHERE clause
 
-        query = f"UPDATE {self.table_name} SET {', '.join(set_clauses)} WHERE id = ?"
-        return self._execute(query, tuple(params)) > 0
+        query = f"""
+        UPDATE {self.table_name} SET {', '.join(set_clauses)} WHERE id = ?
+        RETURNING id_identity
+        """
+        with self.transaction():
+            # The row may move to another reagent; both totals change
+            identity_ids = self._identity_ids_of([usage_id])
+            result = self._execute(query, tuple(params), fetch_all=False)
+        if result:
+            identity_ids.add(result["id_identity"])
+            self._notify_changed(sorted(identity_ids - {None}))
+        return bool(result)
+
+    def update_many(self, updates: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Update many usage rows in one transaction
+
+        Args:
+            updates: Dicts holding "id" plus the columns to change
+
+        Returns:
+            Dict with "succeeded" count and "failed" rows (index, params, error)
+        """
+        material_ids = {}  # Lowercase name -> id, each name is looked up once
+        with self.transaction():
+            updates = [self._resolve_material(u, material_ids) for u in updates]
+            # Reagents the rows belonged to and the ones they move to
+            identity_ids = self._identity_ids_of([u["id"] for u in updates if "id" in u])
+            identity_ids.update(u["id_identity"] for u in updates if "id_identity" in u)
+            result = self._update_many(updates, self.UPDATABLE_FIELDS)
+        if result["succeeded"]:
+            self._notify_changed(sorted(identity_ids - {None}))
+        return result
+
+    def _identity_ids_of(self, usage_ids: List[int]) -> set:
+        """Reagent ids of the given usage rows"""
+        identity_ids = set()
+        # Stay well below SQLite's bound parameter limit
+        for chunk_start in range(0, len(usage_ids), 500):
+            chunk = usage_ids[chunk_start : chunk_start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            query = f"SELECT DISTINCT id_identity FROM {self.table_name} WHERE id IN ({placeholders})"
+            identity_ids.update(row["id_identity"] for row in self._execute(query, tuple(chunk)))
+        return identity_ids
 
     def delete(self, usage_id: int) -> bool:
-        query = f"DELETE FROM {self.table_name} WHERE id = ?"
-        return self._execute(query, (usage_id,)) > 0
+        query = f"DELETE FROM {self.table_name} WHERE id = ? RETURNING id_identity"
+        result = self._execute(query, (usage_id,), fetch_all=False)
+        if result:
+            self._notify_changed([result["id_identity"]])
+        return bool(result)
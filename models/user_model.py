@@ -39,6 +39,17 @@ class UserModel(BaseModel):
         query = f"SELECT * FROM {self.table_name} WHERE username = ?"
         return self._execute(query, (username,), fetch_all=False)
 
+    def get_all(self) -> List[Dict[str, Any]]:
+        query = f"SELECT * FROM {self.table_name}"
+        result = self._execute(query)
+        return result if result else []
+
+    @staticmethod
+    def display_name(user: Dict[str, Any]) -> str:
+        """Full name of a user, or the username if no name is set"""
+        name = f"{user.get('first_name') or ''} {user.get('last_name') or ''}".strip()
+        return name or user.get("username") or ""
+
     def get_all_active(self) -> List[Dict[str, Any]]:
         query = f"SELECT * FROM {self.table_name} WHERE is_active = TRUE"
         result = self._execute(query)
@@ -0,0 +1,68 @@
+# tests/conftest.py
+"""
+Shared fixtures: the models on a fresh database file per test. The model
+tests run without PyQt; viewmodel and view tests use the qt_app fixture
+and are skipped when PyQt6 is not installed.
+"""
+import os
+import sys
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Widgets are created without showing a window
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from models.database import DatabaseManager
+from models.identity_model import IdentityModel
+from models.storage_model import StorageModel
+from models.supporting_materials_model import SupportingMaterialsModel
+from models.usage_model import UsageModel
+from models.user_model import UserModel
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "test.db"))
+    yield manager
+    manager.close()
+
+
+@pytest.fixture(scope="session")
+def qt_app():
+    """Qt application for viewmodel and view tests; runs no event loop on its own"""
+    QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def identity_model(db):
+    return IdentityModel(db)
+
+
+@pytest.fixture
+def usage_model(db):
+    return UsageModel(db, SupportingMaterialsModel(db), UserModel(db))
+
+
+@pytest.fixture
+def reagent_ids(db, identity_model):
+    """Ids of a few reagents in one storage"""
+    storage_id = StorageModel(db).create("Rack A", 1)
+    return [
+        identity_model.create(
+            f"Reagent {number}",
+            "",
+            "Cair",
+            10,
+            100,
+            date(2030, 1, 1),
+            "None",
+            "",
+            date(2024, 1, 1),
+            date(2024, 2, 1),
+            id_storage=storage_id,
+        )
+        for number in range(4)
+    ]
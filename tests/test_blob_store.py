@@ -0,0 +1,140 @@
+# tests/test_blob_store.py
+"""Reference counting and garbage collection of the payload files"""
+import os
+from datetime import date
+
+import pytest
+
+from models.blob_store_model import BlobStoreModel
+from models.identity_model import IdentityModel
+from models.storage_model import StorageModel
+
+IMAGE_A = b"\x89PNG image a"
+IMAGE_B = b"\x89PNG image b"
+
+
+@pytest.fixture
+def blob_store(db, tmp_path):
+    return BlobStoreModel(db, str(tmp_path / "blobs"))
+
+
+@pytest.fixture
+def identity_model(db, blob_store):
+    return IdentityModel(db, blob_store=blob_store)
+
+
+@pytest.fixture
+def storage_id(db):
+    return StorageModel(db).create("Rack A", 1)
+
+
+def _create(identity_model, storage_id, image=None):
+    return identity_model.create(
+        "Reagent",
+        "",
+        "Padat",
+        1,
+        10,
+        date(2030, 1, 1),
+        "Low",
+        "",
+        date(2024, 1, 1),
+        date(2024, 2, 1),
+        id_storage=storage_id,
+        image=image,
+    )
+
+
+def _refcount(blob_store, data):
+    info = blob_store.get_info(blob_store.hash_of(data))
+    return info["refcount"] if info else None
+
+
+def _stored_files(blob_store):
+    return sorted(
+        name
+        for _, _, names in os.walk(blob_store.directory)
+        for name in names
+    )
+
+
+def test_identical_payloads_are_stored_once(identity_model, blob_store, storage_id):
+    first = _create(identity_model, storage_id, IMAGE_A)
+    second = _create(identity_model, storage_id, IMAGE_A)
+    assert _refcount(blob_store, IMAGE_A) == 2
+    assert _stored_files(blob_store) == [blob_store.hash_of(IMAGE_A)]
+
+    identity_model.delete(first)
+    assert blob_store.collect_garbage() == 0
+    assert identity_model.get_image(second) == IMAGE_A
+
+    identity_model.delete(second)
+    assert _refcount(blob_store, IMAGE_A) == 0
+    assert blob_store.collect_garbage() == 1
+    assert blob_store.get_info(blob_store.hash_of(IMAGE_A)) is None
+    assert _stored_files(blob_store) == []
+
+
+def test_update_releases_the_old_payload(identity_model, blob_store, storage_id):
+    identity_id = _create(identity_model, storage_id, IMAGE_A)
+    assert identity_model.update_image(identity_id, IMAGE_B)
+
+    assert _refcount(blob_store, IMAGE_A) == 0
+    assert _refcount(blob_store, IMAGE_B) == 1
+    assert blob_store.collect_garbage() == 1
+    assert _stored_files(blob_store) == [blob_store.hash_of(IMAGE_B)]
+    assert identity_model.get_image(identity_id) == IMAGE_B
+
+
+def test_failed_create_many_rows_keep_no_reference(identity_model, blob_store, storage_id):
+    rows = [
+        {"name": "Good", "id_storage": storage_id, "image": IMAGE_A},
+        # A list cannot be bound as a parameter, so this row is rejected
+        {"name": "Bad", "stock": [1], "id_storage": storage_id, "image": IMAGE_B},
+    ]
+    result = identity_model.create_many(rows)
+
+    assert result["succeeded"] == 1
+    assert [failure["index"] for failure in result["failed"]] == [1]
+    assert _refcount(blob_store, IMAGE_A) == 1
+    assert _refcount(blob_store, IMAGE_B) == 0
+    assert blob_store.collect_garbage() == 1
+    assert _stored_files(blob_store) == [blob_store.hash_of(IMAGE_A)]
+
+
+def test_rolled_back_save_leaves_no_file_behind(identity_model, blob_store, storage_id):
+    identity_id = _create(identity_model, storage_id, IMAGE_A)
+    with pytest.raises(RuntimeError):
+        with identity_model.transaction():
+            identity_model.update_image(identity_id, IMAGE_B)
+            raise RuntimeError
+
+    # The counts rolled back with the row; only the written file is left over
+    assert _refcount(blob_store, IMAGE_A) == 1
+    assert blob_store.get_info(blob_store.hash_of(IMAGE_B)) is None
+    assert blob_store.collect_garbage() == 1
+    assert _stored_files(blob_store) == [blob_store.hash_of(IMAGE_A)]
+    assert identity_model.get_image(identity_id) == IMAGE_A
+
+
+def test_recount_repairs_drifted_counts(identity_model, blob_store, storage_id):
+    _create(identity_model, storage_id, IMAGE_A)
+    _create(identity_model, storage_id, IMAGE_A)
+    blob_store.release(blob_store.hash_of(IMAGE_A))
+
+    assert identity_model.recount_blob_references() == 1
+    assert _refcount(blob_store, IMAGE_A) == 2
+
+
+def test_inline_payloads_are_migrated_once(db, blob_store, storage_id):
+    inline_id = _create(IdentityModel(db), storage_id, IMAGE_A)
+    identity_model = IdentityModel(db, blob_store=blob_store)
+
+    assert identity_model.migrate_inline_blobs() == 1
+    assert identity_model.migrate_inline_blobs() == 0
+    row = db.execute(
+        "SELECT Image, Image_Hash FROM Identity WHERE id = ?", (inline_id,), fetch_all=False
+    )
+    assert row["Image"] is None
+    assert row["Image_Hash"] == blob_store.hash_of(IMAGE_A)
+    assert identity_model.get_image(inline_id) == IMAGE_A
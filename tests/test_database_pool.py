@@ -0,0 +1,67 @@
+# tests/test_database_pool.py
+"""Connection pooling in DatabaseManager"""
+import sqlite3
+import threading
+
+import pytest
+
+from models.database import DatabaseManager
+
+
+def test_connections_are_reused(db):
+    opened = []
+    connect = db._connect
+    db._connect = lambda: opened.append(1) or connect()
+
+    for _ in range(20):
+        db.execute("SELECT 1")
+
+    assert len(opened) == 1
+
+
+def test_nested_calls_share_the_thread_connection(db):
+    with db.transaction() as conn:
+        with db._get_connection() as inner:
+            assert inner is conn
+
+
+def test_pool_size_limits_open_connections(tmp_path):
+    db = DatabaseManager(str(tmp_path / "pool.db"), pool_size=1, pool_timeout=0.2)
+    taken = threading.Event()
+    done = threading.Event()
+
+    def hold_connection():
+        with db.transaction():
+            taken.set()
+            done.wait(5)
+
+    holder = threading.Thread(target=hold_connection)
+    holder.start()
+    try:
+        taken.wait(5)
+        with pytest.raises(TimeoutError):
+            db.execute("SELECT 1")
+    finally:
+        done.set()
+        holder.join()
+    assert db.execute("SELECT 1 AS one", fetch_all=False) == {"one": 1}
+    db.close()
+
+
+def test_broken_connection_is_replaced(db):
+    db.execute("SELECT 1")
+    broken = db._pool.get_nowait()
+    broken.close()
+    db._pool.put_nowait(broken)
+    db._last_used[id(broken)] = 0  # Idle long enough to be health-checked
+
+    assert db.execute("SELECT 1 AS one", fetch_all=False) == {"one": 1}
+
+
+def test_unpooled_mode_opens_a_connection_per_call(tmp_path):
+    db = DatabaseManager(str(tmp_path / "unpooled.db"), pool_size=0)
+    db.execute("CREATE TABLE t (x INTEGER)")
+    db.execute("INSERT INTO t VALUES (1)")
+    assert db.execute("SELECT x FROM t") == [{"x": 1}]
+    with pytest.raises(sqlite3.OperationalError):
+        db.execute("SELECT * FROM missing")
@@ -0,0 +1,79 @@
+# tests/test_db_worker.py
+"""DatabaseWorker cancellation and viewmodel change tracking"""
+import threading
+
+import pytest
+
+QtCore = pytest.importorskip("PyQt6.QtCore")
+
+from models.storage_model import StorageModel
+from viewmodels.db_worker import DatabaseWorker
+from viewmodels.expiry_viewmodel import ExpiryViewModel
+
+
+@pytest.fixture
+def worker(qt_app):
+    pool = QtCore.QThreadPool()
+    worker = DatabaseWorker(thread_pool=pool)
+    yield worker
+    pool.waitForDone()
+    qt_app.processEvents()
+
+
+def test_result_delivered_on_the_worker_thread(qt_app, worker):
+    results = []
+    worker.submit(lambda a, b: a + b, 1, 2, on_result=results.append)
+    worker.thread_pool.waitForDone()
+    assert results == []  # Only delivered by the event loop
+    qt_app.processEvents()
+    assert results == [3]
+
+
+def test_resubmit_after_run_before_delivery(qt_app, worker):
+    results = []
+    worker.submit(lambda: "old", key="search", on_result=results.append)
+    # The first task has run and been deleted by the pool, its result is
+    # still queued
+    worker.thread_pool.waitForDone()
+    worker.submit(lambda: "new", key="search", on_result=results.append)
+    worker.thread_pool.waitForDone()
+    qt_app.processEvents()
+    assert results == ["new"]
+
+
+def test_cancelled_task_does_not_run(qt_app, worker):
+    started = threading.Event()
+    release = threading.Event()
+    ran = []
+    worker.thread_pool.setMaxThreadCount(1)
+    worker.submit(lambda: started.set() or release.wait(5))
+    started.wait(5)
+    token = worker.submit(lambda: ran.append(1), on_result=ran.append)
+    worker.cancel_token(token)
+    release.set()
+    worker.thread_pool.waitForDone()
+    qt_app.processEvents()
+    assert ran == []
+
+
+def test_errors_reach_the_handler(qt_app, worker):
+    errors = []
+    worker.submit(lambda: 1 / 0, on_error=errors.append)
+    worker.thread_pool.waitForDone()
+    qt_app.processEvents()
+    assert isinstance(errors[0], ZeroDivisionError)
+
+
+def test_change_notifications_are_applied_on_the_gui_thread(
+    qt_app, db, identity_model, reagent_ids
+):
+    viewmodel = ExpiryViewModel(identity_model, StorageModel(db))
+    writer = threading.Thread(
+        target=identity_model.update, args=(reagent_ids[0],), kwargs={"Stock": 3}
+    )
+    writer.start()
+    writer.join()
+    assert viewmodel._dirty_ids == set()  # Not touched from the writer thread
+
+    qt_app.processEvents()
+    assert viewmodel._dirty_ids == {reagent_ids[0]}
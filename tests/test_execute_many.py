@@ -0,0 +1,54 @@
+# tests/test_execute_many.py
+"""DatabaseManager.execute_many() keeps the good rows of a failing batch"""
+import pytest
+
+
+@pytest.fixture
+def table(db):
+    db.execute("CREATE TABLE Items (id INTEGER PRIMARY KEY, code TEXT NOT NULL UNIQUE)")
+    return "Items"
+
+
+def _codes(db, table):
+    return [row["code"] for row in db.execute(f"SELECT code FROM {table} ORDER BY id")]
+
+
+def test_failed_rows_are_reported_and_the_rest_written(db, table):
+    codes = [f"c{number}" for number in range(10)]
+    codes[2] = None  # NOT NULL
+    codes[7] = "c1"  # UNIQUE, clashes with a row of an earlier batch
+
+    result = db.execute_many(
+        f"INSERT INTO {table} (code) VALUES (?)",
+        ((code,) for code in codes),
+        batch_size=4,
+    )
+
+    assert result["succeeded"] == 8
+    assert [failure["index"] for failure in result["failed"]] == [2, 7]
+    assert [failure["params"] for failure in result["failed"]] == [(None,), ("c1",)]
+    assert all(failure["error"] for failure in result["failed"])
+    assert _codes(db, table) == [code for i, code in enumerate(codes) if i not in (2, 7)]
+
+
+def test_row_failing_within_one_batch(db, table):
+    # The duplicate only clashes with a row of its own batch, so the replay
+    # must keep the first occurrence
+    result = db.execute_many(
+        f"INSERT INTO {table} (code) VALUES (?)",
+        [("a",), ("b",), ("a",), ("c",)],
+        batch_size=10,
+    )
+
+    assert result["succeeded"] == 3
+    assert [failure["index"] for failure in result["failed"]] == [2]
+    assert _codes(db, table) == ["a", "b", "c"]
+
+
+def test_rolled_back_with_the_surrounding_transaction(db, table):
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.execute_many(f"INSERT INTO {table} (code) VALUES (?)", [("a",), ("a",)])
+            raise RuntimeError
+
+    assert _codes(db, table) == []
@@ -0,0 +1,83 @@
+# tests/test_expiry_dates.py
+"""Date normalization and expiry queries that only compare YYYY-MM-DD dates"""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from models.identity_model import IdentityModel
+from models.storage_model import StorageModel
+
+
+@pytest.mark.parametrize(
+    "value, allow_ambiguous, expected",
+    [
+        (date(2031, 4, 3), False, "2031-04-03"),
+        (datetime(2031, 4, 3, 10, 30), False, "2031-04-03"),
+        ("2031-04-03", False, "2031-04-03"),
+        ("2031/04/03", False, "2031-04-03"),
+        # Day-first input, unambiguous because the day is above 12
+        ("25/12/2031", False, "2031-12-25"),
+        ("25.12.2031", False, "2031-12-25"),
+        ("04/04/2031", False, "2031-04-04"),
+        # Ambiguous: day-first when allowed, untouched otherwise
+        ("03/04/2031", True, "2031-04-03"),
+        ("03/04/2031", False, "03/04/2031"),
+        ("3 Apr 2031", False, "2031-04-03"),
+        ("", True, None),
+        (None, True, None),
+        ("soon", True, "soon"),
+    ],
+)
+def test_normalize_date(value, allow_ambiguous, expected):
+    assert IdentityModel.normalize_date(value, allow_ambiguous) == expected
+
+
+def _set_raw_expiry(db, reagent_id, value):
+    """Store a date the way an external tool might, bypassing normalization"""
+    db.execute("UPDATE Identity SET Tanggal_Expire = ? WHERE id = ?", (value, reagent_id))
+
+
+def test_stored_ambiguous_dates_are_left_and_not_compared(db, identity_model, reagent_ids):
+    _set_raw_expiry(db, reagent_ids[0], "03/04/2031")
+    _set_raw_expiry(db, reagent_ids[1], "25/12/2031")
+    identity_model.normalize_stored_dates()
+
+    expiry = {row["id"]: row["Tanggal_Expire"] for row in identity_model.get_all_summaries()}
+    assert expiry[reagent_ids[0]] == "03/04/2031"
+    assert expiry[reagent_ids[1]] == "2031-12-25"
+
+    # Compared as text "03/04/2031" would sort before any YYYY-MM-DD date
+    listed = [row["id"] for row in identity_model.get_expiring("2030-06-01")]
+    assert listed == reagent_ids[2:]
+    assert [row["id"] for row in identity_model.get_expiring(date(2032, 1, 1))] == [
+        reagent_ids[2],
+        reagent_ids[3],
+        reagent_ids[1],
+    ]
+
+
+def test_storage_stats_ignore_non_iso_expiry(db, identity_model, reagent_ids):
+    _set_raw_expiry(db, reagent_ids[0], "03/04/2031")
+    _set_raw_expiry(db, reagent_ids[1], (date.today() - timedelta(days=1)).isoformat())
+    _set_raw_expiry(db, reagent_ids[2], (date.today() + timedelta(days=3)).isoformat())
+
+    [stats] = identity_model.get_storage_stats(expiring_days=30).values()
+    assert stats["reagents"] == 4
+    assert stats["expired"] == 1
+    assert stats["expiring_soon"] == 1
+
+
+def test_expiry_list_drops_reagent_changed_to_non_iso_date(qt_app, db, identity_model, reagent_ids):
+    from viewmodels.expiry_viewmodel import ExpiryViewModel
+
+    viewmodel = ExpiryViewModel(identity_model, StorageModel(db))
+    loaded = []
+    viewmodel.expiring_loaded.connect(lambda reagents, days: loaded.append(reagents))
+    viewmodel._apply_changes(viewmodel._fetch_changes("2031-12-31", None, set(), 1))
+    assert [reagent["id"] for reagent in loaded[-1]] == reagent_ids
+
+    _set_raw_expiry(db, reagent_ids[0], "03/04/2031")
+    viewmodel._apply_changes(
+        viewmodel._fetch_changes("2031-12-31", "2031-12-31", {reagent_ids[0]}, 1)
+    )
+    assert [reagent["id"] for reagent in loaded[-1]] == reagent_ids[1:]
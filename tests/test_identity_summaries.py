@@ -0,0 +1,73 @@
+# tests/test_identity_summaries.py
+"""BLOB-free reagent summaries and the keyset-paged rack listing"""
+from datetime import date
+
+import pytest
+
+from models.blob_store_model import BlobStoreModel
+from models.identity_model import IdentityModel
+from models.storage_model import StorageModel
+
+PAYLOAD_COLUMNS = ("SDS", "Image", "SDS_Hash", "Image_Hash")
+
+
+def _create(identity_model, name, storage_id, sds=None, image=None):
+    return identity_model.create(
+        name,
+        "",
+        "Padat",
+        1,
+        10,
+        date(2030, 1, 1),
+        "Low",
+        "",
+        date(2024, 1, 1),
+        date(2024, 2, 1),
+        sds=sds,
+        sds_filename="sheet.pdf" if sds else None,
+        id_storage=storage_id,
+        image=image,
+    )
+
+
+@pytest.mark.parametrize("with_blob_store", [False, True])
+def test_summary_is_the_row_without_payloads(db, with_blob_store):
+    blob_store = BlobStoreModel(db) if with_blob_store else None
+    identity_model = IdentityModel(db, blob_store=blob_store)
+    storage_id = StorageModel(db).create("Rack A", 1)
+    plain = _create(identity_model, "Plain", storage_id)
+    full = _create(identity_model, "Full", storage_id, sds=b"%PDF-1.4", image=b"\x89PNG")
+
+    for identity_id, has_payloads in ((plain, 0), (full, 1)):
+        row = dict(identity_model.get_by_id(identity_id))
+        summary = dict(identity_model.get_summary_by_id(identity_id))
+        assert summary.pop("has_sds") == has_payloads
+        assert summary.pop("has_image") == has_payloads
+        assert summary == {k: v for k, v in row.items() if k not in PAYLOAD_COLUMNS}
+
+    assert [dict(s) for s in identity_model.get_summaries_by_storage(storage_id)] == [
+        dict(s) for s in identity_model.get_all_summaries()
+    ]
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7])
+def test_rack_pages_with_duplicate_names(identity_model, limit):
+    storage_id = StorageModel(identity_model.db).create("Rack A", 1)
+    names = ["Ethanol", "Acetone", "Ethanol", None, "Ethanol", "", "Acetone", None, ""]
+    ids = [_create(identity_model, name, storage_id) for name in names]
+
+    rows = []
+    after = None
+    while True:
+        page = identity_model.get_summary_page_by_storage(storage_id, limit, after)
+        rows.extend(page)
+        if len(page) < limit:
+            break
+        after = (page[-1]["page_key"], page[-1]["id"])
+
+    # Reagents without a name come first, then empty names
+    expected = sorted(
+        zip(names, ids), key=lambda pair: (pair[0] is not None, pair[0] or "", pair[1])
+    )
+    assert [row["id"] for row in rows] == [identity_id for _, identity_id in expected]
+    assert len(rows) == identity_model.count_by_storage(storage_id)
@@ -0,0 +1,56 @@
+# tests/test_reagent_edit.py
+"""Saving an edited reagent writes only the fields the user changed"""
+import pytest
+
+QtCore = pytest.importorskip("PyQt6.QtCore")
+
+
+@pytest.fixture
+def panel(qt_app, db, identity_model, reagent_ids):
+    from views.reagent_view import ReagentDetailPanel
+
+    # Values the form cannot show: a hazard class and a form outside its
+    # lists (as written by older versions or other tools) and no expiry date
+    db.execute(
+        """
+        UPDATE Identity
+        SET Category_Hazard = 'Radioactive', Wujud = 'Slurry', Tanggal_Expire = NULL
+        WHERE id = ?
+        """,
+        (reagent_ids[0],),
+    )
+    return ReagentDetailPanel(identity_model, reagent_ids[0], "Rack A")
+
+
+def _stored(identity_model, reagent_id):
+    return dict(identity_model.get_summary_by_id(reagent_id))
+
+
+def test_editing_stock_keeps_values_the_form_cannot_show(panel, identity_model, reagent_ids):
+    before = _stored(identity_model, reagent_ids[0])
+    panel.stock_spin.setValue(7)
+
+    success, _ = panel.view_model.save_reagent(panel._collect_form_data())
+
+    assert success
+    after = _stored(identity_model, reagent_ids[0])
+    assert after.pop("Stock") == 7
+    before.pop("Stock")
+    assert after == before
+    assert after["Tanggal_Expire"] is None
+    assert after["id_storage"] == before["id_storage"]
+
+
+def test_edited_fields_are_written(panel, identity_model, reagent_ids):
+    panel.hazard_combo.setCurrentText("Toxic")
+    panel.expire_date_edit.setDate(QtCore.QDate(2031, 4, 3))
+    panel.description_edit.setText("Keep cool")
+
+    success, _ = panel.view_model.save_reagent(panel._collect_form_data())
+
+    assert success
+    stored = _stored(identity_model, reagent_ids[0])
+    assert stored["Category_Hazard"] == "Toxic"
+    assert stored["Tanggal_Expire"] == "2031-04-03"
+    assert stored["Description"] == "Keep cool"
+    assert stored["Wujud"] == "Slurry"
@@ -0,0 +1,60 @@
+# tests/test_reagent_vocabulary.py
+"""One vocabulary for Wujud and Category_Hazard across the form, imports and storage"""
+import pytest
+
+from models.identity_model import IdentityModel
+from models.import_job_model import ImportJobModel
+from models.storage_model import StorageModel
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("Padat", "Padat"),
+        ("cair", "Cair"),
+        (" GAS ", "Gas"),
+        ("Liquid", "Cair"),
+        ("solid", "Padat"),
+        ("Solution", "Larutan"),
+        ("Slurry", None),
+    ],
+)
+def test_normalize_wujud(value, expected):
+    assert IdentityModel.normalize_wujud(value) == expected
+
+
+def test_stored_forms_are_rewritten_once(db, identity_model, reagent_ids):
+    for reagent_id, wujud in zip(reagent_ids, ["Solid", "liquid", "Cair", "Slurry"]):
+        db.execute("UPDATE Identity SET Wujud = ? WHERE id = ?", (wujud, reagent_id))
+
+    assert identity_model.normalize_stored_wujud() == 2
+    stored = {row["id"]: row["Wujud"] for row in identity_model.get_all_summaries()}
+    assert [stored[reagent_id] for reagent_id in reagent_ids] == ["Padat", "Cair", "Cair", "Slurry"]
+
+
+def test_import_validates_wujud_and_hazard(qt_app, db, identity_model, tmp_path):
+    from viewmodels.import_viewmodel import ImportViewModel
+
+    storage_id = StorageModel(db).create("Rack A", 1)
+    source = tmp_path / "reagents.csv"
+    source.write_text(
+        "Name,Wujud,Hazard\n"
+        "Ethanol,Liquid,flammable\n"
+        "Salt,padat,None\n"
+        "Mud,Slurry,None\n"
+        "Acid,Cair,Spicy\n"
+    )
+    viewmodel = ImportViewModel(identity_model, StorageModel(db), ImportJobModel(db))
+    mapping = {"Name": "Name", "Wujud": "Wujud", "Hazard": "Category_Hazard"}
+
+    summary = viewmodel._run_import(str(source), mapping, storage_id, None)
+
+    assert summary["imported"] == 2
+    assert [error["row"] for error in summary["errors"]] == [4, 5]
+    assert "Wujud must be one of Padat, Cair, Gas, Larutan" in summary["errors"][0]["error"]
+    assert summary["errors"][1]["error"].startswith("Category_Hazard must be one of")
+    stored = {
+        row["Name"]: (row["Wujud"], row["Category_Hazard"])
+        for row in identity_model.get_all_summaries()
+    }
+    assert stored == {"Ethanol": ("Cair", "Flammable"), "Salt": ("Padat", "None")}
@@ -0,0 +1,60 @@
+# tests/test_sds_streaming.py
+"""SDS files streamed in and out in chunks, inline and through the blob store"""
+import os
+
+import pytest
+
+from models.blob_store_model import BlobStoreModel
+from models.identity_model import IdentityModel
+
+# Spans a few chunks, the last one partial
+SIZE = int(2.5 * 1024 * 1024)
+
+
+@pytest.fixture(params=["inline", "blob_store"])
+def identity_model(request, db, tmp_path):
+    blob_store = BlobStoreModel(db, str(tmp_path / "blobs")) if request.param == "blob_store" else None
+    return IdentityModel(db, blob_store=blob_store)
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    path = tmp_path / "scan.pdf"
+    path.write_bytes(b"%PDF-1.4\n" + os.urandom(SIZE - 9))
+    return path
+
+
+def test_round_trip_with_progress(identity_model, reagent_ids, pdf_path, tmp_path):
+    reagent_id = reagent_ids[0]
+    uploaded = []
+    assert identity_model.update_sds_from_file(
+        reagent_id, str(pdf_path), progress=lambda done, total: uploaded.append((done, total))
+    )
+    chunk = identity_model.db.BLOB_CHUNK_SIZE
+    assert uploaded == [(chunk, SIZE), (2 * chunk, SIZE), (SIZE, SIZE)]
+    assert identity_model.get_sds_info(reagent_id) == {"filename": "scan.pdf", "size": SIZE}
+
+    target = tmp_path / "out.pdf"
+    downloaded = []
+    filename = identity_model.export_sds(
+        reagent_id, str(target), progress=lambda done, total: downloaded.append(done)
+    )
+    assert filename == "scan.pdf"
+    assert downloaded[-1] == SIZE
+    assert target.read_bytes() == pdf_path.read_bytes()
+    assert identity_model.get_sds(reagent_id)["data"] == pdf_path.read_bytes()
+
+
+def test_replacing_and_missing_sds(identity_model, reagent_ids, pdf_path, tmp_path):
+    target = str(tmp_path / "out.pdf")
+    assert identity_model.export_sds(reagent_ids[0], target) is None
+    assert identity_model.get_sds_info(reagent_ids[0]) is None
+    assert not identity_model.update_sds_from_file(10_000, str(pdf_path))
+
+    small = tmp_path / "small.pdf"
+    small.write_bytes(b"%PDF-1.4 small")
+    identity_model.update_sds_from_file(reagent_ids[0], str(pdf_path))
+    identity_model.update_sds_from_file(reagent_ids[0], str(small), "renamed.pdf")
+    assert identity_model.export_sds(reagent_ids[0], target) == "renamed.pdf"
+    with open(target, "rb") as written:
+        assert written.read() == b"%PDF-1.4 small"
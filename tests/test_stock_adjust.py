@@ -0,0 +1,73 @@
+# tests/test_stock_adjust.py
+"""Stock changes from usage entries are applied in SQL, never read-modify-write"""
+import threading
+
+from models.supporting_materials_model import SupportingMaterialsModel
+
+
+def _stock(identity_model, reagent_id):
+    return identity_model.get_summary_by_id(reagent_id)["Stock"]
+
+
+def test_adjust_stock(identity_model, reagent_ids):
+    changed = []
+    identity_model.add_change_listener(changed.append)
+
+    assert identity_model.adjust_stock(reagent_ids[0], 3) == 7
+    assert identity_model.adjust_stock(reagent_ids[0], -5) == 12
+    assert identity_model.adjust_stock(reagent_ids[0], 50) == 0
+    assert identity_model.adjust_stock(reagent_ids[0], 50, floor=-10) == -10
+    assert identity_model.adjust_stock(10_000, 1) is None
+    assert changed == [[reagent_ids[0]]] * 4
+
+
+def test_concurrent_adjustments_are_all_applied(db, identity_model, reagent_ids):
+    db.execute("UPDATE Identity SET Stock = 1000 WHERE id = ?", (reagent_ids[0],))
+
+    def use_one_at_a_time():
+        for _ in range(25):
+            with identity_model.transaction():
+                identity_model.adjust_stock(reagent_ids[0], 1)
+
+    threads = [threading.Thread(target=use_one_at_a_time) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert _stock(identity_model, reagent_ids[0]) == 900
+
+
+def test_usage_save_changes_stock_by_the_difference(
+    qt_app, db, identity_model, usage_model, reagent_ids
+):
+    from viewmodels.usage_edit_viewmodel import UsageEditViewModel
+
+    materials = SupportingMaterialsModel(db)
+    errors = []
+
+    def save(usage_id, amount):
+        viewmodel = UsageEditViewModel(
+            usage_model, identity_model, materials, reagent_ids[0], "Reagent 0", usage_id
+        )
+        viewmodel.error.connect(errors.append)
+        viewmodel.save_usage(
+            {
+                "Tanggal_Terpakai": "2024-05-01",
+                "Jumlah_Terpakai": amount,
+                "User": "alice",
+                "Bahan_Pendukung": "",
+            }
+        )
+
+    save(None, 3)
+    assert _stock(identity_model, reagent_ids[0]) == 7
+    [usage] = usage_model.get_page(identity_id=reagent_ids[0], limit=10)
+
+    # Someone else logs usage after the form was opened
+    identity_model.adjust_stock(reagent_ids[0], 2)
+    save(usage["id"], 5)
+    assert _stock(identity_model, reagent_ids[0]) == 3
+    save(usage["id"], 1)
+    assert _stock(identity_model, reagent_ids[0]) == 7
+    assert errors == []
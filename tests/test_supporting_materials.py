@@ -0,0 +1,45 @@
+# tests/test_supporting_materials.py
+"""Usage rows refer to supporting materials by id"""
+
+
+def test_usage_rows_share_one_material_per_name(usage_model, reagent_ids):
+    first = usage_model.create("2024-05-01", 1, "alice", "Ethanol", reagent_ids[0])
+    second = usage_model.create("2024-05-02", 1, "alice", "ethanol", reagent_ids[1])
+
+    rows = [usage_model.get_by_id(usage_id) for usage_id in (first, second)]
+    assert rows[0]["id_bahan_pendukung"] == rows[1]["id_bahan_pendukung"]
+    assert [row["Bahan_Pendukung"] for row in rows] == ["Ethanol", "Ethanol"]
+    assert usage_model.count(bahan_pendukung="ETHANOL") == 2
+
+
+def test_material_in_use_is_not_deleted(usage_model, reagent_ids):
+    materials = usage_model.supporting_materials
+    usage_id = usage_model.create("2024-05-01", 1, "alice", "Ethanol", reagent_ids[0])
+    material_id = usage_model.get_by_id(usage_id)["id_bahan_pendukung"]
+    unused_id = materials.create("Acetone")
+
+    assert materials.is_referenced(material_id)
+    assert not materials.delete(material_id)
+    assert usage_model.get_by_id(usage_id)["Bahan_Pendukung"] == "Ethanol"
+
+    assert materials.delete(unused_id)
+    usage_model.delete(usage_id)
+    assert materials.delete(material_id)
+    assert materials.get_all() == []
+
+
+def test_names_from_older_versions_are_migrated(db, usage_model, reagent_ids):
+    materials = usage_model.supporting_materials
+    materials.create("Ethanol")
+    for name in ("ethanol", "Buffer", "BUFFER", ""):
+        db.execute(
+            "INSERT INTO Usage (Tanggal_Terpakai, Jumlah_Terpakai, Bahan_Pendukung, id_identity)"
+            " VALUES ('2024-05-01', 1, ?, ?)",
+            (name, reagent_ids[0]),
+        )
+
+    assert usage_model.migrate_material_names() == 4
+    assert sorted(material["name"] for material in materials.get_all()) == ["BUFFER", "Ethanol"]
+    rows = usage_model.get_page(identity_id=reagent_ids[0], limit=10)
+    assert sorted(row["Bahan_Pendukung"] for row in rows) == ["", "BUFFER", "BUFFER", "Ethanol"]
+    assert db.execute("SELECT COUNT(*) AS n FROM Usage WHERE Bahan_Pendukung IS NOT NULL")[0]["n"] == 0
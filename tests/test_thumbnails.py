@@ -0,0 +1,84 @@
+# tests/test_thumbnails.py
+"""Thumbnails are made once per image and never from a replaced image"""
+import pytest
+
+from models.blob_store_model import BlobStoreModel
+from models.identity_model import IdentityModel
+
+QtCore = pytest.importorskip("PyQt6.QtCore")
+QtGui = pytest.importorskip("PyQt6.QtGui")
+
+from viewmodels.reagent_viewmodel import ReagentViewModel  # noqa: E402
+from viewmodels.thumbnail_generator import generate_thumbnails  # noqa: E402
+
+
+def _png(width, height):
+    image = QtGui.QImage(width, height, QtGui.QImage.Format.Format_ARGB32)
+    image.fill(QtCore.Qt.GlobalColor.transparent)
+    target = QtCore.QBuffer()
+    target.open(QtCore.QIODevice.OpenModeFlag.WriteOnly)
+    assert image.save(target, "PNG")
+    return bytes(target.data())
+
+
+def _size(data):
+    image = QtGui.QImage.fromData(data)
+    return image.width(), image.height()
+
+
+@pytest.fixture
+def identity_model(db, tmp_path):
+    return IdentityModel(db, blob_store=BlobStoreModel(db, str(tmp_path / "blobs")))
+
+
+def test_sizes_without_upscaling(qt_app):
+    thumbnails = generate_thumbnails(_png(1000, 500), (128, 300, 600))
+    assert {size: _size(data) for size, data in thumbnails.items()} == {
+        600: (600, 300),
+        300: (300, 150),
+        128: (128, 64),
+    }
+
+    small = generate_thumbnails(_png(100, 50), (128, 300))
+    assert {size: _size(data) for size, data in small.items()} == {
+        300: (100, 50),
+        128: (100, 50),
+    }
+
+
+def test_thumbnail_made_once_on_first_view(qt_app, identity_model, reagent_ids):
+    reagent_id = reagent_ids[0]
+    identity_model.update_image(reagent_id, _png(1000, 800))
+    viewmodel = ReagentViewModel(identity_model, reagent_id)
+
+    assert _size(viewmodel.get_thumbnail(300)) == (300, 240)
+    assert identity_model.get_image_to_thumbnail(reagent_id) is None
+    assert _size(identity_model.get_thumbnail(reagent_id, 200)) == (300, 240)
+    assert _size(identity_model.get_thumbnail(reagent_id, 1000)) == (600, 480)
+
+    # A new image drops the thumbnails of the old one
+    identity_model.update_image(reagent_id, _png(400, 400))
+    assert identity_model.get_thumbnail(reagent_id, 300) is None
+    assert _size(viewmodel.get_thumbnail(300)) == (300, 300)
+
+
+def test_unreadable_image_is_not_decoded_again(qt_app, identity_model, reagent_ids):
+    reagent_id = reagent_ids[0]
+    identity_model.update_image(reagent_id, b"not an image")
+    viewmodel = ReagentViewModel(identity_model, reagent_id)
+
+    assert viewmodel.get_thumbnail(300) is None
+    assert identity_model.thumbnails.exists_for(reagent_id)
+    assert identity_model.get_image_to_thumbnail(reagent_id) is None
+
+
+def test_thumbnails_of_a_replaced_image_are_dropped(qt_app, identity_model, reagent_ids):
+    reagent_id = reagent_ids[0]
+    identity_model.update_image(reagent_id, _png(200, 200))
+    pending = identity_model.get_image_to_thumbnail(reagent_id)
+    thumbnails = generate_thumbnails(pending["Image"], identity_model.thumbnails.SIZES)
+
+    # Replaced while the old image was being decoded
+    identity_model.update_image(reagent_id, _png(300, 300))
+    assert not identity_model.store_thumbnails(reagent_id, thumbnails, pending["Image_Hash"])
+    assert not identity_model.thumbnails.exists_for(reagent_id)
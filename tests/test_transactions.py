@@ -0,0 +1,43 @@
+# tests/test_transactions.py
+"""DatabaseManager.transaction() as a unit of work"""
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def table(db):
+    db.execute("CREATE TABLE Items (id INTEGER PRIMARY KEY, code TEXT)")
+    return "Items"
+
+
+def _codes(db, table):
+    return [row["code"] for row in db.execute(f"SELECT code FROM {table} ORDER BY id")]
+
+
+def test_commits_all_statements_together(db, table):
+    with db.transaction():
+        db.execute(f"INSERT INTO {table} (code) VALUES ('a')")
+        db.execute(f"INSERT INTO {table} (code) VALUES ('b')")
+    assert _codes(db, table) == ["a", "b"]
+
+
+def test_rolls_back_everything_when_the_block_raises(db, table):
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.execute(f"INSERT INTO {table} (code) VALUES ('a')")
+            with db.transaction():  # Joins the outer transaction
+                db.execute(f"INSERT INTO {table} (code) VALUES ('b')")
+            raise RuntimeError
+    assert _codes(db, table) == []
+
+
+def test_uncommitted_rows_are_not_visible_to_other_threads(db, table):
+    seen = []
+    with db.transaction():
+        db.execute(f"INSERT INTO {table} (code) VALUES ('a')")
+        reader = threading.Thread(target=lambda: seen.append(_codes(db, table)))
+        reader.start()
+        reader.join()
+    assert seen == [[]]
+    assert _codes(db, table) == ["a"]
@@ -0,0 +1,36 @@
+# tests/test_usage_changes.py
+"""Daily usage totals and the reagents reported to change listeners"""
+
+
+def test_daily_totals_without_date_range(usage_model, reagent_ids):
+    usage_model.create("2024-05-01", 2, "alice", "", reagent_ids[0])
+    usage_model.create("2024-05-01", 3, "bob", "", reagent_ids[0])
+    usage_model.create("01/05/2024", 4, "bob", "", reagent_ids[1])  # Not YYYY-MM-DD
+
+    totals = usage_model.get_daily_totals(None, None)
+    assert [(row["id_identity"], row["Tanggal_Terpakai"], row["Total"]) for row in totals] == [
+        (reagent_ids[0], "2024-05-01", 5),
+    ]
+    assert usage_model.get_daily_totals(None, "2024-04-30", [reagent_ids[0]]) == []
+
+
+def test_listeners_get_old_and_new_reagent(usage_model, reagent_ids):
+    changed = []
+    usage_model.add_change_listener(changed.append)
+    usage_id = usage_model.create("2024-05-01", 2, "alice", "", reagent_ids[0])
+
+    usage_model.update(usage_id, id_identity=reagent_ids[1])
+    usage_model.update_many([{"id": usage_id, "id_identity": reagent_ids[2]}])
+    new_rows = [
+        {"tanggal_terpakai": "2024-05-02", "jumlah_terpakai": 1, "id_identity": reagent_ids[3]}
+    ]
+    usage_model.create_many(iter(new_rows))
+    usage_model.delete(usage_id)
+
+    assert changed == [
+        [reagent_ids[0]],
+        sorted([reagent_ids[0], reagent_ids[1]]),
+        sorted([reagent_ids[1], reagent_ids[2]]),
+        [reagent_ids[3]],
+        [reagent_ids[2]],
+    ]
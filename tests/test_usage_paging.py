@@ -0,0 +1,47 @@
+# tests/test_usage_paging.py
+"""Keyset pagination of the usage history"""
+import pytest
+
+
+def _all_pages(usage_model, limit, **filters):
+    rows = []
+    after = None
+    while True:
+        page = usage_model.get_page(limit=limit, after=after, **filters)
+        rows.extend(page)
+        if len(page) < limit:
+            return rows
+        after = (page[-1]["page_key"], page[-1]["id"])
+
+
+@pytest.fixture
+def usage_ids(usage_model, reagent_ids):
+    # Many rows share a date (and a few have none), so page boundaries fall
+    # between rows with the same page key
+    dates = ["2024-05-01", "2024-05-02", "2024-05-02", None, "2024-05-03"]
+    return [
+        usage_model.create(dates[number % len(dates)], 1, "alice", "", reagent_ids[0])
+        for number in range(23)
+    ]
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 4, 5, 23, 50])
+def test_pages_cover_every_row_once_in_order(usage_model, reagent_ids, usage_ids, limit):
+    expected = usage_model.db.execute(
+        f"""
+        SELECT id FROM {usage_model.table_name}
+        ORDER BY {usage_model.DATE_KEY} DESC, id DESC
+        """
+    )
+    rows = _all_pages(usage_model, limit, identity_id=reagent_ids[0])
+    assert [row["id"] for row in rows] == [row["id"] for row in expected]
+    assert len(rows) == usage_model.count(reagent_ids[0])
+
+
+def test_pages_with_date_range(usage_model, reagent_ids, usage_ids):
+    rows = _all_pages(
+        usage_model, 2, identity_id=reagent_ids[0], start="2024-05-02", end="2024-05-02"
+    )
+    assert len(rows) == usage_model.count(reagent_ids[0], "2024-05-02", "2024-05-02")
+    assert {row["Tanggal_Terpakai"] for row in rows} == {"2024-05-02"}
+    assert len({row["id"] for row in rows}) == len(rows)
@@ -0,0 +1,61 @@
+# tests/test_usage_summary.py
+"""The UsageSummary triggers must agree with a full rebuild_summaries()"""
+import random
+from datetime import date, timedelta
+
+
+def _summaries(usage_model):
+    return usage_model.db.execute(
+        f"SELECT * FROM {usage_model.SUMMARY_TABLE} ORDER BY id_identity"
+    )
+
+
+def _random_date(rng):
+    if rng.random() < 0.1:
+        return None
+    # Few distinct dates, so ties on First_Used/Last_Used are common
+    return (date(2024, 1, 1) + timedelta(days=rng.randrange(6))).isoformat()
+
+
+def test_triggers_match_rebuild_after_random_edits(usage_model, reagent_ids):
+    rng = random.Random(7)
+    users = ["alice", "bob", "citra"]
+    usage_ids = []
+    for step in range(400):
+        action = rng.random()
+        if action < 0.5 or not usage_ids:
+            usage_ids.append(
+                usage_model.create(
+                    _random_date(rng),
+                    rng.randrange(0, 20),
+                    rng.choice(users),
+                    rng.choice(["", "Ethanol"]),
+                    rng.choice(reagent_ids),
+                )
+            )
+        elif action < 0.75:
+            changes = rng.choice(
+                [
+                    {"Tanggal_Terpakai": _random_date(rng)},
+                    {"Jumlah_Terpakai": rng.randrange(0, 20)},
+                    {"User": rng.choice(users)},
+                    {"id_identity": rng.choice(reagent_ids)},
+                ]
+            )
+            assert usage_model.update(rng.choice(usage_ids), **changes)
+        else:
+            usage_id = usage_ids.pop(rng.randrange(len(usage_ids)))
+            assert usage_model.delete(usage_id)
+
+        if step % 50 == 49:
+            maintained = _summaries(usage_model)
+            usage_model.rebuild_summaries()
+            assert maintained == _summaries(usage_model)
+
+
+def test_summary_removed_with_last_usage_row(usage_model, reagent_ids):
+    usage_id = usage_model.create("2024-03-01", 5, "alice", "", reagent_ids[0])
+    assert usage_model.get_summary(reagent_ids[0])["Total_Used"] == 5
+
+    usage_model.delete(usage_id)
+    assert usage_model.get_summary(reagent_ids[0]) is None
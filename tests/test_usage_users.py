@@ -0,0 +1,75 @@
+# tests/test_usage_users.py
+"""Usage rows stay linked to the account their typed user name refers to"""
+import pytest
+
+from models.supporting_materials_model import SupportingMaterialsModel
+from models.user_model import UserModel
+
+
+@pytest.fixture
+def accounts(db):
+    users = UserModel(db)
+    return {
+        "alice": users.get_by_id(users.create("alice", "Alice", "Smith", "x")),
+        "bob": users.get_by_id(users.create("bob", "Bob", "Jones", "x")),
+    }
+
+
+def _save(db, identity_model, usage_model, reagent_id, usage_id, user_name, current_user):
+    from viewmodels.usage_edit_viewmodel import UsageEditViewModel
+
+    viewmodel = UsageEditViewModel(
+        usage_model,
+        identity_model,
+        SupportingMaterialsModel(db),
+        reagent_id,
+        "Reagent 0",
+        usage_id,
+        current_user,
+    )
+    errors = []
+    viewmodel.error.connect(errors.append)
+    viewmodel.save_usage(
+        {
+            "Tanggal_Terpakai": "2024-05-01",
+            "Jumlah_Terpakai": 1,
+            "User": user_name,
+            "Bahan_Pendukung": "",
+        }
+    )
+    assert errors == []
+
+
+def test_find_user_id(usage_model, accounts):
+    assert usage_model.find_user_id("bob") == accounts["bob"]["id"]
+    assert usage_model.find_user_id("  alice   SMITH ") == accounts["alice"]["id"]
+    assert usage_model.find_user_id("Carol") is None
+    assert usage_model.find_user_id("") is None
+
+
+def test_edited_user_name_moves_the_link(
+    qt_app, db, identity_model, usage_model, reagent_ids, accounts
+):
+    alice = accounts["alice"]
+    _save(db, identity_model, usage_model, reagent_ids[0], None, "Alice Smith", alice)
+    [usage] = usage_model.get_page(identity_id=reagent_ids[0], limit=10)
+    assert usage["id_user"] == alice["id"]
+
+    def linked_user():
+        return usage_model.get_by_id(usage["id"])["id_user"]
+
+    # Same name, spelled differently: the link stays
+    _save(db, identity_model, usage_model, reagent_ids[0], usage["id"], "alice  smith", alice)
+    assert linked_user() == alice["id"]
+
+    # Logged for a colleague with an account
+    _save(db, identity_model, usage_model, reagent_ids[0], usage["id"], "Bob Jones", alice)
+    assert linked_user() == accounts["bob"]["id"]
+
+    # A name without an account must not keep the old link
+    _save(db, identity_model, usage_model, reagent_ids[0], usage["id"], "Visitor", alice)
+    assert linked_user() is None
+
+    # The logged-in user typing their own username
+    _save(db, identity_model, usage_model, reagent_ids[0], usage["id"], "alice", alice)
+    assert linked_user() == alice["id"]
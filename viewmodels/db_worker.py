@@ -0,0 +1,134 @@
+# viewmodels/db_worker.py
+import itertools
+import logging
+import traceback
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+logger = logging.getLogger(__name__)
+
+
+class _DbTask(QRunnable):
+    """Runs one model call on a pool thread and reports back via the worker"""
+
+    def __init__(self, worker, token, fn, args, kwargs):
+        super().__init__()
+        self.worker = worker
+        self.token = token
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        # Skip work that was superseded while waiting in the queue
+        if self.worker.is_cancelled(self.token):
+            return
+        try:
+            try:
+                result = self.fn(*self.args, **self.kwargs)
+            except Exception as e:
+                # Formatted here, where the traceback is still the current one
+                self.worker._task_failed.emit(self.token, e, traceback.format_exc())
+                return
+            self.worker._task_finished.emit(self.token, result)
+        except RuntimeError:
+            pass  # The worker was deleted while the call was running
+
+
+class DatabaseWorker(QObject):
+    """
+    Runs model calls on a QThreadPool so the GUI thread never waits on SQLite.
+
+    Callbacks are invoked on the thread that owns the worker (the GUI thread),
+    so they can emit the viewmodel's existing signals or touch widgets. Giving
+    requests a key cancels the previous request with the same key, e.g. a
+    search that is replaced by a newer one before it finished.
+    """
+
+    # Emitted from pool threads, delivered queued to the worker's own thread
+    _task_finished = pyqtSignal(int, object)
+    _task_failed = pyqtSignal(int, object, str)  # token, exception, traceback
+
+    _tokens = itertools.count(1)
+
+    def __init__(self, parent=None, thread_pool=None):
+        super().__init__(parent)
+        self.thread_pool = thread_pool or QThreadPool.globalInstance()
+        self._pending = {}  # token -> (key, on_result, on_error)
+        self._latest_by_key = {}  # key -> token of the newest request
+
+        self._task_finished.connect(self._on_task_finished)
+        self._task_failed.connect(self._on_task_failed)
+
+    def submit(self, fn, *args, on_result=None, on_error=None, key=None, **kwargs):
+        """
+        Run fn(*args, **kwargs) in the background
+
+        Args:
+            fn: The model call (or any function doing database work)
+            on_result: Called with the return value on the GUI thread
+            on_error: Called with the exception on the GUI thread; str() of it
+                is the error message. Without it the failure is logged.
+            key: Requests sharing a key supersede each other; only the newest
+                one delivers its result
+
+        Returns:
+            int: Token identifying the request, usable with cancel_token()
+        """
+        token = next(self._tokens)
+        if key is not None:
+            self.cancel(key)
+            self._latest_by_key[key] = token
+
+        self._pending[token] = (key, on_result, on_error)
+        # The pool takes ownership of the task and deletes it after run(), so
+        # no reference to it is kept here
+        self.thread_pool.start(_DbTask(self, token, fn, args, kwargs))
+        return token
+
+    def is_cancelled(self, token):
+        return token not in self._pending
+
+    def cancel(self, key):
+        """Cancel the outstanding request for a key, if any"""
+        token = self._latest_by_key.pop(key, None)
+        if token is not None:
+            self.cancel_token(token)
+
+    def cancel_token(self, token):
+        """
+        Drop a request. A task still queued returns right away when it
+        starts, a running one finishes but its result is not delivered.
+        """
+        self._pending.pop(token, None)
+
+    def cancel_all(self):
+        for token in list(self._pending):
+            self.cancel_token(token)
+        self._latest_by_key.clear()
+
+    def _finish(self, token):
+        entry = self._pending.pop(token, None)
+        if entry is None:
+            return None  # Cancelled or superseded, drop the result
+        key = entry[0]
+        if key is not None and self._latest_by_key.get(key) == token:
+            del self._latest_by_key[key]
+        return entry
+
+    @pyqtSlot(int, object)
+    def _on_task_finished(self, token, result):
+        entry = self._finish(token)
+        if entry and entry[1]:
+            entry[1](result)
+
+    @pyqtSlot(int, object, str)
+    def _on_task_failed(self, token, error, formatted_traceback):
+        entry = self._finish(token)
+        if entry is None:
+            return
+        if entry[2]:
+            logger.debug("Background database call failed:\n%s", formatted_traceback)
+            entry[2](error)
+        else:
+            logger.error("Background database call failed:\n%s", formatted_traceback)
@@ -0,0 +1,131 @@
+# viewmodels/expiry_viewmodel.py
+from datetime import date, timedelta
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from viewmodels.db_worker import DatabaseWorker
+
+
+class ExpiryViewModel(QObject):
+    """
+    ViewModel for the list of reagents expiring within the next N days.
+
+    The list is loaded once and then kept up to date incrementally: when the
+    window grows (a new day, or more days selected) only the added date range
+    is queried, and reagents changed through the IdentityModel are re-read
+    by id instead of rescanning every reagent.
+    """
+
+    # reagents (soonest first, each with a "storage_name"), days
+    expiring_loaded = pyqtSignal(list, int)
+    expiry_error = pyqtSignal(str)
+    # Model change notifications, which arrive on worker threads, are
+    # delivered through this so the dirty set is only touched on the GUI thread
+    _reagents_changed = pyqtSignal(object)
+
+    DEFAULT_DAYS = 30
+
+    def __init__(self, identity_model, storage_model, days=DEFAULT_DAYS):
+        super().__init__()
+        self.identity_model = identity_model
+        self.storage_model = storage_model
+        self.days = days
+        self.db_worker = DatabaseWorker(self)
+
+        self._items = {}  # id -> reagent expiring on or before _horizon
+        self._horizon = None  # Last expiry date (YYYY-MM-DD) _items covers
+        self._storage_names = {}
+        self._dirty_ids = set()  # Reagents changed since they were loaded
+        # Bumped when many reagents change at once; a full reload started at
+        # an older generation leaves another one pending
+        self._reload_generation = 1
+        self._loaded_generation = 0
+        self._reagents_changed.connect(self._on_reagents_changed)
+        self.identity_model.add_change_listener(self._reagents_changed.emit)
+
+    def _on_reagents_changed(self, identity_ids):
+        """Remember what changed; it is re-read on the next refresh()"""
+        if identity_ids is None:
+            self._reload_generation += 1
+        else:
+            self._dirty_ids.update(identity_ids)
+
+    def set_days(self, days):
+        """Change the window and refresh the list"""
+        self.days = days
+        self.refresh()
+
+    def refresh(self):
+        """Bring the list up to date in the background"""
+        horizon = (date.today() + timedelta(days=self.days)).isoformat()
+        full = self._loaded_generation != self._reload_generation
+        self.db_worker.submit(
+            self._fetch_changes,
+            horizon,
+            None if full else self._horizon,
+            set(self._dirty_ids),
+            self._reload_generation,
+            key="expiring",
+            on_result=self._apply_changes,
+            on_error=lambda error: self.expiry_error.emit(
+                f"Error loading expiring reagents: {error}"
+            ),
+        )
+
+    def _fetch_changes(self, horizon, previous_horizon, dirty_ids, generation):
+        """Query what changed since the last refresh; runs on a worker thread"""
+        result = {
+            "horizon": horizon,
+            "full": previous_horizon is None,
+            "generation": generation,
+            "dirty_ids": dirty_ids,
+            "changed": self.identity_model.get_summaries_by_ids(dirty_ids),
+        }
+        if previous_horizon is None:
+            result["added"] = self.identity_model.get_expiring(horizon)
+            result["storage_names"] = {
+                storage["id"]: storage["Name"] for storage in self.storage_model.get_all()
+            }
+        elif horizon > previous_horizon:
+            result["added"] = self.identity_model.get_expiring(
+                horizon, after=previous_horizon
+            )
+        else:
+            result["added"] = []
+        return result
+
+    def _apply_changes(self, result):
+        horizon = result["horizon"]
+        if result["full"]:
+            self._items = {}
+            self._storage_names = result["storage_names"]
+            self._loaded_generation = result["generation"]
+        elif self._horizon and horizon < self._horizon:
+            # Window shrank; drop what is now outside it without a query
+            self._items = {
+                reagent_id: reagent
+                for reagent_id, reagent in self._items.items()
+                if reagent["Tanggal_Expire"] <= horizon
+            }
+        self._horizon = horizon
+
+        for reagent in result["added"]:
+            self._items[reagent["id"]] = reagent
+
+        # Changed reagents may have moved into or out of the window, or be gone
+        for reagent_id in result["dirty_ids"]:
+            self._items.pop(reagent_id, None)
+        for reagent in result["changed"]:
+            expire = reagent["Tanggal_Expire"]
+            if self.identity_model.is_iso_date(expire) and expire <= horizon:
+                self._items[reagent["id"]] = reagent
+        self._dirty_ids -= result["dirty_ids"]
+
+        reagents = sorted(
+            self._items.values(), key=lambda r: (r["Tanggal_Expire"], r["id"])
+        )
+        for reagent in reagents:
+            reagent["storage_name"] = self._storage_names.get(
+                reagent["id_storage"], "Unknown"
+            )
+        self.expiring_loaded.emit(reagents, self.days)
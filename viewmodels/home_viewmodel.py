@@ -1,12 +1,17 @@
 # viewmodels/home_viewmodel.py
 from PyQt6.QtCore import QObject, pyqtSignal
 
+from viewmodels.db_worker import DatabaseWorker
+from viewmodels.expiry_viewmodel import ExpiryViewModel
+from viewmodels.reorder_viewmodel import ReorderViewModel
+
 
 class HomeViewModel(QObject):
     """ViewModel for home screen functionality"""
 
     # Define signals
     storage_data_loaded = pyqtSignal(list)
+    storage_stats_loaded = pyqtSignal(dict)  # id_storage -> statistics
     storage_error = pyqtSignal(str)
     user_data_loaded = pyqtSignal(dict)
 
@@ -18,6 +23,7 @@ class HomeViewModel(QObject):
         identity_model,
         usage_model,
         supporting_materials_model,
+        import_job_model=None,
     ):
         super().__init__()
         self.record_model = record_model
@@ -26,11 +32,17 @@ class HomeViewModel(QObject):
         self.identity_model = identity_model
         self.usage_model = usage_model
         self.supporting_materials_model = supporting_materials_model
+        self.import_job_model = import_job_model
         self.home_view = None
         self.search_viewmodel = None
         self.rack_viewmodels = {}
         self.current_user_id = None
         self.current_user_data = None
+        self.db_worker = DatabaseWorker(self)
+        self.expiry_viewmodel = ExpiryViewModel(identity_model, storage_model)
+        self.reorder_viewmodel = ReorderViewModel(
+            identity_model, usage_model, storage_model
+        )
 
     def create_home_view(self, parent_window):
         """Create and show the home view"""
@@ -50,6 +62,15 @@ class HomeViewModel(QObject):
 
             # Connect signals
             self.storage_data_loaded.connect(self.home_view.on_storage_data_loaded)
+            self.storage_stats_loaded.connect(self.home_view.on_storage_stats_loaded)
+            self.expiry_viewmodel.expiring_loaded.connect(
+                self.home_view.on_expiring_loaded
+            )
+            self.expiry_viewmodel.expiry_error.connect(self.home_view.on_storage_error)
+            self.reorder_viewmodel.reorder_loaded.connect(
+                self.home_view.on_reorder_loaded
+            )
+            self.reorder_viewmodel.reorder_error.connect(self.home_view.on_reorder_error)
             self.storage_error.connect(self.home_view.on_storage_error)
             self.user_data_loaded.connect(self.home_view.set_user_data)
 
@@ -103,12 +124,51 @@ class HomeViewModel(QObject):
         return self.load_current_user()
 
     def load_storage_data(self):
-        """Load storage data from the database"""
-        try:
-            storage_data = self.storage_model.get_all()
-            self.storage_data_loaded.emit(storage_data if storage_data else [])
-        except Exception as e:
-            self.storage_error.emit(f"Error getting storage data: {str(e)}")
+        """Load storage data from the database in the background"""
+        self.db_worker.submit(
+            self.storage_model.get_all,
+            key="storage",
+            on_result=lambda storage_data: self.storage_data_loaded.emit(
+                storage_data if storage_data else []
+            ),
+            on_error=lambda error: self.storage_error.emit(
+                f"Error getting storage data: {error}"
+            ),
+        )
+        self.load_storage_stats()
+
+    def load_storage_stats(self):
+        """Load the per-storage reagent statistics in the background"""
+        self.db_worker.submit(
+            self.identity_model.get_storage_stats,
+            key="storage_stats",
+            on_result=self.storage_stats_loaded.emit,
+            on_error=lambda error: print(f"Error getting storage statistics: {error}"),
+        )
+        self.load_expiring()
+        self.load_reorder()
+
+    def load_expiring(self):
+        """Bring the expiring reagents list up to date"""
+        self.expiry_viewmodel.refresh()
+
+    def load_reorder(self):
+        """Bring the list of reagents to reorder soon up to date"""
+        self.reorder_viewmodel.refresh()
+
+    def set_expiry_days(self, days):
+        """Change how many days ahead the expiring reagents list looks"""
+        self.expiry_viewmodel.set_days(days)
+
+    def create_import_viewmodel(self):
+        """Create the viewmodel for a bulk reagent import"""
+        from viewmodels.import_viewmodel import ImportViewModel
+
+        if not self.import_job_model:
+            return None
+        return ImportViewModel(
+            self.identity_model, self.storage_model, self.import_job_model
+        )
 
     def show_search(self):
         """Show the search view"""
@@ -126,6 +186,7 @@ class HomeViewModel(QObject):
                 self.supporting_materials_model,
             )
 
+        self.search_viewmodel.current_user = self.get_current_user()
         return self.search_viewmodel.create_search_view(self.home_view.parent_window)
 
     def show_rack(self, storage_id, storage_name):
@@ -143,6 +204,7 @@ class HomeViewModel(QObject):
             self.supporting_materials_model,
             storage_id,
             storage_name,
+            current_user=self.get_current_user(),
         )
 
         return self.rack_viewmodels[storage_id].create_rack_view(self.home_view)
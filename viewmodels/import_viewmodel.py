@@ -0,0 +1,449 @@
+# viewmodels/import_viewmodel.py
+import csv
+import hashlib
+import json
+import os
+import threading
+from datetime import date
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from viewmodels.db_worker import DatabaseWorker
+
+
+class ImportCancelled(Exception):
+    """Raised inside an import when the user cancelled it"""
+
+
+class ImportViewModel(QObject):
+    """
+    ViewModel for importing reagents in bulk from CSV or XLSX files.
+
+    Files are parsed as a stream and validated row by row; valid rows are
+    inserted with IdentityModel.create_many in batches. Each batch commits in
+    one transaction together with the job checkpoint, so an interrupted import
+    resumes after its last committed batch.
+    """
+
+    # Define signals
+    import_progress = pyqtSignal(int, int)  # rows done, total rows (0 if unknown)
+    import_finished = pyqtSignal(dict)  # summary, see _run_import()
+    import_error = pyqtSignal(str)
+
+    SUPPORTED_EXTENSIONS = (".csv", ".xlsx", ".xlsm")
+    BATCH_SIZE = 500
+    # Rejected rows kept for the summary; the job row counts all of them
+    MAX_REPORTED_ERRORS = 1000
+
+    # Reagent fields a source column can be mapped to, with the create_many()
+    # key each one fills
+    TARGET_FIELDS = {
+        "Name": "name",
+        "Description": "description",
+        "Wujud": "wujud",
+        "Stock": "stock",
+        "Massa": "massa",
+        "Tanggal_Expire": "tanggal_expire",
+        "Category_Hazard": "category_hazard",
+        "Sifat": "sifat",
+        "Tanggal_Produksi": "tanggal_produksi",
+        "Tanggal_Pembelian": "tanggal_pembelian",
+        "Storage": "id_storage",
+    }
+    INTEGER_FIELDS = ("Stock", "Massa")
+    DATE_FIELDS = ("Tanggal_Expire", "Tanggal_Produksi", "Tanggal_Pembelian")
+
+    # Header spellings mapped automatically, compared in lower case without
+    # spaces, dashes or underscores
+    HEADER_ALIASES = {
+        "name": "Name",
+        "nama": "Name",
+        "reagent": "Name",
+        "description": "Description",
+        "deskripsi": "Description",
+        "wujud": "Wujud",
+        "form": "Wujud",
+        "stock": "Stock",
+        "stok": "Stock",
+        "massa": "Massa",
+        "mass": "Massa",
+        "tanggalexpire": "Tanggal_Expire",
+        "expire": "Tanggal_Expire",
+        "expiry": "Tanggal_Expire",
+        "expirydate": "Tanggal_Expire",
+        "categoryhazard": "Category_Hazard",
+        "hazard": "Category_Hazard",
+        "sifat": "Sifat",
+        "tanggalproduksi": "Tanggal_Produksi",
+        "productiondate": "Tanggal_Produksi",
+        "tanggalpembelian": "Tanggal_Pembelian",
+        "purchasedate": "Tanggal_Pembelian",
+        "storage": "Storage",
+        "idstorage": "Storage",
+        "rack": "Storage",
+        "lemari": "Storage",
+    }
+
+    def __init__(self, identity_model, storage_model, import_job_model):
+        super().__init__()
+        self.identity_model = identity_model
+        self.storage_model = storage_model
+        self.import_job_model = import_job_model
+        self.db_worker = DatabaseWorker(self)
+        self._cancel_event = threading.Event()
+
+    def get_storages(self):
+        """Get the storages rows can be imported into"""
+        try:
+            return self.storage_model.get_all()
+        except Exception as e:
+            print(f"Error getting storages: {str(e)}")
+            return []
+
+    def read_headers(self, file_path):
+        """
+        Read the header row of a CSV or XLSX file
+
+        Returns:
+            list: Column names, empty if the file could not be read
+        """
+        try:
+            rows = self._iter_source_rows(file_path)
+            try:
+                headers = next(rows, [])
+            finally:
+                rows.close()
+            return [str(h).strip() if h is not None else "" for h in headers]
+        except Exception as e:
+            self.import_error.emit(f"Error reading {os.path.basename(file_path)}: {e}")
+            return []
+
+    def suggest_mapping(self, headers):
+        """
+        Guess which reagent field each column holds
+
+        Returns:
+            dict: Column name -> field name in TARGET_FIELDS, or None to skip it
+        """
+        mapping = {}
+        used = set()
+        for header in headers:
+            key = header.lower().replace(" ", "").replace("_", "").replace("-", "")
+            field = self.HEADER_ALIASES.get(key)
+            if field in used:
+                field = None  # Only the first column fills a field
+            if field:
+                used.add(field)
+            mapping[header] = field
+        return mapping
+
+    def find_resumable_job(self, file_path):
+        """
+        Get the unfinished import of this file, if there is one
+
+        Returns:
+            dict: The job row, or None
+        """
+        try:
+            return self.import_job_model.find_resumable(self._hash_file(file_path))
+        except Exception as e:
+            print(f"Error looking up import jobs: {str(e)}")
+            return None
+
+    def start_import(self, file_path, mapping, default_storage_id=1, resume_job_id=None):
+        """
+        Import a file in the background; progress and the result arrive
+        through the signals
+
+        Args:
+            file_path: CSV or XLSX file with a header row
+            mapping: Column name -> field name in TARGET_FIELDS (or None)
+            default_storage_id: Storage for rows without a storage value
+            resume_job_id: Unfinished job to continue instead of starting over;
+                its mapping and default storage are reused
+        """
+        self._cancel_event.clear()
+        self.db_worker.submit(
+            self._run_import,
+            file_path,
+            mapping,
+            default_storage_id,
+            resume_job_id,
+            key="import",
+            on_result=self.import_finished.emit,
+            on_error=lambda error: self.import_error.emit(
+                f"Error importing reagents: {error}"
+            ),
+        )
+
+    def cancel_import(self):
+        """Stop the running import after its current batch"""
+        self._cancel_event.set()
+
+    def _run_import(self, file_path, mapping, default_storage_id, resume_job_id):
+        """
+        Import the file; runs on a worker thread
+
+        Returns:
+            Dict with "job_id", "status" ("completed" or "cancelled"),
+            "rows_done", "imported", "rejected" (totals of the job, including
+            earlier runs) and "errors" (dicts with source "row" number and
+            "error" for the rows rejected by this run)
+        """
+        file_hash = self._hash_file(file_path)
+        start_row = 0
+        if resume_job_id:
+            job = self.import_job_model.get_by_id(resume_job_id)
+            if not job or job["Source_Hash"] != file_hash:
+                raise ValueError("The file changed since the import was interrupted")
+            job_id = resume_job_id
+            start_row = job["Rows_Done"]
+            mapping = json.loads(job["Mapping"]) if job["Mapping"] else mapping
+            if job["Default_Storage"] is not None:
+                default_storage_id = job["Default_Storage"]
+            self.import_job_model.set_status(job_id, "running")
+        else:
+            job_id = self.import_job_model.create(
+                file_path, file_hash, json.dumps(mapping), default_storage_id
+            )
+
+        storages = self.storage_model.get_all()
+        storage_ids = {s["id"] for s in storages}
+        storage_by_name = {
+            str(s["Name"]).strip().lower(): s["id"] for s in storages if s["Name"]
+        }
+        if default_storage_id not in storage_ids:
+            raise ValueError(f"Storage {default_storage_id} does not exist")
+
+        total = self._count_data_rows(file_path)
+        errors = []
+        status = "completed"
+        try:
+            rows = self._iter_source_rows(file_path)
+            try:
+                headers = [str(h).strip() if h is not None else "" for h in next(rows, [])]
+                # Column position -> field, for the mapped columns only
+                columns = [
+                    (position, mapping[header])
+                    for position, header in enumerate(headers)
+                    if mapping.get(header) in self.TARGET_FIELDS
+                ]
+                if not any(field == "Name" for _, field in columns):
+                    raise ValueError("No column is mapped to Name")
+
+                rows_done = start_row
+                batch, batch_rows, batch_rejected = [], [], 0
+                for index, values in enumerate(rows):
+                    if index < start_row:
+                        continue
+                    # Data rows start on the second line of the file
+                    row_number = index + 2
+                    rows_done = index + 1
+                    if not any(v not in (None, "") for v in values):
+                        continue  # Blank line
+                    reagent, error = self._convert_row(
+                        values, columns, default_storage_id, storage_ids, storage_by_name
+                    )
+                    if error:
+                        batch_rejected += 1
+                        self._report_error(errors, row_number, error)
+                    else:
+                        batch.append(reagent)
+                        batch_rows.append(row_number)
+
+                    if len(batch) + batch_rejected >= self.BATCH_SIZE:
+                        self._commit_batch(
+                            job_id, rows_done, batch, batch_rows, batch_rejected, errors
+                        )
+                        batch, batch_rows, batch_rejected = [], [], 0
+                        self.import_progress.emit(rows_done, total)
+                        if self._cancel_event.is_set():
+                            raise ImportCancelled()
+
+                self._commit_batch(
+                    job_id, rows_done, batch, batch_rows, batch_rejected, errors
+                )
+                self.import_progress.emit(rows_done, total)
+            finally:
+                rows.close()
+        except ImportCancelled:
+            status = "cancelled"
+        except Exception:
+            # Committed batches stay; the job can be resumed after them
+            self.import_job_model.set_status(job_id, "failed")
+            raise
+
+        self.import_job_model.set_status(job_id, status)
+        job = self.import_job_model.get_by_id(job_id)
+        return {
+            "job_id": job_id,
+            "status": status,
+            "rows_done": job["Rows_Done"],
+            "imported": job["Rows_Imported"],
+            "rejected": job["Rows_Rejected"],
+            "errors": errors,
+        }
+
+    def _commit_batch(self, job_id, rows_done, batch, batch_rows, batch_rejected, errors):
+        """Insert a batch and move the job checkpoint in one transaction"""
+        with self.identity_model.transaction():
+            result = (
+                self.identity_model.create_many(batch)
+                if batch
+                else {"succeeded": 0, "failed": []}
+            )
+            for failure in result["failed"]:
+                self._report_error(errors, batch_rows[failure["index"]], failure["error"])
+            self.import_job_model.record_batch(
+                job_id,
+                rows_done,
+                result["succeeded"],
+                batch_rejected + len(result["failed"]),
+            )
+
+    def _report_error(self, errors, row_number, error):
+        if len(errors) < self.MAX_REPORTED_ERRORS:
+            errors.append({"row": row_number, "error": str(error)})
+
+    def _convert_row(self, values, columns, default_storage_id, storage_ids, storage_by_name):
+        """
+        Validate a source row and turn it into create_many() arguments
+
+        Returns:
+            tuple: (reagent dict, None) or (None, error message)
+        """
+        reagent = {"stock": 0, "massa": 0, "id_storage": default_storage_id}
+        for position, field in columns:
+            value = values[position] if position < len(values) else None
+            if isinstance(value, str):
+                value = value.strip()
+            if value is None or value == "":
+                continue
+
+            if field in self.INTEGER_FIELDS:
+                try:
+                    number = float(str(value).replace(",", "."))
+                except ValueError:
+                    return None, f"{field} must be a number, got '{value}'"
+                if not number.is_integer() or number < 0:
+                    return None, f"{field} must be a whole number of at least 0, got '{value}'"
+                value = int(number)
+            elif field in self.DATE_FIELDS:
+                value = self.identity_model.normalize_date(value)
+                if not self._is_iso_date(value):
+                    return None, f"{field} is not a recognized date: '{values[position]}'"
+            elif field == "Category_Hazard":
+                # Same vocabulary the reagents are stored and classified with
+                categories = self.identity_model.HAZARD_CATEGORIES
+                known = {c.lower(): c for c in categories}
+                value = known.get(str(value).lower())
+                if value is None:
+                    return None, f"Category_Hazard must be one of {', '.join(categories)}"
+            elif field == "Wujud":
+                value = self.identity_model.normalize_wujud(value)
+                if value is None:
+                    return None, (
+                        f"Wujud must be one of {', '.join(self.identity_model.WUJUD_TYPES)}"
+                    )
+            elif field == "Storage":
+                value = self._resolve_storage(value, storage_ids, storage_by_name)
+                if value is None:
+                    return None, f"Unknown storage '{values[position]}'"
+            else:
+                value = str(value)
+            reagent[self.TARGET_FIELDS[field]] = value
+
+        if not reagent.get("name"):
+            return None, "Name is required"
+        return reagent, None
+
+    @staticmethod
+    def _is_iso_date(value):
+        try:
+            return (
+                isinstance(value, str)
+                and len(value) == 10
+                and bool(date.fromisoformat(value))
+            )
+        except ValueError:
+            return False
+
+    @staticmethod
+    def _resolve_storage(value, storage_ids, storage_by_name):
+        """Storage id for a storage name or id, None if there is no such storage"""
+        storage_id = storage_by_name.get(str(value).strip().lower())
+        if storage_id is not None:
+            return storage_id
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return None
+        if number.is_integer() and int(number) in storage_ids:
+            return int(number)
+        return None
+
+    def _iter_source_rows(self, file_path):
+        """Stream the rows (header first) of a CSV or XLSX file as lists"""
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension == ".csv":
+            return self._iter_csv_rows(file_path)
+        if extension in (".xlsx", ".xlsm"):
+            return self._iter_xlsx_rows(file_path)
+        raise ValueError(
+            f"Unsupported file type '{extension}', use {', '.join(self.SUPPORTED_EXTENSIONS)}"
+        )
+
+    @staticmethod
+    def _iter_csv_rows(file_path):
+        # utf-8-sig drops the byte order mark Excel writes in front of CSV files
+        with open(file_path, newline="", encoding="utf-8-sig") as f:
+            sample = f.read(64 * 1024)
+            f.seek(0)
+            try:
+                # Spreadsheets in comma-decimal locales export with ';'
+                dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+            except csv.Error:
+                dialect = csv.excel
+            yield from csv.reader(f, dialect)
+
+    @staticmethod
+    def _iter_xlsx_rows(file_path):
+        try:
+            import openpyxl
+        except ImportError:
+            raise ValueError("Importing XLSX files requires the openpyxl package")
+
+        # Read-only mode streams the sheet instead of loading it all
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            for row in workbook.active.iter_rows(values_only=True):
+                yield list(row)
+        finally:
+            workbook.close()
+
+    def _count_data_rows(self, file_path):
+        """Number of data rows for the progress total, 0 if unknown"""
+        try:
+            if file_path.lower().endswith(".csv"):
+                rows = self._iter_csv_rows(file_path)
+                try:
+                    return max(sum(1 for _ in rows) - 1, 0)
+                finally:
+                    rows.close()
+            import openpyxl
+
+            workbook = openpyxl.load_workbook(file_path, read_only=True)
+            try:
+                return max((workbook.active.max_row or 1) - 1, 0)
+            finally:
+                workbook.close()
+        except Exception:
+            return 0
+
+    @staticmethod
+    def _hash_file(file_path, chunk_size=1024 * 1024):
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
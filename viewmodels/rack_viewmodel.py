@@ -1,8 +1,13 @@
 from PyQt6.QtCore import QObject, pyqtSignal
 
+from viewmodels.db_worker import DatabaseWorker
+
 
 class RackViewModel(QObject):
-    reagents_loaded = pyqtSignal(list, str)  # reagents, rack_name
+    page_loaded = pyqtSignal(list, int, int, str)  # reagents, page, total, rack_name
+
+    # Order of reagents on the rack pages, see IdentityModel.PAGE_SORT_KEYS
+    SORT_KEY = "Name"
 
     def __init__(
         self,
@@ -12,6 +17,7 @@ class RackViewModel(QObject):
         supporting_materials_model,
         storage_id,
         storage_name,
+        current_user=None,
     ):
         super().__init__()
         self.identity_model = identity_model
@@ -20,8 +26,17 @@ class RackViewModel(QObject):
         self.supporting_materials_model = supporting_materials_model
         self.storage_id = storage_id
         self.storage_name = storage_name
+        self.current_user = current_user  # Logged-in user, recorded with new usage
         self.rack_view = None  # This will hold the RackView QWidget instance
         self.detail_viewmodel = None
+        self.db_worker = DatabaseWorker(self)
+
+        # Paging state; the view sets page_size to what fits on one page
+        self.page_size = 10
+        self.current_page = 0
+        self.total_count = 0
+        self._page_cursors = {0: None}  # page -> keyset cursor it starts after
+        self._page_cache = {}  # page -> rows, the visible page and its neighbours
 
     def get_usage_model(self):
         """Return the usage model instance"""
@@ -70,19 +85,19 @@ class RackViewModel(QObject):
         # Ensure the signal is connected (or reconnected) correctly without duplicates.
         try:
             # Attempt to disconnect first to prevent multiple connections to the same slot.
-            self.reagents_loaded.disconnect(self.rack_view.on_reagents_loaded)
+            self.page_loaded.disconnect(self.rack_view.on_page_loaded)
             print(
-                f"Disconnected reagents_loaded from {self.rack_view.on_reagents_loaded} for {view_key}"
+                f"Disconnected page_loaded from {self.rack_view.on_page_loaded} for {view_key}"
             )
         except TypeError:  # This exception occurs if the slot was not connected.
             print(
-                f"No prior connection or already disconnected for reagents_loaded for {view_key}"
+                f"No prior connection or already disconnected for page_loaded for {view_key}"
             )
             pass  # It's fine, just means it wasn't connected before.
 
-        self.reagents_loaded.connect(self.rack_view.on_reagents_loaded)
+        self.page_loaded.connect(self.rack_view.on_page_loaded)
         print(
-            f"Connected reagents_loaded to {self.rack_view.on_reagents_loaded} for {view_key}"
+            f"Connected page_loaded to {self.rack_view.on_page_loaded} for {view_key}"
         )
 
         try:
@@ -104,12 +119,82 @@ class RackViewModel(QObject):
         return True
 
     def load_reagents(self):
-        """Load reagents for this storage location"""
-        try:
-            reagents = self.identity_model.get_by_storage(self.storage_id)
-            self.reagents_loaded.emit(reagents if reagents else [], self.storage_name)
-        except Exception as e:
-            print(f"Error loading reagents: {str(e)}")
+        """(Re)load this storage location from its first page in the background"""
+        # Cached pages and cursors may be stale after an edit
+        self.db_worker.cancel("prefetch")
+        self._page_cursors = {0: None}
+        self._page_cache = {}
+        self.current_page = 0
+        self.db_worker.submit(
+            self._fetch_page,
+            None,
+            True,
+            key="reagents",
+            on_result=lambda result: self._on_page_fetched(0, result),
+            on_error=lambda error: print(f"Error loading reagents: {error}"),
+        )
+
+    def load_page(self, page):
+        """
+        Show a page of reagents, straight from the cache when it was prefetched
+
+        Only pages up to one past the furthest page seen can be loaded, since
+        each page starts after the last reagent of the one before it.
+        """
+        if page in self._page_cache:
+            self._on_page_fetched(page, (self._page_cache[page], None))
+            return
+        if page not in self._page_cursors:
+            return
+
+        self.db_worker.submit(
+            self._fetch_page,
+            self._page_cursors[page],
+            False,
+            key="reagents",
+            on_result=lambda result: self._on_page_fetched(page, result),
+            on_error=lambda error: print(f"Error loading reagents: {error}"),
+        )
+
+    def _fetch_page(self, after, with_count):
+        """Return (rows, total count or None) for one page; runs on a worker thread"""
+        rows = self.identity_model.get_summary_page_by_storage(
+            self.storage_id, self.page_size, after, self.SORT_KEY
+        )
+        total = self.identity_model.count_by_storage(self.storage_id) if with_count else None
+        return rows, total
+
+    def _on_page_fetched(self, page, result):
+        rows, total = result
+        if total is not None:
+            self.total_count = total
+        self.current_page = page
+        self._store_page(page, rows)
+        self.page_loaded.emit(rows, page, self.total_count, self.storage_name)
+        self._prefetch(page + 1)
+
+    def _store_page(self, page, rows):
+        """Cache a page, remember where the next one starts and drop far pages"""
+        self._page_cache[page] = rows
+        if len(rows) == self.page_size:
+            last = rows[-1]
+            self._page_cursors[page + 1] = (last["page_key"], last["id"])
+        for cached in list(self._page_cache):
+            if abs(cached - self.current_page) > 1:
+                del self._page_cache[cached]
+
+    def _prefetch(self, page):
+        """Fetch the next page in the background so paging forward is instant"""
+        if page in self._page_cache or page not in self._page_cursors:
+            return
+        self.db_worker.submit(
+            self._fetch_page,
+            self._page_cursors[page],
+            False,
+            key="prefetch",
+            on_result=lambda result: self._store_page(page, result[0]),
+            on_error=lambda error: print(f"Error prefetching reagents: {error}"),
+        )
 
     def show_reagent_details(self, reagent_id, came_from_search=False):
         if not self.rack_view:
@@ -128,6 +213,7 @@ class RackViewModel(QObject):
             rack_name=self.storage_name,
             parent=self.rack_view,  # Parent for ReagentDetailPanel is the RackView QWidget
             came_from_search=came_from_search,  # Pass the flag
+            usage_model=self.usage_model,
         )
         # Add ReagentDetailPanel to the RackView's internal stack
         # It's important that if a detail_panel already exists for this reagent_id in the stack,
@@ -207,6 +293,7 @@ class RackViewModel(QObject):
             reagent_id=reagent_id,
             reagent_name=reagent_name,
             usage_id=None,
+            current_user=self.current_user,
         )
         return usage_viewmodel.create_usage_edit_view(self.rack_view.parent_window)
 
@@ -224,5 +311,6 @@ class RackViewModel(QObject):
             reagent_id=reagent_id,
             reagent_name=reagent_name,
             usage_id=report_id,
+            current_user=self.current_user,
         )
         return usage_viewmodel.create_usage_edit_view(self.rack_view.parent_window)
@@ -1,5 +1,9 @@
 # viewmodels/reagent_viewmodel.py
+import os
 import re
+import tempfile
+
+from viewmodels.thumbnail_generator import generate_thumbnails
 
 
 class ReagentViewModel:
@@ -8,7 +12,10 @@ class ReagentViewModel:
     This mediates between the View (ReagentDetailPanel) and the Model (identity_model).
     """
 
-    def __init__(self, identity_model, reagent_id=None, rack_name=None):
+    # Leading bytes of the image formats the upload dialog accepts
+    _IMAGE_SIGNATURES = {b"\x89PNG": ".png", b"\xff\xd8": ".jpg", b"BM": ".bmp"}
+
+    def __init__(self, identity_model, reagent_id=None, rack_name=None, usage_model=None):
         """
         Initialize the ViewModel with model and data references
 
@@ -16,8 +23,10 @@ class ReagentViewModel:
             identity_model: The data model for reagent operations
             reagent_id: ID of existing reagent (None for new reagent)
             rack_name: Name of the rack where reagent is stored
+            usage_model: The usage model, for the reagent's usage totals
         """
         self.identity_model = identity_model
+        self.usage_model = usage_model
         self.reagent_id = reagent_id
         self.rack_name = rack_name
         self.is_new = reagent_id is None
@@ -25,15 +34,20 @@ class ReagentViewModel:
         self.temp_image_data = None
         self.temp_sds_data = None
         self.temp_sds_filename = None
+        # PDF chosen for upload, streamed into the database when saved
+        self.temp_sds_path = None
 
         # Load existing reagent data if applicable
         self.original_data = {}
+        # Form values shown for the loaded reagent, see set_displayed_data()
+        self.displayed_data = {}
         if not self.is_new and self.reagent_id:
             self._load_data()
 
     def _load_data(self):
         """Load data for an existing reagent"""
-        reagent = self.identity_model.get_by_id(self.reagent_id)
+        # Image and SDS are fetched on demand by get_image / get_sds
+        reagent = self.identity_model.get_summary_by_id(self.reagent_id)
         # Store original data for cancel functionality
         self.original_data = reagent.copy() if reagent else {}
 
@@ -41,52 +55,141 @@ class ReagentViewModel:
         """Return the current reagent data"""
         return self.original_data
 
+    def set_displayed_data(self, form_data):
+        """
+        Record the form values shown for the loaded reagent. The form cannot
+        always show the stored value (a NULL date shows a default, a value
+        outside a combo's list shows another), so saving compares against
+        these to write only the fields the user actually edited.
+
+        Args:
+            form_data: The form data as collected right after loading
+        """
+        self.displayed_data = dict(form_data)
+
+    def get_wujud_types(self):
+        """Physical forms offered by the form, the ones reagents are stored with"""
+        return list(self.identity_model.WUJUD_TYPES)
+
+    def get_hazard_categories(self):
+        """Hazard categories offered by the form, the ones reagents are classified by"""
+        return list(self.identity_model.HAZARD_CATEGORIES)
+
+    def get_usage_summary(self):
+        """
+        Get the reagent's usage totals
+
+        Returns:
+            dict: Total_Used, Usage_Count, First_Used, Last_Used and Last_User,
+            or None if the reagent was never used or usage is unavailable
+        """
+        if self.is_new or not self.usage_model:
+            return None
+        try:
+            return self.usage_model.get_summary(self.reagent_id)
+        except Exception as e:
+            print(f"Error getting usage summary: {str(e)}")
+            return None
+
     def toggle_edit_mode(self):
         """Toggle between view and edit modes"""
         self.edit_mode = not self.edit_mode
 
-    def save_reagent(self, reagent_data):
+    def save_reagent(self, reagent_data, progress=None):
         """
         Save reagent data to the model
 
         Args:
             reagent_data: Dictionary containing reagent form data
+            progress: Called with (bytes_done, bytes_total) while a pending
+                SDS file is streamed into the database
 
         Returns:
             tuple: (success_bool, message_string)
         """
-        # Convert rack name to storage ID
-        reagent_data["id_storage"] = self._get_storage_id_from_rack_name()
-        # print("Saving reagent data " + str(reagent_data))
-
         try:
-            if self.is_new:
-                # Create new reagent - convert parameter names to lowercase
-                lowercase_data = self._convert_keys_to_lowercase(reagent_data)
-                result = self.identity_model.create(**lowercase_data)
-
-                if result and isinstance(result, int):
-                    self.reagent_id = result
-                    self.is_new = False
-                    self.original_data = reagent_data.copy()
-                    return True, "New reagent added successfully"
-                else:
-                    return False, "Failed to create reagent"
-            else:
-                # Update existing reagent
-                result = self.identity_model.update(self.reagent_id, **reagent_data)
-
-                if result:
-                    # Exit edit mode and update original data
-                    self.edit_mode = False
-                    self.original_data = reagent_data.copy()
-                    return True, "Reagent updated successfully"
+            # The reagent and its pending SDS file are saved together or not at all
+            with self.identity_model.transaction():
+                if self.is_new:
+                    # Convert rack name to storage ID
+                    reagent_data["id_storage"] = self._get_storage_id_from_rack_name()
+                    # Create new reagent - convert parameter names to lowercase
+                    lowercase_data = self._convert_keys_to_lowercase(reagent_data)
+                    result = self.identity_model.create(**lowercase_data)
+
+                    if result and isinstance(result, int):
+                        self._save_pending_sds(result, progress)
+                        self.reagent_id = result
+                        self.is_new = False
+                        self.original_data = reagent_data.copy()
+                        self.temp_image_data = None
+                        return True, "New reagent added successfully"
+                    else:
+                        return False, "Failed to create reagent"
                 else:
-                    return False, "Failed to update reagent"
+                    # Update existing reagent, writing only the columns the
+                    # user changed so an edited stock count does not rewrite
+                    # the image
+                    changes = self._get_changed_fields(reagent_data)
+                    result = (
+                        self.identity_model.update(self.reagent_id, **changes)
+                        if changes
+                        else True
+                    )
+
+                    if result:
+                        self._save_pending_sds(self.reagent_id, progress)
+                        # Exit edit mode and update original data
+                        self.edit_mode = False
+                        self.original_data.update(changes)
+                        self.temp_image_data = None
+                        return True, "Reagent updated successfully"
+                    else:
+                        return False, "Failed to update reagent"
 
         except Exception as e:
             return False, f"Error: {str(e)}"
 
+    def _get_changed_fields(self, reagent_data):
+        """
+        Get the form fields the user changed: those that differ from what the
+        form displayed on load, or from the loaded reagent for fields the
+        form did not display (e.g. a newly chosen image)
+
+        Args:
+            reagent_data: Dictionary containing reagent form data
+
+        Returns:
+            dict: The changed fields with their new values
+        """
+        changes = {}
+        for field, value in reagent_data.items():
+            if field in self.displayed_data:
+                if value != self.displayed_data[field]:
+                    if field in self.identity_model.DATE_FIELDS:
+                        value = self.identity_model.normalize_date(value)
+                    changes[field] = value
+                continue
+            original = self.original_data.get(field)
+            # Empty text fields come back from the form as "" for NULL columns
+            if value == "" and original is None:
+                continue
+            if field in self.identity_model.DATE_FIELDS:
+                value = self.identity_model.normalize_date(value)
+            if value != original:
+                changes[field] = value
+        return changes
+
+    def _save_pending_sds(self, reagent_id, progress=None):
+        """Stream the SDS file chosen for upload, if any, into the reagent"""
+        if not self.temp_sds_path:
+            return
+        if not self.identity_model.update_sds_from_file(
+            reagent_id, self.temp_sds_path, self.temp_sds_filename, progress
+        ):
+            raise RuntimeError("Failed to save SDS file")
+        self.temp_sds_path = None
+
     def _convert_keys_to_lowercase(self, data_dict):
         """
         Convert dictionary keys to lowercase for compatibility with model methods
@@ -152,6 +255,7 @@ class ReagentViewModel:
         self.temp_image_data = None
         self.temp_sds_data = None
         self.temp_sds_filename = None
+        self.temp_sds_path = None
 
         # Just exit edit mode, the view will reload the original data
         self.edit_mode = False
@@ -239,6 +343,61 @@ class ReagentViewModel:
 
         return None
 
+    def get_thumbnail(self, size=300):
+        """
+        Get image data for display at about size pixels. A stored image comes
+        back as a thumbnail so the full-size original is never decoded; a newly
+        chosen image that is not saved yet is returned as-is.
+
+        Args:
+            size: Wanted longest edge in pixels
+
+        Returns:
+            bytes: Image data if available, None otherwise
+        """
+        if self.temp_image_data:
+            return self.temp_image_data
+
+        if not self.is_new and self.reagent_id:
+            thumbnail = self.identity_model.get_thumbnail(self.reagent_id, size)
+            if thumbnail is None:
+                # Not made yet; decode the original once, outside any transaction
+                pending = self.identity_model.get_image_to_thumbnail(self.reagent_id)
+                if pending:
+                    thumbnails = generate_thumbnails(
+                        pending["Image"], self.identity_model.thumbnails.SIZES
+                    )
+                    self.identity_model.store_thumbnails(
+                        self.reagent_id, thumbnails, pending["Image_Hash"]
+                    )
+                    thumbnail = self.identity_model.get_thumbnail(self.reagent_id, size)
+            return thumbnail
+
+        return None
+
+    def prepare_image_file(self):
+        """
+        Write the full-size image to a temporary file, for opening in an
+        image viewer
+
+        Returns:
+            str: Path of the image file, or None if there is no image
+        """
+        image_data = self.get_image()
+        if not image_data:
+            return None
+
+        suffix = ".img"
+        for signature, extension in self._IMAGE_SIGNATURES.items():
+            if image_data.startswith(signature):
+                suffix = extension
+                break
+
+        fd, temp_path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd, "wb") as f:
+            f.write(image_data)
+        return temp_path
+
     def update_sds(self, sds_data, sds_filename):
         """
         Set SDS data to be saved with the reagent
@@ -252,6 +411,7 @@ class ReagentViewModel:
         """
         self.temp_sds_data = sds_data
         self.temp_sds_filename = sds_filename
+        self.temp_sds_path = None
 
         # If we're updating an existing reagent and not in edit mode (direct SDS update)
         if not self.is_new and not self.edit_mode and self.reagent_id:
@@ -272,6 +432,85 @@ class ReagentViewModel:
 
         return True, "SDS will be saved with reagent data"
 
+    def update_sds_from_file(self, file_path, progress=None):
+        """
+        Set the SDS from a PDF file without reading it into memory; the file
+        is streamed into the database when the reagent is saved
+
+        Args:
+            file_path: Path of the PDF file
+            progress: Called with (bytes_done, bytes_total) while streaming
+
+        Returns:
+            tuple: (success_bool, message_string)
+        """
+        self.temp_sds_path = file_path
+        self.temp_sds_filename = os.path.basename(file_path)
+        self.temp_sds_data = None
+
+        # Existing reagent outside edit mode: store it right away
+        if not self.is_new and not self.edit_mode and self.reagent_id:
+            try:
+                self._save_pending_sds(self.reagent_id, progress)
+                return True, "SDS updated successfully"
+            except Exception as e:
+                return False, f"Error updating SDS: {str(e)}"
+
+        return True, "SDS will be saved with reagent data"
+
+    def get_sds_info(self):
+        """
+        Get the SDS filename and size without loading the PDF
+
+        Returns:
+            dict: "filename" and "size" if an SDS is available, None otherwise
+        """
+        if self.temp_sds_path:
+            return {
+                "filename": self.temp_sds_filename,
+                "size": os.path.getsize(self.temp_sds_path),
+            }
+
+        if self.temp_sds_data:
+            return {
+                "filename": self.temp_sds_filename or "safety_data_sheet.pdf",
+                "size": len(self.temp_sds_data),
+            }
+
+        if not self.is_new and self.reagent_id:
+            return self.identity_model.get_sds_info(self.reagent_id)
+
+        return None
+
+    def prepare_sds_file(self, progress=None):
+        """
+        Get a file on disk holding the SDS, for opening in a PDF viewer.
+        A stored SDS is streamed out to a temporary file.
+
+        Args:
+            progress: Called with (bytes_done, bytes_total) while streaming
+
+        Returns:
+            str: Path of the PDF file, or None if there is no SDS
+        """
+        if self.temp_sds_path:
+            return self.temp_sds_path
+
+        fd, temp_path = tempfile.mkstemp(suffix=".pdf")
+        os.close(fd)
+
+        if self.temp_sds_data:
+            with open(temp_path, "wb") as f:
+                f.write(self.temp_sds_data)
+            return temp_path
+
+        if not self.is_new and self.reagent_id:
+            if self.identity_model.export_sds(self.reagent_id, temp_path, progress):
+                return temp_path
+
+        os.remove(temp_path)
+        return None
+
     def get_sds(self):
         """
         Get the SDS data for this reagent
@@ -301,6 +540,7 @@ class ReagentViewModel:
         """
         self.temp_sds_data = None
         self.temp_sds_filename = None
+        self.temp_sds_path = None
 
         # If we're updating an existing reagent directly
         if not self.is_new and self.reagent_id:
@@ -0,0 +1,106 @@
+# viewmodels/reorder_viewmodel.py
+from datetime import date
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from models.forecast_model import ForecastModel
+from viewmodels.db_worker import DatabaseWorker
+
+
+class ReorderViewModel(QObject):
+    """
+    ViewModel for the list of reagents to reorder soon, from the usage
+    forecasts of the ForecastModel.
+
+    The whole usage window is read once a day; after that only reagents whose
+    usage or stock changed through the models are re-read and re-forecast.
+    """
+
+    reorder_loaded = pyqtSignal(list)  # reagents, soonest to run out first
+    reorder_error = pyqtSignal(str)
+    # Model change notifications, delivered on the GUI thread as in
+    # ExpiryViewModel
+    _changed = pyqtSignal(object)
+
+    # Also list reagents running out within this many days, even when their
+    # stock is still above the reorder point
+    WITHIN_DAYS = 14
+
+    def __init__(self, identity_model, usage_model, storage_model):
+        super().__init__()
+        self.forecast_model = ForecastModel(usage_model, identity_model)
+        self.storage_model = storage_model
+        self.db_worker = DatabaseWorker(self)
+
+        self._storage_names = {}
+        self._dirty_ids = set()  # Reagents whose usage or stock changed
+        # Bumped when many rows change at once, like in ExpiryViewModel
+        self._reload_generation = 1
+        self._loaded_generation = 0
+        self._changed.connect(self._on_changed)
+        identity_model.add_change_listener(self._changed.emit)
+        usage_model.add_change_listener(self._changed.emit)
+
+    def _on_changed(self, identity_ids):
+        """Remember what changed; it is re-read on the next refresh()"""
+        if identity_ids is None:
+            self._reload_generation += 1
+        else:
+            self._dirty_ids.update(identity_ids)
+
+    def refresh(self):
+        """Bring the list up to date in the background"""
+        today = date.today()
+        full = (
+            self._loaded_generation != self._reload_generation
+            or self.forecast_model.end != today
+        )
+        if not full and not self._dirty_ids:
+            self._emit_list()
+            return
+
+        self.db_worker.submit(
+            self._fetch_changes,
+            today,
+            full,
+            set(self._dirty_ids),
+            self._reload_generation,
+            key="reorder",
+            on_result=self._apply_changes,
+            on_error=lambda error: self.reorder_error.emit(
+                f"Error forecasting reagent usage: {error}"
+            ),
+        )
+
+    def _fetch_changes(self, today, full, dirty_ids, generation):
+        """Read the usage to forecast; runs on a worker thread"""
+        result = {
+            "loaded": self.forecast_model.load(today, None if full else dirty_ids),
+            "generation": generation,
+            "dirty_ids": dirty_ids,
+        }
+        if full:
+            result["storage_names"] = {
+                storage["id"]: storage["Name"] for storage in self.storage_model.get_all()
+            }
+        return result
+
+    def _apply_changes(self, result):
+        try:
+            self.forecast_model.apply(result["loaded"])
+        except ValueError as e:
+            self.reorder_error.emit(f"Error forecasting reagent usage: {str(e)}")
+            return
+        if "storage_names" in result:
+            self._storage_names = result["storage_names"]
+            self._loaded_generation = result["generation"]
+        self._dirty_ids -= result["dirty_ids"]
+        self._emit_list()
+
+    def _emit_list(self):
+        reagents = self.forecast_model.reorder_soon(self.WITHIN_DAYS)
+        for reagent in reagents:
+            reagent["storage_name"] = self._storage_names.get(
+                reagent["id_storage"], "Unknown"
+            )
+        self.reorder_loaded.emit(reagents)
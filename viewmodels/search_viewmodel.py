@@ -1,6 +1,8 @@
 # viewmodels/search_viewmodel.py
 from PyQt6.QtCore import QObject, pyqtSignal
 
+from viewmodels.db_worker import DatabaseWorker
+
 
 class SearchViewModel(QObject):
     """ViewModel for reagent search functionality"""
@@ -19,8 +21,10 @@ class SearchViewModel(QObject):
         self.supporting_model = (
             supporting_model  # Add supporting materials model reference
         )
+        self.current_user = None  # Set by the home viewmodel
         self.search_view = None
         self.rack_viewmodels = {}
+        self.db_worker = DatabaseWorker(self)
 
     def create_search_view(self, parent_window):
         """Create and show the search view"""
@@ -50,58 +54,68 @@ class SearchViewModel(QObject):
         return True
 
     def search_reagents(self, search_term, search_field="All Fields"):
-        """Search reagents based on term and field"""
-        try:
-            # Get all reagents from identity model
-            all_reagents = self.identity_model.get_all()
-
-            # Get storage information
-            storage_info = {}
-            all_storage = self.storage_model.get_all()
-            for storage in all_storage:
-                storage_info[storage.get("id")] = storage.get("Name")
-
-            # Filter results
-            search_term = search_term.lower()
-            results = []
-
-            for reagent in all_reagents:
-                storage_id = reagent.get("id_storage")
-                reagent["storage_name"] = storage_info.get(storage_id, "Unknown")
-
-                if not search_term:
-                    # If search term is empty, include all results
-                    results.append(reagent)
-                    continue
-
-                # Filter based on search field
-                if search_field == "All Fields":
-                    # Search across multiple fields
-                    searchable_fields = [
-                        "Name",
-                        "Description",
-                        "Wujud",
-                        "Category_Hazard",
-                        "Sifat",
-                    ]
-
-                    # Check if search term appears in any searchable field
-                    for field in searchable_fields:
-                        field_value = str(reagent.get(field, "")).lower()
-                        if search_term in field_value:
-                            results.append(reagent)
-                            break
-                else:
-                    # Search in specific field
-                    field_value = str(reagent.get(search_field, "")).lower()
+        """Search reagents based on term and field in the background"""
+        # A new search supersedes one that is still running
+        self.db_worker.submit(
+            self._find_reagents,
+            search_term,
+            search_field,
+            key="search",
+            on_result=self.search_results.emit,
+            on_error=lambda error: self.search_error.emit(
+                f"Error searching reagents: {error}"
+            ),
+        )
+
+    def _find_reagents(self, search_term, search_field):
+        """Return the reagents matching the search; runs on a worker thread"""
+        # Get storage information
+        storage_info = {}
+        all_storage = self.storage_model.get_all()
+        for storage in all_storage:
+            storage_info[storage.get("id")] = storage.get("Name")
+
+        # Stream reagents so only the matches are kept in memory; the SDS and
+        # Image BLOBs are never shown in the results so they are not fetched
+        all_reagents = self.identity_model.iter_all_summaries()
+
+        # Filter results
+        search_term = search_term.lower()
+        results = []
+
+        for reagent in all_reagents:
+            storage_id = reagent.get("id_storage")
+            reagent["storage_name"] = storage_info.get(storage_id, "Unknown")
+
+            if not search_term:
+                # If search term is empty, include all results
+                results.append(reagent)
+                continue
+
+            # Filter based on search field
+            if search_field == "All Fields":
+                # Search across multiple fields
+                searchable_fields = [
+                    "Name",
+                    "Description",
+                    "Wujud",
+                    "Category_Hazard",
+                    "Sifat",
+                ]
+
+                # Check if search term appears in any searchable field
+                for field in searchable_fields:
+                    field_value = str(reagent.get(field, "")).lower()
                     if search_term in field_value:
                         results.append(reagent)
+                        break
+            else:
+                # Search in specific field
+                field_value = str(reagent.get(search_field, "")).lower()
+                if search_term in field_value:
+                    results.append(reagent)
 
-            # Emit search results
-            self.search_results.emit(results)
-
-        except Exception as e:
-            self.search_error.emit(f"Error searching reagents: {str(e)}")
+        return results
 
     def view_reagent_details(self, reagent_id, storage_id):
         """Show details for the selected reagent"""
@@ -126,6 +140,7 @@ class SearchViewModel(QObject):
             )
 
         rack_vm = self.rack_viewmodels[storage_id]
+        rack_vm.current_user = self.current_user
         # Create_rack_view now takes the main window (LoginView) as parent_window
         # This adds the RackView to the LoginView's main stacked_widget
         rack_vm.create_rack_view(self.search_view.parent_window)
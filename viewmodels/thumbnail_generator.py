@@ -0,0 +1,56 @@
+# viewmodels/thumbnail_generator.py
+from typing import Dict, Iterable
+
+from PyQt6.QtCore import QBuffer, QByteArray, QIODevice, Qt
+from PyQt6.QtGui import QImage, QImageReader, QPainter
+
+
+def generate_thumbnails(image_data: bytes, sizes: Iterable[int]) -> Dict[int, bytes]:
+    """
+    Decode an image once and encode a JPEG thumbnail for each size.
+    Images smaller than a size are not upscaled.
+
+    Decoding can take a while for large photos, so call this outside any
+    database transaction and store the result with
+    IdentityModel.store_thumbnails().
+
+    Args:
+        image_data: The original image bytes
+        sizes: Longest edge of each thumbnail, e.g. ThumbnailModel.SIZES
+
+    Returns:
+        Dict mapping size to thumbnail bytes; empty if the data is not
+        a readable image
+    """
+    source = QBuffer()
+    source.setData(QByteArray(image_data))
+    source.open(QIODevice.OpenModeFlag.ReadOnly)
+    reader = QImageReader(source)
+    reader.setAutoTransform(True)  # Apply EXIF rotation of phone photos
+    image = reader.read()
+    if image.isNull():
+        return {}
+    if image.hasAlphaChannel():
+        # JPEG has no alpha; flatten onto white instead of black
+        flattened = QImage(image.size(), QImage.Format.Format_RGB32)
+        flattened.fill(Qt.GlobalColor.white)
+        painter = QPainter(flattened)
+        painter.drawImage(0, 0, image)
+        painter.end()
+        image = flattened
+
+    thumbnails = {}
+    # Scale from the largest size down, each step from the previous one
+    for size in sorted(sizes, reverse=True):
+        if max(image.width(), image.height()) > size:
+            image = image.scaled(
+                size,
+                size,
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation,
+            )
+        target = QBuffer()
+        target.open(QIODevice.OpenModeFlag.WriteOnly)
+        if image.save(target, "JPEG", 85):
+            thumbnails[size] = bytes(target.data())
+    return thumbnails
@@ -1,5 +1,7 @@
 from PyQt6.QtCore import QObject, pyqtSignal, QDate
 
+from models.user_model import UserModel
+
 
 class UsageEditViewModel(QObject):
     usage_loaded = pyqtSignal(
@@ -17,6 +19,7 @@ class UsageEditViewModel(QObject):
         reagent_id,
         reagent_name,
         usage_id=None,
+        current_user=None,
     ):
         super().__init__()
         self.usage_model = usage_model
@@ -25,6 +28,7 @@ class UsageEditViewModel(QObject):
         self.reagent_id = reagent_id
         self.reagent_name = reagent_name
         self.usage_id = usage_id
+        self.current_user = current_user  # Logged-in user, new usage is theirs
         self.is_new = usage_id is None
         self.original_amount = 0
         self.current_stock = 0
@@ -62,13 +66,15 @@ class UsageEditViewModel(QObject):
             supporting_materials = self.supporting_materials_model.get_all()
 
             if self.is_new:
+                user = self.current_user
                 self.usage_loaded.emit(
                     {
                         "ReagentName": self.reagent_name,
                         "Tanggal_Terpakai": QDate.currentDate().toString("yyyy-MM-dd"),
                         "Jumlah_Terpakai": 1,
-                        "User": "",
+                        "User": UserModel.display_name(user) if user else "",
                         "Bahan_Pendukung": "",
+                        "id_user": user["id"] if user else None,
                     },
                     True,
                     self.current_stock,
@@ -108,46 +114,59 @@ class UsageEditViewModel(QObject):
                 self.error.emit("Please enter a user name")
                 return
 
-            net_change = (
-                data["Jumlah_Terpakai"]
-                if self.is_new
-                else (data["Jumlah_Terpakai"] - self.original_amount)
-            )
-
-            if net_change > self.current_stock:
-                # Warn but allow saving
-                pass
-
-            # Process supporting material - save to supporting materials model if needed
-            supporting_material = data["Bahan_Pendukung"]
-            if supporting_material:
-                # This will either create a new material or return the ID of an existing one
-                self.supporting_materials_model.create(supporting_material)
-
-            if self.is_new:
-                result = self.usage_model.create(
-                    tanggal_terpakai=data["Tanggal_Terpakai"],
-                    jumlah_terpakai=data["Jumlah_Terpakai"],
-                    user=data["User"],
-                    bahan_pendukung=data["Bahan_Pendukung"],
-                    id_identity=self.reagent_id,
-                )
-                success_message = "Usage report added successfully"
-            else:
-                result = self.usage_model.update(
-                    self.usage_id,
-                    Tanggal_Terpakai=data["Tanggal_Terpakai"],
-                    Jumlah_Terpakai=data["Jumlah_Terpakai"],
-                    User=data["User"],
-                    Bahan_Pendukung=data["Bahan_Pendukung"],
-                )
-                success_message = "Usage report updated successfully"
+            # Material, usage row and stock change are committed together;
+            # the usage model adds a new supporting material by itself
+            with self.usage_model.transaction():
+                if self.is_new:
+                    result = self.usage_model.create(
+                        tanggal_terpakai=data["Tanggal_Terpakai"],
+                        jumlah_terpakai=data["Jumlah_Terpakai"],
+                        user=data["User"],
+                        bahan_pendukung=data["Bahan_Pendukung"],
+                        id_identity=self.reagent_id,
+                        id_user=(
+                            self.current_user["id"] if self.current_user else None
+                        ),
+                    )
+                    success_message = "Usage report added successfully"
+                else:
+                    # Another user may have edited this report since the form
+                    # was loaded; the stock change is relative to what is stored
+                    usage = self.usage_model.get_by_id(self.usage_id)
+                    fields = {}
+                    if usage:
+                        self.original_amount = usage.get("Jumlah_Terpakai") or 0
+                        # A renamed report must not stay linked to the old account
+                        if self.usage_model.normalize_user_name(
+                            usage.get("User")
+                        ) != self.usage_model.normalize_user_name(data["User"]):
+                            fields["id_user"] = self._user_id_for(data["User"])
+                    result = self.usage_model.update(
+                        self.usage_id,
+                        Tanggal_Terpakai=data["Tanggal_Terpakai"],
+                        Jumlah_Terpakai=data["Jumlah_Terpakai"],
+                        User=data["User"],
+                        Bahan_Pendukung=data["Bahan_Pendukung"],
+                        **fields,
+                    )
+                    success_message = "Usage report updated successfully"
+
+                if result:
+                    # Update stock in SQL rather than writing back the stock
+                    # read when the form was loaded, which would undo usage
+                    # logged by others in the meantime
+                    net_change = (
+                        data["Jumlah_Terpakai"]
+                        if self.is_new
+                        else (data["Jumlah_Terpakai"] - self.original_amount)
+                    )
+                    new_stock = self.identity_model.adjust_stock(
+                        self.reagent_id, net_change
+                    )
+                    if new_stock is not None:
+                        self.current_stock = new_stock
 
             if result:
-                # Update stock
-                new_stock = max(0, self.current_stock - net_change)
-                self.identity_model.update(self.reagent_id, Stock=new_stock)
-
                 self.success.emit(success_message)
                 if self.usage_edit_view and self.usage_edit_view.parent_window:
                     parent = self.usage_edit_view.parent_window
@@ -168,6 +187,16 @@ class UsageEditViewModel(QObject):
         except Exception as e:
             self.error.emit(f"Error saving usage report: {str(e)}")
 
+    def _user_id_for(self, name):
+        """Account of a typed user name, preferring the logged-in user"""
+        user = self.current_user
+        if user and self.usage_model.normalize_user_name(name) in (
+            self.usage_model.normalize_user_name(UserModel.display_name(user)),
+            self.usage_model.normalize_user_name(user.get("username")),
+        ):
+            return user["id"]
+        return self.usage_model.find_user_id(name)
+
     def _refresh_usage_reports_view(self, parent_window):
         """Find and refresh the usage report view if it exists"""
         # Look through all widgets in the stacked widget to find UsageReportView
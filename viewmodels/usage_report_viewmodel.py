@@ -1,6 +1,9 @@
 # viewmodels/usage_report_viewmodel.py
 from PyQt6.QtCore import QObject, pyqtSignal
-from datetime import datetime
+from datetime import date, timedelta
+import itertools
+
+from viewmodels.db_worker import DatabaseWorker
 
 # IMPORTANT: You would need to install and import an Excel library
 # For example:
@@ -10,8 +13,8 @@ import xlsxwriter  # Using xlsxwriter as specified
 
 
 class UsageReportViewModel(QObject):
-    # Signal to notify view of data changes
-    data_changed = pyqtSignal()
+    # Signal to notify view of loaded rows
+    page_loaded = pyqtSignal(int, int)  # index of the first new row, total matching rows
     # Add a new signal for export feedback
     export_finished = pyqtSignal(bool, str)  # success_status, message
 
@@ -24,53 +27,116 @@ class UsageReportViewModel(QObject):
 
         # Store state
         self.usage_reports = []
+        self.page_size = 100
+        self.total_count = 0
+        self.has_more = False
+        # History filters, see UsageModel.get_page()
+        self.filters = {"start": None, "end": None, "user": None, "bahan_pendukung": None}
+        self._reagent_id = None
+        self._next_after = None  # Keyset cursor of the next page
+        self._loading_more = False
+        self.db_worker = DatabaseWorker(self)
+
+    def set_period(self, days):
+        """Only show usage of the last days days (None for the whole history)"""
+        self.filters["start"] = (
+            (date.today() - timedelta(days=days)).isoformat() if days else None
+        )
+
+    def set_filter(self, name, value):
+        """Set the user or bahan_pendukung filter; empty values clear it"""
+        self.filters[name] = value or None
 
     def load_usage_data(self, reagent_id):
-        """Load usage data for the specified reagent"""
-        try:
-            # Fetch the raw data from the model
-            raw_reports = self.usage_model.get_by_identity(reagent_id)  #
-
-            # Process the raw data into a view-friendly format
-            self.usage_reports = []
-
-            for report in raw_reports:
-                # Format date
-                date_used = report.get("Tanggal_Terpakai", "")  #
-                formatted_date = date_used
-
-                if date_used:
-                    try:
-                        date_obj = datetime.strptime(date_used, "%Y-%m-%d")
-                        formatted_date = date_obj.strftime("%d %b %Y")
-                    except ValueError:  # More specific exception
-                        pass  # Keep original format if parsing fails
-
-                # Create processed report object
-                processed_report = {
-                    "id": report.get("id"),  #
-                    "raw_date": date_used,
-                    "formatted_date": formatted_date,
-                    "amount_used": report.get("Jumlah_Terpakai", 0),  #
-                    "user": report.get("User", ""),  #
-                    "supporting_materials": report.get("Bahan_Pendukung", ""),  #
-                    # Store all original data for potential future use
-                    "raw_data": report,
-                }
-
-                self.usage_reports.append(processed_report)
-
-            # Notify view that data has changed
-            self.data_changed.emit()
-
-            return True
-
-        except Exception as e:
-            print(f"Error loading usage data: {str(e)}")
-            # It's better to re-raise or handle appropriately
-            # For now, emitting an error or logging might be suitable.
-            # For simplicity, we'll let it propagate or return False
+        """Load the first page of usage data for the specified reagent in the background"""
+        self._reagent_id = reagent_id
+        # A reload supersedes one that is still running, and drops pages of
+        # the previous result that are still on their way
+        self.db_worker.cancel("usage_page")
+        self._loading_more = False
+        self.db_worker.submit(
+            self._fetch_first_page,
+            reagent_id,
+            dict(self.filters),
+            key="usage",
+            on_result=self._on_first_page_loaded,
+            on_error=lambda error: print(f"Error loading usage data: {error}"),
+        )
+        return True
+
+    def load_more(self):
+        """Load the next page of usage data, if there is one"""
+        if not self.has_more or self._loading_more:
             return False
+        self._loading_more = True
+        self.db_worker.submit(
+            self._fetch_page,
+            self._reagent_id,
+            self._next_after,
+            dict(self.filters),
+            key="usage_page",
+            on_result=self._on_page_loaded,
+            on_error=self._on_page_error,
+        )
+        return True
+
+    def _fetch_first_page(self, reagent_id, filters):
+        """Count the matching rows and fetch the first page; runs on a worker thread"""
+        total = self.usage_model.count(reagent_id, **filters)
+        return self._fetch_page(reagent_id, None, filters), total
+
+    def _fetch_page(self, reagent_id, after, filters):
+        """Fetch and format one page of usage rows; runs on a worker thread"""
+        raw_reports = self.usage_model.get_page(
+            reagent_id, self.page_size, after, **filters
+        )
+        next_after = (
+            (raw_reports[-1]["page_key"], raw_reports[-1]["id"]) if raw_reports else None
+        )
+        # Process the raw data into a view-friendly format
+        return [self._process_report(report) for report in raw_reports], next_after
+
+    def _on_first_page_loaded(self, result):
+        (usage_reports, self._next_after), self.total_count = result
+        self.usage_reports = usage_reports
+        self.has_more = len(usage_reports) < self.total_count
+        self.page_loaded.emit(0, self.total_count)
+
+    def _on_page_loaded(self, result):
+        usage_reports, self._next_after = result
+        self._loading_more = False
+        first_new = len(self.usage_reports)
+        self.usage_reports.extend(usage_reports)
+        self.has_more = bool(usage_reports) and len(self.usage_reports) < self.total_count
+        self.page_loaded.emit(first_new, self.total_count)
+
+    def _on_page_error(self, error):
+        self._loading_more = False
+        print(f"Error loading usage data: {error}")
+
+    def _process_report(self, report):
+        """Convert a raw usage row into the view-friendly format"""
+        # Format date
+        date_used = report.get("Tanggal_Terpakai", "")  #
+        formatted_date = date_used
+
+        if date_used:
+            try:
+                formatted_date = date.fromisoformat(date_used).strftime("%d %b %Y")
+            except (TypeError, ValueError):  # More specific exception
+                pass  # Keep original format if parsing fails
+
+        # Create processed report object
+        return {
+            "id": report.get("id"),  #
+            "raw_date": date_used,
+            "formatted_date": formatted_date,
+            "amount_used": report.get("Jumlah_Terpakai", 0),  #
+            "user": report.get("User", ""),  #
+            "supporting_materials": report.get("Bahan_Pendukung", ""),  #
+            # Store all original data for potential future use
+            "raw_data": report,
+        }
 
     def delete_report(self, report_id):
         """Delete a usage report"""
@@ -143,37 +209,53 @@ class UsageReportViewModel(QObject):
 
     def export_usage_data_to_xlsx(self, reagent_id, file_path, reagent_name="Reagent"):
         """
-        Exports usage data for a given reagent to an XLSX file using xlsxwriter.
+        Exports usage data for a given reagent to an XLSX file in the background.
+        The result is reported through export_finished.
+        """
+        self.db_worker.submit(
+            self._write_usage_xlsx,
+            reagent_id,
+            file_path,
+            reagent_name,
+            on_result=lambda result: self.export_finished.emit(*result),
+            on_error=lambda error: self.export_finished.emit(
+                False, f"An error occurred during export: {error}"
+            ),
+        )
+
+    def _write_usage_xlsx(self, reagent_id, file_path, reagent_name):
         """
+        Writes the XLSX file using xlsxwriter; runs on a worker thread.
+
+        Returns:
+            tuple: (success_bool, message_string)
+        """
+        # 1. Stream usage rows straight from the database so large
+        # histories are never held in memory all at once
+        usage_rows = self.usage_model.iter_by_identity(reagent_id)
         try:
-            # 1. Fetch or use already loaded data
-            # Ensure fresh data if necessary, or use self.usage_reports if already loaded for reagent_id
-            if not self.usage_reports or (
-                self.usage_reports
-                and self.usage_reports[0]["raw_data"].get("id_identity") != reagent_id
-            ):
-                self.load_usage_data(reagent_id)
-
-            if not self.usage_reports:
-                self.export_finished.emit(False, "No usage data available to export.")
-                return
+            reports = (self._process_report(report) for report in usage_rows)
+            first_report = next(reports, None)
+
+            if first_report is None:
+                return False, "No usage data available to export."
 
             # 2. Prepare data for Excel
             headers = ["Date Used", "Amount Used", "User", "Supporting Materials"]
-            data_rows = []
-            for report in self.usage_reports:
-                data_rows.append(
-                    [
-                        report["formatted_date"],  #
-                        report["amount_used"],  #
-                        report["user"],  #
-                        report["supporting_materials"],  #
-                    ]
-                )
+            data_rows = (
+                [
+                    report["formatted_date"],  #
+                    report["amount_used"],  #
+                    report["user"],  #
+                    report["supporting_materials"],  #
+                ]
+                for report in itertools.chain([first_report], reports)
+            )
 
             # 3. Write to XLSX using xlsxwriter
             # --- xlsxwriter Example ---
-            workbook = xlsxwriter.Workbook(file_path)
+            # constant_memory flushes each row to disk once the next one starts
+            workbook = xlsxwriter.Workbook(file_path, {"constant_memory": True})
             worksheet = workbook.add_worksheet(f"{reagent_name} Usage")  # Sheet name
 
             # Define formats
@@ -229,11 +311,12 @@ class UsageReportViewModel(QObject):
             workbook.close()  # This saves the file
             # --- End xlsxwriter Example ---
 
-            self.export_finished.emit(
-                True, f"Report successfully exported to:\n{file_path}"
-            )
+            return True, f"Report successfully exported to:\n{file_path}"
 
         except Exception as e:
             error_message = f"An error occurred during export: {str(e)}"
             print(error_message)  # Log the full error for debugging
-            self.export_finished.emit(False, error_message)
+            return False, error_message
+        finally:
+            # Hands the connection back if the export stopped half way
+            usage_rows.close()
@@ -12,9 +12,12 @@ from PyQt6.QtWidgets import (
     QLineEdit,
     QComboBox,
     QDialog,
+    QSpinBox,
+    QListWidget,
+    QListWidgetItem,
 )
-from PyQt6.QtCore import Qt, pyqtSlot
-from PyQt6.QtGui import QFont
+from PyQt6.QtCore import Qt, QDate, pyqtSlot
+from PyQt6.QtGui import QFont, QColor
 
 
 class UserProfileDialog(QDialog):
@@ -201,11 +204,15 @@ class AboutDialog(QDialog):
 
 
 class HomeView(QWidget):
+    # Rows listed in the expiring and reorder panels; the labels count the rest
+    MAX_EXPIRY_ROWS = 200
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent_window = parent
         self.home_viewmodel = None
         self.storage_data = []
+        self.storage_stats = {}  # id_storage -> statistics shown on the rack buttons
         self.rack_buttons = []
         self.rack_views = {}
         self.current_user = None
@@ -364,7 +371,37 @@ class HomeView(QWidget):
 
         # The storage buttons will be added when data is loaded
 
-        main_layout.addSpacing(40)
+        main_layout.addSpacing(20)
+
+        # Expiring reagents panel
+        expiry_header_layout = QHBoxLayout()
+        self.expiry_label = QLabel("Expiring Reagents:")
+        self.expiry_label.setFont(search_font)
+        expiry_header_layout.addWidget(self.expiry_label)
+        expiry_header_layout.addStretch()
+        expiry_header_layout.addWidget(QLabel("Within"))
+        self.expiry_days_spin = QSpinBox()
+        self.expiry_days_spin.setRange(1, 365)
+        self.expiry_days_spin.setValue(30)
+        self.expiry_days_spin.setSuffix(" days")
+        self.expiry_days_spin.valueChanged.connect(self._change_expiry_days)
+        expiry_header_layout.addWidget(self.expiry_days_spin)
+        main_layout.addLayout(expiry_header_layout)
+
+        self.expiry_list = QListWidget()
+        self.expiry_list.setMaximumHeight(160)
+        main_layout.addWidget(self.expiry_list)
+
+        # Reagents to reorder soon, forecast from their usage
+        self.reorder_label = QLabel("Reorder Soon:")
+        self.reorder_label.setFont(search_font)
+        main_layout.addWidget(self.reorder_label)
+
+        self.reorder_list = QListWidget()
+        self.reorder_list.setMaximumHeight(160)
+        main_layout.addWidget(self.reorder_list)
+
+        main_layout.addSpacing(20)
 
         # Bottom buttons container
         bottom_buttons_layout = QHBoxLayout()
@@ -382,6 +419,17 @@ class HomeView(QWidget):
         self.refresh_button.clicked.connect(self._refresh_storage)
         bottom_buttons_layout.addWidget(self.refresh_button)
 
+        # Import button
+        self.import_button = QPushButton("Import Reagents")
+        self.import_button.setMinimumHeight(40)
+        self.import_button.setMinimumWidth(120)
+        self.import_button.setStyleSheet(
+            "QPushButton { background-color: #cce6ff; border: 2px solid #99bbdd; border-radius: 5px; }"
+            "QPushButton:hover { background-color: #bbddff; }"
+        )
+        self.import_button.clicked.connect(self._show_import_dialog)
+        bottom_buttons_layout.addWidget(self.import_button)
+
         # Logout button
         self.logout_button = QPushButton("Logout")
         self.logout_button.setMinimumHeight(40)
@@ -463,6 +511,9 @@ class HomeView(QWidget):
     def show_home(self):
         """Switch back to the main home view"""
         self.stacked_widget.setCurrentWidget(self.main_view)
+        # Reagents may have changed in the rack that was open
+        if self.home_viewmodel:
+            self.home_viewmodel.load_storage_stats()
 
     def _view_reagent_details(self, reagent_id):
         """Show reagent details panel"""
@@ -480,6 +531,20 @@ class HomeView(QWidget):
                 "Storage locations have been refreshed from the database.",
             )
 
+    def _show_import_dialog(self):
+        """Show the bulk reagent import dialog"""
+        from views.import_view import ImportDialog
+
+        if not self.home_viewmodel:
+            return
+        import_viewmodel = self.home_viewmodel.create_import_viewmodel()
+        if not import_viewmodel:
+            return
+        import_dialog = ImportDialog(import_viewmodel, self)
+        import_dialog.exec()
+        if import_dialog.imported_any:
+            self.home_viewmodel.load_storage_data()
+
     def _logout(self):
         """Logout the current user"""
         reply = QMessageBox.question(
@@ -499,6 +564,68 @@ class HomeView(QWidget):
         self.storage_data = storage_data
         self._update_storage_buttons()
 
+    @pyqtSlot(dict)
+    def on_storage_stats_loaded(self, storage_stats):
+        """Handle loaded per-storage statistics"""
+        self.storage_stats = storage_stats
+        self._update_storage_buttons()
+
+    def _change_expiry_days(self, days):
+        if self.home_viewmodel:
+            self.home_viewmodel.set_expiry_days(days)
+
+    @pyqtSlot(list, int)
+    def on_expiring_loaded(self, reagents, days):
+        """Show the reagents expiring within the selected number of days"""
+        today = QDate.currentDate().toString("yyyy-MM-dd")
+        expired = sum(1 for r in reagents if r["Tanggal_Expire"] < today)
+
+        self.expiry_label.setText(
+            f"Expiring Reagents: {len(reagents) - expired} within {days} days, "
+            f"{expired} expired"
+        )
+        self.expiry_label.setStyleSheet("color: #cc0000;" if reagents else "")
+
+        self.expiry_list.clear()
+        for reagent in reagents[: self.MAX_EXPIRY_ROWS]:
+            item = QListWidgetItem(
+                f"{reagent['Tanggal_Expire']}  {reagent.get('Name')}  "
+                f"({reagent.get('storage_name')}, stock {reagent.get('Stock')})"
+            )
+            if reagent["Tanggal_Expire"] < today:
+                item.setForeground(QColor("#cc0000"))
+            self.expiry_list.addItem(item)
+        if len(reagents) > self.MAX_EXPIRY_ROWS:
+            self.expiry_list.addItem(
+                f"... and {len(reagents) - self.MAX_EXPIRY_ROWS} more"
+            )
+
+    @pyqtSlot(list)
+    def on_reorder_loaded(self, reagents):
+        """Show the reagents that will run out soon at their current usage"""
+        self.reorder_label.setText(f"Reorder Soon: {len(reagents)} reagents")
+        self.reorder_label.setStyleSheet("color: #cc6600;" if reagents else "")
+
+        self.reorder_list.clear()
+        for reagent in reagents[: self.MAX_EXPIRY_ROWS]:
+            self.reorder_list.addItem(
+                f"{reagent['days_left']:.0f} days left  {reagent.get('Name')}  "
+                f"({reagent.get('storage_name')}, stock {reagent.get('Stock')}, "
+                f"~{reagent['daily_rate']:.1f}/day, reorder at {reagent['reorder_point']})"
+            )
+        if len(reagents) > self.MAX_EXPIRY_ROWS:
+            self.reorder_list.addItem(
+                f"... and {len(reagents) - self.MAX_EXPIRY_ROWS} more"
+            )
+
+    @pyqtSlot(str)
+    def on_reorder_error(self, error_message):
+        """Show why there is no reorder list, without interrupting the user"""
+        self.reorder_label.setText("Reorder Soon: unavailable")
+        self.reorder_label.setStyleSheet("")
+        self.reorder_list.clear()
+        self.reorder_list.addItem(error_message)
+
     @pyqtSlot(str)
     def on_storage_error(self, error_message):
         """Handle storage loading error"""
@@ -508,6 +635,19 @@ class HomeView(QWidget):
             error_message,
         )
 
+    def _format_storage_stats(self, storage_name, stats):
+        """Build the rack button text from a storage's statistics"""
+        lines = [
+            storage_name,
+            f"{stats['reagents']} reagents | {stats['low_stock']} low stock"
+            f" | {stats['hazardous']} hazardous",
+        ]
+        if stats["expired"] or stats["expiring_soon"]:
+            lines.append(
+                f"{stats['expired']} expired | {stats['expiring_soon']} expiring soon"
+            )
+        return "\n".join(lines)
+
     def _update_storage_buttons(self):
         """Update the storage buttons display"""
         # Clear existing buttons first
@@ -530,9 +670,21 @@ class HomeView(QWidget):
             rack_button.setMinimumHeight(80)
             rack_button.setMinimumWidth(250)
 
-            # Set a distinct style for rack buttons
+            # Set a distinct style for rack buttons, flagging racks with
+            # expired or soon expiring reagents
+            stats = self.storage_stats.get(storage_id)
+            if self.storage_stats and not stats:
+                stats = {"reagents": 0, "low_stock": 0, "hazardous": 0}
+                stats.update(expired=0, expiring_soon=0)
+            border = "#bbccee"
+            if stats:
+                rack_button.setText(self._format_storage_stats(storage_name, stats))
+                if stats["expired"] or stats["expiring_soon"]:
+                    border = "#ff9966"
             rack_button.setStyleSheet(
-                "QPushButton { background-color: #ddeeff; border: 2px solid #bbccee; border-radius: 8px; font-size: 14px; font-weight: bold; }"
+                "QPushButton { background-color: #ddeeff; border: 2px solid "
+                + border
+                + "; border-radius: 8px; font-size: 14px; font-weight: bold; }"
                 "QPushButton:hover { background-color: #cce4ff; }"
             )
 
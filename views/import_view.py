@@ -0,0 +1,231 @@
+# views/import_view.py
+import os
+
+from PyQt6.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QComboBox,
+    QTableWidget,
+    QHeaderView,
+    QProgressBar,
+    QMessageBox,
+    QFileDialog,
+)
+from PyQt6.QtCore import Qt, pyqtSlot
+
+
+class ImportDialog(QDialog):
+    """Dialog to import reagents in bulk from a CSV or XLSX file"""
+
+    IGNORE_LABEL = "(Ignore)"
+    # Rejected rows listed in the summary message
+    MAX_SHOWN_ERRORS = 10
+
+    def __init__(self, viewmodel, parent=None):
+        super().__init__(parent)
+        self.viewmodel = viewmodel
+        self.file_path = None
+        self.headers = []
+        self.importing = False
+        self.imported_any = False
+
+        self.setWindowTitle("Import Reagents")
+        self.setMinimumSize(600, 500)
+        self.setModal(True)
+
+        # Remove the ? from the title bar
+        self.setWindowFlags(
+            self.windowFlags() & ~Qt.WindowType.WindowContextHelpButtonHint
+        )
+
+        self._setup_ui()
+
+        self.viewmodel.import_progress.connect(self.on_import_progress)
+        self.viewmodel.import_finished.connect(self.on_import_finished)
+        self.viewmodel.import_error.connect(self.on_import_error)
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setSpacing(10)
+
+        # File selection
+        file_layout = QHBoxLayout()
+        self.file_label = QLabel("No file selected")
+        file_layout.addWidget(self.file_label, 1)
+        self.choose_button = QPushButton("Choose File...")
+        self.choose_button.clicked.connect(self._choose_file)
+        file_layout.addWidget(self.choose_button)
+        layout.addLayout(file_layout)
+
+        # Column mapping
+        layout.addWidget(QLabel("Columns:"))
+        self.mapping_table = QTableWidget(0, 2)
+        self.mapping_table.setHorizontalHeaderLabels(["File Column", "Reagent Field"])
+        self.mapping_table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.Stretch
+        )
+        self.mapping_table.verticalHeader().setVisible(False)
+        layout.addWidget(self.mapping_table, 1)
+
+        # Storage for rows that do not name one
+        storage_layout = QHBoxLayout()
+        storage_layout.addWidget(QLabel("Default storage:"))
+        self.storage_combo = QComboBox()
+        for storage in self.viewmodel.get_storages():
+            self.storage_combo.addItem(storage.get("Name") or "", storage.get("id"))
+        storage_layout.addWidget(self.storage_combo, 1)
+        layout.addLayout(storage_layout)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setFormat("%v / %m rows")
+        self.progress_bar.setValue(0)
+        layout.addWidget(self.progress_bar)
+
+        # Buttons
+        buttons_layout = QHBoxLayout()
+        buttons_layout.addStretch()
+        self.import_button = QPushButton("Import")
+        self.import_button.setEnabled(False)
+        self.import_button.setStyleSheet(
+            "QPushButton { background-color: #ccffcc; border: 2px solid #99cc99; border-radius: 5px; padding: 6px; }"
+            "QPushButton:hover { background-color: #bbffbb; }"
+        )
+        self.import_button.clicked.connect(self._start_import)
+        buttons_layout.addWidget(self.import_button)
+        self.close_button = QPushButton("Close")
+        self.close_button.clicked.connect(self._close_or_cancel)
+        buttons_layout.addWidget(self.close_button)
+        layout.addLayout(buttons_layout)
+
+    def _choose_file(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Choose Reagent List",
+            "",
+            "Spreadsheets (*.csv *.xlsx *.xlsm);;CSV Files (*.csv);;Excel Files (*.xlsx *.xlsm)",
+        )
+        if file_path:
+            self.load_file(file_path)
+
+    def load_file(self, file_path):
+        """Read a file's header row and fill in the suggested column mapping"""
+        headers = self.viewmodel.read_headers(file_path)
+        if not headers:
+            return
+
+        self.file_path = file_path
+        self.headers = headers
+        self.file_label.setText(os.path.basename(file_path))
+        self.progress_bar.setValue(0)
+
+        fields = [self.IGNORE_LABEL] + list(self.viewmodel.TARGET_FIELDS)
+        mapping = self.viewmodel.suggest_mapping(headers)
+        self.mapping_table.setRowCount(len(headers))
+        for row, header in enumerate(headers):
+            self.mapping_table.setCellWidget(row, 0, QLabel(header))
+            combo = QComboBox()
+            combo.addItems(fields)
+            if mapping.get(header):
+                combo.setCurrentText(mapping[header])
+            self.mapping_table.setCellWidget(row, 1, combo)
+        self.import_button.setEnabled(True)
+
+    def get_mapping(self):
+        """Column name -> reagent field chosen in the table (None to ignore)"""
+        mapping = {}
+        for row, header in enumerate(self.headers):
+            field = self.mapping_table.cellWidget(row, 1).currentText()
+            mapping[header] = None if field == self.IGNORE_LABEL else field
+        return mapping
+
+    def _start_import(self):
+        if not self.file_path:
+            return
+        mapping = self.get_mapping()
+        if "Name" not in mapping.values():
+            QMessageBox.warning(
+                self, "Import Reagents", "Map one of the columns to Name first."
+            )
+            return
+
+        resume_job_id = None
+        job = self.viewmodel.find_resumable_job(self.file_path)
+        if job:
+            reply = QMessageBox.question(
+                self,
+                "Resume Import",
+                f"An earlier import of this file stopped after {job['Rows_Done']} rows "
+                f"({job['Rows_Imported']} imported). Continue from there?\n\n"
+                "Choose No to import the whole file again.",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                QMessageBox.StandardButton.Yes,
+            )
+            if reply == QMessageBox.StandardButton.Yes:
+                resume_job_id = job["id"]
+
+        self._set_importing(True)
+        self.viewmodel.start_import(
+            self.file_path,
+            mapping,
+            self.storage_combo.currentData() or 1,
+            resume_job_id,
+        )
+
+    def _set_importing(self, importing):
+        self.importing = importing
+        self.choose_button.setEnabled(not importing)
+        self.import_button.setEnabled(not importing)
+        self.mapping_table.setEnabled(not importing)
+        self.storage_combo.setEnabled(not importing)
+        self.close_button.setText("Cancel" if importing else "Close")
+
+    def _close_or_cancel(self):
+        if self.importing:
+            self.close_button.setEnabled(False)
+            self.viewmodel.cancel_import()
+        else:
+            self.accept()
+
+    def reject(self):
+        # Escape or the window close button must not leave an import running
+        if self.importing:
+            self._close_or_cancel()
+            return
+        super().reject()
+
+    @pyqtSlot(int, int)
+    def on_import_progress(self, rows_done, total):
+        self.progress_bar.setMaximum(max(total, rows_done))
+        self.progress_bar.setValue(rows_done)
+
+    @pyqtSlot(dict)
+    def on_import_finished(self, summary):
+        self._set_importing(False)
+        self.close_button.setEnabled(True)
+        self.imported_any = self.imported_any or summary["imported"] > 0
+
+        title = "Import Complete" if summary["status"] == "completed" else "Import Cancelled"
+        message = (
+            f"{summary['imported']} reagents imported, "
+            f"{summary['rejected']} rows rejected."
+        )
+        if summary["status"] != "completed":
+            message += (
+                f"\n\nStopped after row {summary['rows_done'] + 1}; "
+                "importing the same file again continues from there."
+            )
+        if summary["errors"]:
+            shown = summary["errors"][: self.MAX_SHOWN_ERRORS]
+            message += "\n\n" + "\n".join(f"Row {e['row']}: {e['error']}" for e in shown)
+            if summary["rejected"] > len(shown):
+                message += f"\n... and {summary['rejected'] - len(shown)} more"
+        QMessageBox.information(self, title, message)
+
+    @pyqtSlot(str)
+    def on_import_error(self, error_message):
+        self._set_importing(False)
+        self.close_button.setEnabled(True)
+        QMessageBox.warning(self, "Import Error", error_message)
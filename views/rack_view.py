@@ -20,8 +20,9 @@ class RackView(QWidget):
         super().__init__(parent)
         self.parent_window = parent
         self.rack_viewmodel = None
-        self.reagents = []
+        self.reagents = []  # Reagents of the current page only
         self.current_page = 0
+        self.total_count = 0
         self.items_per_page = 10
         self.storage_id = storage_id
 
@@ -43,6 +44,7 @@ class RackView(QWidget):
     def set_viewmodel(self, viewmodel):
         """Set the ViewModel for this view"""
         self.rack_viewmodel = viewmodel
+        self.rack_viewmodel.page_size = self.items_per_page
 
     def _setup_rack_ui(self):
         """Set up the UI components for the rack view"""
@@ -127,12 +129,13 @@ class RackView(QWidget):
         # Add rack panel to stack
         self.main_stack.addWidget(self.rack_panel)
 
-    @pyqtSlot(list, str)
-    def on_reagents_loaded(self, reagents, rack_name):
-        """Handle loaded reagents data"""
+    @pyqtSlot(list, int, int, str)
+    def on_page_loaded(self, reagents, page, total_count, rack_name):
+        """Handle a loaded page of reagents"""
         self.reagents = reagents
         self.rack_title.setText(f"{rack_name} - Reagent Management")
-        self.current_page = 0
+        self.current_page = page
+        self.total_count = total_count
         self._load_current_page()
 
     def _load_current_page(self):
@@ -143,12 +146,8 @@ class RackView(QWidget):
             if widget:
                 widget.setParent(None)
 
-        # Load current page
-        start_idx = self.current_page * self.items_per_page
-        end_idx = min(start_idx + self.items_per_page, len(self.reagents))
-
-        for i in range(start_idx, end_idx):
-            reagent = self.reagents[i]
+        # Only the current page is loaded
+        for i, reagent in enumerate(self.reagents):
             button = QPushButton()
             button.setMinimumHeight(70)
             button.setText(
@@ -161,8 +160,7 @@ class RackView(QWidget):
                 lambda checked, r_id=reagent["id"]: self._view_reagent_details(r_id)
             )
 
-            relative_idx = i - start_idx
-            self.grid_layout.addWidget(button, relative_idx // 5, relative_idx % 5)
+            self.grid_layout.addWidget(button, i // 5, i % 5)
 
         self.page_label.setText(f"Page {self.current_page + 1}/{self._total_pages()}")
         self._update_navigation_buttons()
@@ -178,18 +176,16 @@ class RackView(QWidget):
 
     def _total_pages(self):
         return max(
-            1, (len(self.reagents) + self.items_per_page - 1) // self.items_per_page
+            1, (self.total_count + self.items_per_page - 1) // self.items_per_page
         )
 
     def _go_to_previous_page(self):
-        if self.current_page > 0:
-            self.current_page -= 1
-            self._load_current_page()
+        if self.current_page > 0 and self.rack_viewmodel:
+            self.rack_viewmodel.load_page(self.current_page - 1)
 
     def _go_to_next_page(self):
-        if self.current_page < self._total_pages() - 1:
-            self.current_page += 1
-            self._load_current_page()
+        if self.current_page < self._total_pages() - 1 and self.rack_viewmodel:
+            self.rack_viewmodel.load_page(self.current_page + 1)
 
     def _update_navigation_buttons(self):
         self.prev_button.setEnabled(self.current_page > 0)
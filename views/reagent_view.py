@@ -14,6 +14,8 @@ from PyQt6.QtWidgets import (
     QMessageBox,
     QFrame,
     QFileDialog,
+    QProgressDialog,
+    QApplication,
 )
 from PyQt6.QtCore import Qt, QDate, pyqtSignal
 from PyQt6.QtGui import QPixmap, QImage
@@ -37,13 +39,16 @@ class ReagentDetailPanel(QWidget):
         rack_name=None,
         parent=None,
         came_from_search=False,
+        usage_model=None,
     ):  # Add came_from_search
         super().__init__(parent)
         self.parent_widget = parent  # This is RackView
         self.came_from_search = came_from_search  # Store the flag
 
         # Initialize the ViewModel
-        self.view_model = ReagentViewModel(identity_model, reagent_id, rack_name)
+        self.view_model = ReagentViewModel(
+            identity_model, reagent_id, rack_name, usage_model
+        )
 
         # Set up the UI for this panel
         self._setup_ui()
@@ -94,7 +99,7 @@ class ReagentDetailPanel(QWidget):
 
         # Wujud (form/state) field
         self.wujud_combo = QComboBox()
-        self.wujud_combo.addItems(["Solid", "Liquid", "Gas", "Solution"])
+        self.wujud_combo.addItems(self.view_model.get_wujud_types())
         form_layout.addRow("Form:", self.wujud_combo)
 
         # Stock field
@@ -117,7 +122,7 @@ class ReagentDetailPanel(QWidget):
 
         # Category_Hazard field
         self.hazard_combo = QComboBox()
-        self.hazard_combo.addItems(["None", "Low", "Medium", "High", "Extreme"])
+        self.hazard_combo.addItems(self.view_model.get_hazard_categories())
         form_layout.addRow("Hazard Category:", self.hazard_combo)
 
         # Sifat field
@@ -174,6 +179,12 @@ class ReagentDetailPanel(QWidget):
         self.storage_id_label = QLabel(f"Storage: {self.view_model.rack_name}")
         form_layout.addRow("Storage Location:", self.storage_id_label)
 
+        # Usage totals, read-only (existing reagents only)
+        self.usage_summary_label = QLabel("Not used yet")
+        self.usage_summary_label.setWordWrap(True)
+        if not self.view_model.is_new:
+            form_layout.addRow("Usage:", self.usage_summary_label)
+
         # Add form container to content layout
         content_layout.addWidget(form_container, 3)  # 3:1 proportion for form:image
 
@@ -203,6 +214,12 @@ class ReagentDetailPanel(QWidget):
         self.clear_image_button.clicked.connect(self._clear_image)
         image_buttons_layout.addWidget(self.clear_image_button)
 
+        # The panel shows a thumbnail; the original is only loaded from here
+        self.view_image_button = QPushButton("View Full")
+        self.view_image_button.clicked.connect(self._view_full_image)
+        self.view_image_button.setEnabled(False)
+        image_buttons_layout.addWidget(self.view_image_button)
+
         image_container_layout.addLayout(image_buttons_layout)
         image_container_layout.addStretch()  # Push image and buttons to the top
 
@@ -298,13 +315,25 @@ class ReagentDetailPanel(QWidget):
             self.purchase_date_edit,
         ]
 
-        # Current image data
+        # Newly chosen image not saved yet (stored images are only shown as thumbnails)
         self.current_image_data = None
+        # Display-sized copy of the image, rescaled on resize without decoding again
+        self.display_pixmap = None
 
-        # Current SDS data
-        self.current_sds_data = None
+        # Current SDS (size only, the PDF itself stays in the database)
+        self.current_sds_size = None
         self.current_sds_filename = None
 
+    def _select_combo_text(self, combo, value):
+        """Select a stored value, adding it if it is outside the offered ones"""
+        if not value:
+            return
+        index = combo.findText(value)
+        if index < 0:
+            combo.addItem(value)
+            index = combo.count() - 1
+        combo.setCurrentIndex(index)
+
     def _load_reagent_data(self):
         """Load data for an existing reagent from the ViewModel"""
         reagent = self.view_model.get_reagent_data()
@@ -314,9 +343,7 @@ class ReagentDetailPanel(QWidget):
             self.description_edit.setText(reagent.get("Description", ""))
 
             # Set combobox value
-            wujud_index = self.wujud_combo.findText(reagent.get("Wujud", ""))
-            if wujud_index >= 0:
-                self.wujud_combo.setCurrentIndex(wujud_index)
+            self._select_combo_text(self.wujud_combo, reagent.get("Wujud"))
 
             self.stock_spin.setValue(reagent.get("Stock", 0))
             self.massa_spin.setValue(reagent.get("Massa", 0))
@@ -327,11 +354,7 @@ class ReagentDetailPanel(QWidget):
                     QDate.fromString(reagent["Tanggal_Expire"], "yyyy-MM-dd")
                 )
 
-            hazard_index = self.hazard_combo.findText(
-                reagent.get("Category_Hazard", "")
-            )
-            if hazard_index >= 0:
-                self.hazard_combo.setCurrentIndex(hazard_index)
+            self._select_combo_text(self.hazard_combo, reagent.get("Category_Hazard"))
 
             self.sifat_edit.setText(reagent.get("Sifat", ""))
 
@@ -351,39 +374,90 @@ class ReagentDetailPanel(QWidget):
             # Load SDS if available
             self._load_sds()
 
+            self._load_usage_summary()
+
+            # Saving writes only what differs from what is shown now
+            self.view_model.set_displayed_data(self._collect_form_data())
+
+    def _load_usage_summary(self):
+        """Show the reagent's usage totals"""
+        summary = self.view_model.get_usage_summary()
+        if not summary or not summary["Usage_Count"]:
+            self.usage_summary_label.setText("Not used yet")
+            return
+        self.usage_summary_label.setText(
+            f"{summary['Total_Used']} used in {summary['Usage_Count']} reports, "
+            f"{summary['First_Used']} to {summary['Last_Used']}\n"
+            f"Last used by {summary['Last_User'] or '-'}"
+        )
+
     def _load_image(self):
-        """Load image from ViewModel and display it"""
+        """Load a display-sized image from ViewModel and display it"""
+        self.current_image_data = self.view_model.temp_image_data
         try:
-            image_data = self.view_model.get_image()
+            # Thumbnail size in device pixels so high-DPI screens stay sharp
+            size = int(
+                max(self.image_label.maximumWidth(), self.image_label.height())
+                * self.devicePixelRatioF()
+            )
+            image_data = self.view_model.get_thumbnail(size)
             if image_data:
-                self.current_image_data = image_data
                 image = QImage.fromData(image_data)
                 if not image.isNull():
-                    pixmap = QPixmap.fromImage(image)
-                    scaled_pixmap = pixmap.scaled(
-                        self.image_label.size(),
-                        Qt.AspectRatioMode.KeepAspectRatio,
-                        Qt.TransformationMode.SmoothTransformation,
-                    )
-                    self.image_label.setPixmap(scaled_pixmap)
+                    if max(image.width(), image.height()) > size:
+                        # A newly chosen original; decode it once and keep a small copy
+                        image = image.scaled(
+                            size,
+                            size,
+                            Qt.AspectRatioMode.KeepAspectRatio,
+                            Qt.TransformationMode.SmoothTransformation,
+                        )
+                    self.display_pixmap = QPixmap.fromImage(image)
+                    self._show_display_pixmap()
+                    self.view_image_button.setEnabled(True)
                     return
 
             # If no image or invalid image data
             self.image_label.setText("No Image")
             self.image_label.setPixmap(QPixmap())
-            self.current_image_data = None
+            self.display_pixmap = None
+            self.view_image_button.setEnabled(False)
 
         except Exception as e:
             print(f"Error loading image: {str(e)}")
             self.image_label.setText("Error loading image")
-            self.current_image_data = None
+            self.display_pixmap = None
+            self.view_image_button.setEnabled(False)
+
+    def _show_display_pixmap(self):
+        """Fit the display-sized image into the image label"""
+        scaled_pixmap = self.display_pixmap.scaled(
+            self.image_label.size() * self.devicePixelRatioF(),
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation,
+        )
+        scaled_pixmap.setDevicePixelRatio(self.devicePixelRatioF())
+        self.image_label.setPixmap(scaled_pixmap)
+
+    def _view_full_image(self):
+        """View the full-size image using the system's default image viewer"""
+        try:
+            image_path = self.view_model.prepare_image_file()
+            if not image_path:
+                QMessageBox.information(
+                    self, "Information", "No image available for this reagent."
+                )
+                return
+            self._open_with_system_viewer(image_path)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to open image: {str(e)}")
 
     def _load_sds(self):
         """Load SDS data from ViewModel and update UI accordingly"""
         try:
-            sds_info = self.view_model.get_sds()
-            if sds_info and sds_info.get("data"):
-                self.current_sds_data = sds_info["data"]
+            sds_info = self.view_model.get_sds_info()
+            if sds_info and sds_info.get("size"):
+                self.current_sds_size = sds_info["size"]
                 self.current_sds_filename = sds_info["filename"]
 
                 # Update the SDS status label
@@ -397,7 +471,7 @@ class ReagentDetailPanel(QWidget):
                 self.sds_status_label.setText("No SDS file")
                 self.sds_status_label.setStyleSheet("font-style: italic; color: #666;")
                 self.view_sds_button.setEnabled(False)
-                self.current_sds_data = None
+                self.current_sds_size = None
                 self.current_sds_filename = None
 
         except Exception as e:
@@ -405,7 +479,7 @@ class ReagentDetailPanel(QWidget):
             self.sds_status_label.setText("Error loading SDS")
             self.sds_status_label.setStyleSheet("color: #cc0000;")
             self.view_sds_button.setEnabled(False)
-            self.current_sds_data = None
+            self.current_sds_size = None
             self.current_sds_filename = None
 
     def _upload_image(self):
@@ -452,8 +526,10 @@ class ReagentDetailPanel(QWidget):
             return
 
         self.current_image_data = None
+        self.display_pixmap = None
         self.image_label.setText("No Image")
         self.image_label.setPixmap(QPixmap())
+        self.view_image_button.setEnabled(False)
 
         # Update in viewmodel
         self.view_model.update_image(None)
@@ -475,21 +551,21 @@ class ReagentDetailPanel(QWidget):
 
         if file_path:
             try:
-                with open(file_path, "rb") as file:
-                    sds_data = file.read()
-
-                # Get the filename from the path
-                import os
-
-                sds_filename = os.path.basename(file_path)
+                # Only the path is kept; the file is streamed into the
+                # database in chunks when the reagent is saved
+                dialog, progress = self._create_progress_dialog("Uploading SDS...")
+                try:
+                    result, message = self.view_model.update_sds_from_file(
+                        file_path, progress
+                    )
+                finally:
+                    dialog.close()
 
-                # Store SDS data
-                self.current_sds_data = sds_data
+                sds_info = self.view_model.get_sds_info()
+                sds_filename = sds_info["filename"]
+                self.current_sds_size = sds_info["size"]
                 self.current_sds_filename = sds_filename
 
-                # Update in viewmodel
-                result, message = self.view_model.update_sds(sds_data, sds_filename)
-
                 # Update the UI
                 if result:
                     self.sds_status_label.setText(sds_filename)
@@ -524,7 +600,7 @@ class ReagentDetailPanel(QWidget):
 
         if confirm == QMessageBox.StandardButton.Yes:
             # Clear SDS data
-            self.current_sds_data = None
+            self.current_sds_size = None
             self.current_sds_filename = None
 
             # Update the UI
@@ -540,40 +616,67 @@ class ReagentDetailPanel(QWidget):
 
     def _view_sds(self):
         """View the SDS file using system's default PDF viewer"""
-        if not self.current_sds_data:
+        if not self.current_sds_size:
             QMessageBox.information(
                 self, "Information", "No SDS file available for this reagent."
             )
             return
 
         try:
-            # Create a temporary file to view the PDF
-            import tempfile
-            import os
-            import subprocess
-            import platform
-
-            # Create a temp file with the correct extension
-            fd, temp_path = tempfile.mkstemp(suffix=".pdf")
-            os.close(fd)
+            # Stream the PDF out to a temp file in chunks
+            dialog, progress = self._create_progress_dialog("Opening SDS...")
+            try:
+                temp_path = self.view_model.prepare_sds_file(progress)
+            finally:
+                dialog.close()
 
-            # Write the PDF data to the temp file
-            with open(temp_path, "wb") as f:
-                f.write(self.current_sds_data)
+            if not temp_path:
+                QMessageBox.information(
+                    self, "Information", "No SDS file available for this reagent."
+                )
+                return
 
             # Open the PDF with the default system viewer
-            if platform.system() == "Darwin":  # macOS
-                subprocess.run(["open", temp_path], check=True)
-            elif platform.system() == "Windows":
-                os.startfile(temp_path)
-            else:  # Linux and other Unix-like
-                subprocess.run(["xdg-open", temp_path], check=True)
-
-            # Note: The temp file will remain until the application exits or the OS cleans it up
+            self._open_with_system_viewer(temp_path)
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to open SDS file: {str(e)}")
 
+    def _open_with_system_viewer(self, path):
+        """Open a file with the system's default application for its type"""
+        import os
+        import subprocess
+        import platform
+
+        if platform.system() == "Darwin":  # macOS
+            subprocess.run(["open", path], check=True)
+        elif platform.system() == "Windows":
+            os.startfile(path)
+        else:  # Linux and other Unix-like
+            subprocess.run(["xdg-open", path], check=True)
+
+        # Note: Temp files will remain until the application exits or the OS cleans them up
+
+    def _create_progress_dialog(self, label):
+        """
+        Create a progress dialog for SDS transfers and the callback that feeds
+        it; Qt only shows the dialog when the transfer takes a while
+
+        Returns:
+            tuple: (dialog, progress callback taking bytes_done, bytes_total)
+        """
+        dialog = QProgressDialog(label, "", 0, 100, self)
+        dialog.setCancelButton(None)
+        dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        dialog.setMinimumDuration(500)
+        dialog.setValue(0)
+
+        def progress(done, total):
+            dialog.setValue(int(done * 100 / total) if total else 100)
+            QApplication.processEvents()
+
+        return dialog, progress
+
     def _toggle_edit_mode(self):
         """Toggle between view and edit modes"""
         self.view_model.toggle_edit_mode()
@@ -645,10 +748,7 @@ class ReagentDetailPanel(QWidget):
         if self.current_image_data is not None:
             form_data["Image"] = self.current_image_data
 
-        # Add SDS data if available
-        if self.current_sds_data is not None:
-            form_data["SDS"] = self.current_sds_data
-            form_data["SDS_Filename"] = self.current_sds_filename
+        # A newly chosen SDS file is saved by the ViewModel, not through the form
 
         return form_data
 
@@ -657,7 +757,11 @@ class ReagentDetailPanel(QWidget):
         reagent_data = self._collect_form_data()
 
         try:
-            result, message = self.view_model.save_reagent(reagent_data)
+            dialog, progress = self._create_progress_dialog("Saving SDS...")
+            try:
+                result, message = self.view_model.save_reagent(reagent_data, progress)
+            finally:
+                dialog.close()
 
             if result:
                 QMessageBox.information(self, "Success", message)
@@ -786,18 +890,6 @@ class ReagentDetailPanel(QWidget):
     def resizeEvent(self, event):
         """Handle resize events to scale the image properly"""
         super().resizeEvent(event)
-        if (
-            hasattr(self, "image_label")
-            and self.current_image_data
-            and self.image_label.pixmap()
-        ):
-            # Reload and rescale the image
-            image = QImage.fromData(self.current_image_data)
-            if not image.isNull():
-                pixmap = QPixmap.fromImage(image)
-                scaled_pixmap = pixmap.scaled(
-                    self.image_label.size(),
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation,
-                )
-                self.image_label.setPixmap(scaled_pixmap)
+        if getattr(self, "display_pixmap", None) is not None:
+            # Rescale the kept display-sized copy; no decoding on resize
+            self._show_display_pixmap()
@@ -118,7 +118,9 @@ class UsageEditView(QWidget):
             )
 
         self.amount_used_spin.setValue(usage_data.get("Jumlah_Terpakai", 1))
-        self.user_edit.setText(usage_data.get("User", ""))
+        self.user_edit.setText(usage_data.get("User") or "")
+        # Usage linked to a user account keeps that user's name
+        self.user_edit.setReadOnly(bool(usage_data.get("id_user")))
 
         # Populate supporting materials dropdown
         self.supporting_materials_combo.clear()
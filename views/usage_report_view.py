@@ -11,12 +11,24 @@ from PyQt6.QtWidgets import (
     QHeaderView,
     QMessageBox,
     QFileDialog,  # Import QFileDialog
+    QComboBox,
+    QLineEdit,
 )
-from PyQt6.QtCore import Qt, pyqtSignal, pyqtSlot
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal, pyqtSlot
 from viewmodels.usage_report_viewmodel import UsageReportViewModel
 
 
 class UsageReportView(QWidget):
+    # History periods offered by the filter, in days (None for everything)
+    PERIODS = {
+        "Last 30 days": 30,
+        "Last 90 days": 90,
+        "Last year": 365,
+        "All time": None,
+    }
+    # Load the next page when the table is scrolled this close to its end
+    LOAD_MORE_MARGIN = 5
+
     # Signals to communicate with parent
     back_clicked = pyqtSignal()
     add_report_clicked = pyqtSignal(int, str)
@@ -40,7 +52,7 @@ class UsageReportView(QWidget):
         self._setup_ui()
 
         # Connect view model signals
-        self.view_model.data_changed.connect(self._refresh_table)
+        self.view_model.page_loaded.connect(self._on_page_loaded)
         # Connect the new signal from view model for export feedback
         self.view_model.export_finished.connect(self._on_export_finished)
 
@@ -66,6 +78,32 @@ class UsageReportView(QWidget):
         main_layout.addWidget(divider)
         main_layout.addSpacing(10)
 
+        # Filters; most users only need the recent history
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Period:"))
+        self.period_combo = QComboBox()
+        self.period_combo.addItems(list(self.PERIODS))
+        self.view_model.set_period(self.PERIODS[self.period_combo.currentText()])
+        self.period_combo.currentTextChanged.connect(self._on_period_changed)
+        filter_layout.addWidget(self.period_combo)
+
+        filter_layout.addWidget(QLabel("User:"))
+        self.user_filter_edit = QLineEdit()
+        self.user_filter_edit.setPlaceholderText("Any user")
+        self.user_filter_edit.editingFinished.connect(self._on_filters_changed)
+        filter_layout.addWidget(self.user_filter_edit)
+
+        filter_layout.addWidget(QLabel("Supporting Material:"))
+        self.material_filter_edit = QLineEdit()
+        self.material_filter_edit.setPlaceholderText("Any material")
+        self.material_filter_edit.editingFinished.connect(self._on_filters_changed)
+        filter_layout.addWidget(self.material_filter_edit)
+
+        self.count_label = QLabel("")
+        filter_layout.addStretch()
+        filter_layout.addWidget(self.count_label)
+        main_layout.addLayout(filter_layout)
+
         # Table for displaying usage reports
         self.table_widget = QTableWidget()
         self.table_widget.setColumnCount(5)  # Adjusted for actions
@@ -80,6 +118,8 @@ class UsageReportView(QWidget):
         self.table_widget.setStyleSheet(
             "QTableWidget { gridline-color: #d0d0d0; alternate-background-color: #f0f0f0; }"
         )
+        # Further pages are fetched as the user scrolls down
+        self.table_widget.verticalScrollBar().valueChanged.connect(self._on_scrolled)
         main_layout.addWidget(self.table_widget)
 
         # Button layout
@@ -118,16 +158,19 @@ class UsageReportView(QWidget):
         main_layout.addSpacing(10)
         main_layout.addLayout(button_layout)
 
-    def _refresh_table(self):
-        """Refresh the table with data from view model"""
-        # Clear the table
-        self.table_widget.setRowCount(0)
-
+    @pyqtSlot(int, int)
+    def _on_page_loaded(self, first_new, total_count):
+        """Add newly loaded rows to the table, starting over for a first page"""
         usage_reports = self.view_model.usage_reports
+        if first_new == 0:
+            # Clear the table
+            self.table_widget.clearSpans()
+            self.table_widget.setRowCount(0)
 
         # Populate table with usage data
-        for row, report in enumerate(usage_reports):
-            self.table_widget.insertRow(row)
+        self.table_widget.setRowCount(len(usage_reports))
+        for row in range(first_new, len(usage_reports)):
+            report = usage_reports[row]
 
             # Fill cells with data
             self.table_widget.setItem(
@@ -165,14 +208,46 @@ class UsageReportView(QWidget):
             # Add the widget to the table cell
             self.table_widget.setCellWidget(row, 4, actions_widget)
 
+        self.count_label.setText(f"Showing {len(usage_reports)} of {total_count}")
+
+        # Keep loading while the rows do not fill the table yet; the scroll
+        # bar range is only updated once the table has been laid out again
+        if usage_reports:
+            QTimer.singleShot(0, self._load_more_if_not_scrollable)
+
         # If no reports, show a message
         if len(usage_reports) == 0:
             self.table_widget.setRowCount(1)
-            no_data_item = QTableWidgetItem("No usage reports found for this reagent")
+            no_data_item = QTableWidgetItem("No usage reports found for these filters")
             no_data_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
             self.table_widget.setItem(0, 0, no_data_item)
             self.table_widget.setSpan(0, 0, 1, 5)  # Span across all columns
 
+    def _load_more_if_not_scrollable(self):
+        if self.table_widget.verticalScrollBar().maximum() == 0:
+            self.view_model.load_more()
+
+    def _on_scrolled(self, value):
+        scroll_bar = self.table_widget.verticalScrollBar()
+        if value >= scroll_bar.maximum() - self.LOAD_MORE_MARGIN:
+            self.view_model.load_more()
+
+    def _on_period_changed(self, period):
+        self.view_model.set_period(self.PERIODS.get(period))
+        self.refresh_data()
+
+    def _on_filters_changed(self):
+        user = self.user_filter_edit.text().strip()
+        material = self.material_filter_edit.text().strip()
+        if (user or None, material or None) == (
+            self.view_model.filters["user"],
+            self.view_model.filters["bahan_pendukung"],
+        ):
+            return  # editingFinished also fires when focus just moves on
+        self.view_model.set_filter("user", user)
+        self.view_model.set_filter("bahan_pendukung", material)
+        self.refresh_data()
+
     def _on_add_new_report(self):
         """Handler for add new report button click"""
         self.add_report_clicked.emit(self.reagent_id, self.reagent_name)